@@ -0,0 +1,168 @@
+"""
+Typeahead of meals, tables and staff.
+
+Every kind is kept in memory as a sorted array of keys, the lower case
+name from each of its words on ("tomato soup", "soup"), next to an array
+of the ids they belong to. Keys beginning with a prefix are one range of
+the array found by bisection, and the most popular names of that range
+are answered without touching the database.
+
+An index is built on first use and dropped when a row of its kind is
+committed (see core.signals), the next query builds it again. Each process
+keeps its own indexes: a generation counter per kind in the shared cache
+(settings.CACHES) is bumped on every change, and a process which sees a
+generation it has not built from rebuilds. A counter evicted from the cache
+starts again from a random value, never from one a process has built from.
+Popularity moves with every order, so indexes older than
+AUTOCOMPLETE_REFRESH_SECONDS are rebuilt too.
+"""
+import bisect
+import datetime
+import heapq
+import random
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Q
+from django.utils import timezone
+
+_lock = threading.RLock()
+_indexes = {}
+
+
+def recent(days=30):
+    return timezone.now() - datetime.timedelta(days=days)
+
+
+def meal_rows(using=DEFAULT_DB_ALIAS):
+    meals = apps.get_model("meals", "Meal").objects.using(using)
+    for pk, name, ordered, is_available, stock in meals.values_list(
+        "pk", "name", "ordered_30_days", "is_available", "stock"
+    ):
+        yield {"id": pk, "label": name, "popularity": ordered, "available": is_available and stock != 0}
+
+
+def table_rows(using=DEFAULT_DB_ALIAS):
+    tables = apps.get_model("orders", "Table").objects.using(using).annotate(
+        popularity=Count("orders", filter=Q(orders__date__gte=recent()))
+    )
+    for pk, name, popularity in tables.values_list("pk", "name", "popularity"):
+        yield {"id": pk, "label": name, "popularity": popularity}
+
+
+def staff_rows(using=DEFAULT_DB_ALIAS):
+    users = apps.get_model("users", "User").objects.using(using).filter(is_active=True).annotate(
+        popularity=Count("orders", filter=Q(orders__date__gte=recent()))
+    )
+    for pk, first_name, last_name, login, popularity in users.values_list(
+        "pk", "first_name", "last_name", "login", "popularity"
+    ):
+        yield {"id": pk, "label": f"{first_name} {last_name}".strip(), "login": login, "popularity": popularity}
+
+
+# Kind, source of its rows, models whose changes rebuild it, whether only admins may read it
+KINDS = {
+    "meals": (meal_rows, ("meals.Meal", ), False),
+    "tables": (table_rows, ("orders.Table", ), False),
+    "staff": (staff_rows, ("users.User", ), True),
+}
+
+
+def keys(row):
+    """
+    Yields lower case keys of a row, its label from every word on and its login
+    """
+    words = row["label"].lower().split()
+    for start in range(len(words)):
+        yield " ".join(words[start:])
+    if row.get("login"):
+        yield row["login"].lower()
+
+
+def generation_key(kind):
+    return f"autocomplete:{kind}:generation"
+
+
+def start_generation(kind):
+    cache.add(generation_key(kind), random.getrandbits(48), timeout=None)
+
+
+def current_generation(kind):
+    generation = cache.get(generation_key(kind))
+    if generation is None:
+        start_generation(kind)
+        generation = cache.get(generation_key(kind))
+
+    return generation
+
+
+def invalidate(kind):
+    """
+    Drops the index of a kind in every process
+    """
+    start_generation(kind)
+    try:
+        cache.incr(generation_key(kind))
+    except ValueError:
+        # Evicted between add and incr, the next query starts a generation no process has built from
+        pass
+
+    with _lock:
+        _indexes.pop(kind, None)
+
+
+def build(kind, using=DEFAULT_DB_ALIAS):
+    """
+    Builds the index of a kind: sorted keys, the ids of the keys, rows by id and when it was built
+    """
+    # Read before building, changes made meanwhile make the next query build again
+    generation = current_generation(kind)
+    source, _, _ = KINDS[kind]
+
+    rows, pairs = {}, []
+    for row in source(using):
+        rows[row["id"]] = row
+        pairs.extend((key, row["id"]) for key in set(keys(row)))
+    pairs.sort()
+
+    return {
+        "keys": [key for key, _ in pairs],
+        "ids": [pk for _, pk in pairs],
+        "rows": rows,
+        "generation": generation,
+        "built_at": time.monotonic(),
+    }
+
+
+def index(kind):
+    with _lock:
+        built = _indexes.get(kind)
+        if (
+            built is None
+            or built["generation"] != current_generation(kind)
+            or time.monotonic() - built["built_at"] >= settings.AUTOCOMPLETE_REFRESH_SECONDS
+        ):
+            built = _indexes[kind] = build(kind)
+
+        return built
+
+
+def complete(kind, prefix, limit=None):
+    """
+    Returns the most popular rows of a kind with a key beginning with prefix
+    """
+    prefix = " ".join(prefix.lower().split())
+    limit = limit or settings.AUTOCOMPLETE_LIMIT
+    built = index(kind)
+
+    start = bisect.bisect_left(built["keys"], prefix)
+    end = bisect.bisect_left(built["keys"], prefix + "\uffff", start)
+    rows = built["rows"]
+
+    matches = set(built["ids"][start:end])
+    best = heapq.nsmallest(limit, matches, key=lambda pk: (-rows[pk]["popularity"], rows[pk]["label"].lower(), pk))
+    return [dict(rows[pk]) for pk in best]
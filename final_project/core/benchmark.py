@@ -0,0 +1,86 @@
+import json
+import math
+import threading
+import time
+from urllib import error, request
+
+
+def percentile(values, percent):
+    """
+    Returns the percentile of values using the nearest-rank method
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies):
+    """
+    Returns count, p50, p95, p99 and max of latencies in milliseconds
+    """
+    return {
+        "count": len(latencies),
+        "p50": round(percentile(latencies, 50) * 1000, 2),
+        "p95": round(percentile(latencies, 95) * 1000, 2),
+        "p99": round(percentile(latencies, 99) * 1000, 2),
+        "max": round(max(latencies, default=0.0) * 1000, 2),
+    }
+
+
+def timed(func, *args, **kwargs):
+    """
+    Calls func and returns its result together with the elapsed time in seconds
+    """
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run_concurrently(func, total, concurrency):
+    """
+    Calls func `total` times from `concurrency` threads and returns the results in call order
+    """
+    results = [None] * total
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            results[index] = func()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def http_call(method, url, payload=None, headers=None, timeout=30):
+    """
+    Performs an HTTP call and returns status code and elapsed time in seconds
+    """
+    data = json.dumps(payload).encode() if payload is not None else None
+    call = request.Request(
+        url, data=data, method=method, headers={"Content-Type": "application/json", **(headers or {})}
+    )
+
+    started = time.perf_counter()
+    try:
+        with request.urlopen(call, timeout=timeout) as response:
+            response.read()
+            code = response.status
+    except error.HTTPError as http_error:
+        code = http_error.code
+    except error.URLError:
+        code = 0
+
+    return code, time.perf_counter() - started
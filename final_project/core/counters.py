@@ -0,0 +1,21 @@
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+
+
+def increment(model, keys, values, using=DEFAULT_DB_ALIAS):
+    """
+    Adds values to the counters of the row with the given keys, creating the row if needed.
+    The model must have a unique constraint on the keys
+    """
+    manager = model.objects.using(using)
+    changes = {field: F(field) + value for field, value in values.items()}
+
+    if manager.filter(**keys).update(**changes):
+        return
+
+    try:
+        with transaction.atomic(using=using):
+            manager.create(**keys, **values)
+    except IntegrityError:
+        # A concurrent transaction has created the row in the meantime
+        manager.filter(**keys).update(**changes)
@@ -0,0 +1,107 @@
+"""
+PostgreSQL backend which keeps connections in a process wide pool.
+
+Configured with the usual PostgreSQL settings plus an optional POOL entry:
+
+    'POOL': {
+        'MAX_SIZE': 10,             # connections per process
+        'MAX_LIFETIME': 1800,       # seconds before a connection is replaced
+        'TIMEOUT': 5,               # seconds to wait for a free connection
+        'HEALTH_CHECK_AFTER': 10,   # ping connections idle for longer than this
+    }
+
+Closing a Django connection returns it to the pool, so CONN_MAX_AGE should stay 0.
+"""
+import threading
+
+from django.db.backends.postgresql import base, creation
+from psycopg2 import extensions
+
+from core.db.pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(settings_dict):
+    return tuple(settings_dict.get(key) for key in ("HOST", "PORT", "NAME", "USER"))
+
+
+def _health_check(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+    if not connection.autocommit:
+        connection.rollback()
+
+
+def get_pool(settings_dict, connect):
+    """
+    Returns the pool of the database described by settings_dict, creating it with `connect` if needed
+    """
+    key = _pool_key(settings_dict)
+
+    with _pools_lock:
+        if key not in _pools:
+            options = settings_dict.get("POOL", {})
+            _pools[key] = ConnectionPool(
+                connect,
+                max_size=options.get("MAX_SIZE", 10),
+                max_lifetime=options.get("MAX_LIFETIME", 1800),
+                timeout=options.get("TIMEOUT", 5),
+                health_check=_health_check,
+                health_check_after=options.get("HEALTH_CHECK_AFTER", 10),
+            )
+
+        return _pools[key]
+
+
+def close_pools(name=None):
+    """
+    Closes idle connections of all pools, or of pools of the given database name
+    """
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if name is None or key[2] == name]
+
+    for pool in pools:
+        pool.close_all()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the test database busy
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        return get_pool(self.settings_dict, self._connect)
+
+    def _connect(self):
+        return super().get_new_connection(self.get_connection_params())
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.checkout()
+        self.isolation_level = self.settings_dict["OPTIONS"].get("isolation_level", connection.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+
+        connection = self.connection
+        discard = self.errors_occurred
+
+        if not discard and not connection.closed:
+            if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except Exception:
+                    discard = True
+
+        self.pool.checkin(connection, discard=discard)
@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """
+    Raised when no connection could be checked out in time
+    """
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of DB-API connections.
+
+    Connections are reused last in, first out. A connection which has been idle
+    for longer than `health_check_after` seconds is pinged with `health_check`
+    before it is handed out, and connections older than `max_lifetime` seconds
+    are closed instead of being reused.
+    """
+
+    def __init__(self, connect, max_size=10, max_lifetime=1800, timeout=5, health_check=None, health_check_after=10):
+        self.connect = connect
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.health_check = health_check
+        self.health_check_after = health_check_after
+
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._created_at = {}
+        self._size = 0
+        self._metrics = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "failed_health_checks": 0,
+            "in_use": 0,
+        }
+
+    def _expired(self, connection, now):
+        return self.max_lifetime is not None and now - self._created_at[id(connection)] >= self.max_lifetime
+
+    def _healthy(self, connection, idle_since):
+        if getattr(connection, "closed", False):
+            return False
+
+        if self.health_check is None or time.monotonic() - idle_since < self.health_check_after:
+            return True
+
+        try:
+            self.health_check(connection)
+        except Exception:
+            return False
+
+        return True
+
+    def _discard(self, connection):
+        """
+        Closes a connection which left the pool. Must be called without holding the lock
+        """
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+        with self._condition:
+            self._created_at.pop(id(connection), None)
+            self._size -= 1
+            self._metrics["closed"] += 1
+            self._condition.notify()
+
+    def checkout(self):
+        """
+        Returns a healthy connection, opening a new one if the pool has room for it
+        """
+        deadline = time.monotonic() + self.timeout
+        waited = False
+
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics["timeouts"] += 1
+                        raise PoolTimeout(f"No connection available within {self.timeout} seconds")
+
+                    if not waited:
+                        waited = True
+                        self._metrics["waits"] += 1
+
+                    started = time.monotonic()
+                    self._condition.wait(remaining)
+                    self._metrics["wait_time"] += time.monotonic() - started
+
+                if self._idle:
+                    connection, idle_since = self._idle.pop()
+                else:
+                    connection = None
+                    self._size += 1
+
+            if connection is None:
+                try:
+                    connection = self.connect()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+
+                with self._condition:
+                    self._created_at[id(connection)] = time.monotonic()
+                    self._metrics["created"] += 1
+                    self._metrics["checkouts"] += 1
+                    self._metrics["in_use"] += 1
+
+                return connection
+
+            if self._expired(connection, time.monotonic()):
+                self._discard(connection)
+                continue
+
+            if not self._healthy(connection, idle_since):
+                with self._condition:
+                    self._metrics["failed_health_checks"] += 1
+                self._discard(connection)
+                continue
+
+            with self._condition:
+                self._metrics["checkouts"] += 1
+                self._metrics["in_use"] += 1
+
+            return connection
+
+    def checkin(self, connection, discard=False):
+        """
+        Returns a connection to the pool, or closes it if it is broken or too old
+        """
+        with self._condition:
+            self._metrics["in_use"] -= 1
+            keep = (
+                not discard
+                and not getattr(connection, "closed", False)
+                and not self._expired(connection, time.monotonic())
+            )
+
+            if keep:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+                return
+
+        self._discard(connection)
+
+    def close_all(self):
+        """
+        Closes every idle connection
+        """
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def stats(self):
+        with self._condition:
+            return {
+                **self._metrics,
+                "wait_time": round(self._metrics["wait_time"], 6),
+                "idle": len(self._idle),
+                "size": self._size,
+                "max_size": self.max_size,
+            }
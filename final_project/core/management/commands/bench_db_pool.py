@@ -0,0 +1,57 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.postgresql.base import DatabaseWrapper as PlainWrapper
+
+from core.benchmark import run_concurrently, summarize
+from core.db.backends.postgresql.base import DatabaseWrapper as PooledWrapper
+
+
+class Command(BaseCommand):
+    """
+    Compares per-request connections with pooled connections on a PostgreSQL database
+    """
+    help = "Measures connect + query + close cycles with plain and pooled PostgreSQL connections"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to benchmark")
+        parser.add_argument("--requests", type=int, default=2000, help="Simulated requests per mode")
+        parser.add_argument("--concurrency", type=int, default=16, help="Concurrent threads")
+        parser.add_argument("--query", default="SELECT 1", help="Query executed by every simulated request")
+
+    def run(self, wrapper_class, settings_dict, options):
+        local = threading.local()
+
+        def simulated_request():
+            if not hasattr(local, "wrapper"):
+                local.wrapper = wrapper_class(dict(settings_dict), options["database"])
+
+            started = time.perf_counter()
+            with local.wrapper.cursor() as cursor:
+                cursor.execute(options["query"])
+                cursor.fetchall()
+            local.wrapper.close()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = run_concurrently(simulated_request, options["requests"], options["concurrency"])
+        elapsed = time.perf_counter() - started
+
+        return {"throughput": round(len(latencies) / elapsed, 1), "latency_ms": summarize(latencies)}
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+
+        if connection.vendor != "postgresql":
+            raise CommandError("The benchmark needs a PostgreSQL database")
+
+        settings_dict = connection.settings_dict
+        plain = self.run(PlainWrapper, settings_dict, options)
+        pooled = self.run(PooledWrapper, settings_dict, options)
+        stats = PooledWrapper(dict(settings_dict), options["database"]).pool.stats()
+
+        self.stdout.write(f"new connection per request: {plain}")
+        self.stdout.write(f"pooled connections: {pooled}")
+        self.stdout.write(f"pool metrics: {stats}")
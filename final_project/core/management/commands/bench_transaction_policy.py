@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client
+
+from core.benchmark import run_concurrently, summarize
+
+
+class HoldTimer:
+    """
+    Measures how long a connection stays inside a transaction by watching autocommit switches
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.original = connection.set_autocommit
+        self.started = None
+        self.held = 0.0
+        connection.set_autocommit = self.set_autocommit
+
+    def set_autocommit(self, autocommit, *args, **kwargs):
+        if not autocommit:
+            self.started = time.perf_counter()
+        elif self.started is not None:
+            self.held += time.perf_counter() - self.started
+            self.started = None
+
+        return self.original(autocommit, *args, **kwargs)
+
+
+class Command(BaseCommand):
+    """
+    Compares blanket ATOMIC_REQUESTS with per-view transaction policies on read endpoints
+    """
+    help = "Measures latency, throughput and transaction hold time of endpoints with and without ATOMIC_REQUESTS"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help="Endpoint to request, may be repeated (default: /activeOrders/, /meals/, /tables/)"
+        )
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint and mode")
+        parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to measure")
+
+    def run(self, path, options):
+        timers = {}
+
+        def call():
+            connection = connections[options["database"]]
+            timer = timers.setdefault(id(connection), HoldTimer(connection))
+            client = Client(SERVER_NAME="localhost")
+
+            started = time.perf_counter()
+            client.get(path)
+            return time.perf_counter() - started, timer
+
+        started = time.perf_counter()
+        results = run_concurrently(call, options["requests"], options["concurrency"])
+        elapsed = time.perf_counter() - started
+
+        for timer in timers.values():
+            timer.connection.set_autocommit = timer.original
+
+        held = sum(timer.held for timer in timers.values())
+        return {
+            "throughput": round(len(results) / elapsed, 1),
+            "latency_ms": summarize([latency for latency, _ in results]),
+            "hold_ms_per_request": round(held / len(results) * 1000, 3),
+        }
+
+    def handle(self, *args, **options):
+        settings_dict = connections[options["database"]].settings_dict
+        atomic_requests = settings_dict.get("ATOMIC_REQUESTS", False)
+
+        try:
+            for path in options["paths"] or ["/activeOrders/", "/meals/", "/tables/"]:
+                settings_dict["ATOMIC_REQUESTS"] = True
+                blanket = self.run(path, options)
+
+                settings_dict["ATOMIC_REQUESTS"] = False
+                policy = self.run(path, options)
+
+                self.stdout.write(f"{path}\n  ATOMIC_REQUESTS: {blanket}\n  per-view policy: {policy}")
+        finally:
+            settings_dict["ATOMIC_REQUESTS"] = atomic_requests
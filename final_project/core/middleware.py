@@ -0,0 +1,35 @@
+from . import routers
+from .transactions import READ_METHODS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serves admin list pages from the replica, pins users to primary after they write
+    and makes sure replica routing never leaks into the next request of the thread
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.set_replica_reads(False)
+
+        if request.method not in READ_METHODS and response.status_code < 400:
+            routers.pin_to_primary(request)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+
+        if (
+            request.method in READ_METHODS
+            and match is not None
+            and match.namespace == "admin"
+            and (match.url_name or "").endswith("_changelist")
+            and not routers.is_pinned_to_primary(request)
+        ):
+            routers.set_replica_reads(True)
@@ -1,7 +1,56 @@
+from django.db import transaction
 from rest_framework import status
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
+from . import routers, transactions
+
+
+class TransactionPolicyMixin:
+    """
+    Runs requests in a transaction depending on the view's declared policy.
+    Reads run in autocommit mode and writes are atomic by default,
+    `transaction_policy` overrides it per method, e.g. {"POST": transactions.NONE}.
+    Must come before the DRF view class
+    """
+    transaction_policy = {}
+
+    def get_transaction_policy(self, method):
+        return self.transaction_policy.get(method, transactions.default_policy(method))
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.get_transaction_policy(request.method) != transactions.ATOMIC:
+            return super().dispatch(request, *args, **kwargs)
+
+        with transaction.atomic():
+            response = super().dispatch(request, *args, **kwargs)
+
+            # Errors handled by DRF are returned as responses, they must not be committed
+            if getattr(response, "exception", False):
+                transaction.set_rollback(True)
+
+            return response
+
+
+class ReplicaReadMixin:
+    """
+    Serves reads of the view from the read replica.
+    Users who have just written keep reading from primary, see ReplicaRoutingMiddleware
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        # Authentication above has run on primary, the user is known by now
+        if request.method in transactions.READ_METHODS and not routers.is_pinned_to_primary(request):
+            routers.set_replica_reads(True)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            routers.set_replica_reads(False)
+
 
 class CustomUpdateMixin:
     """
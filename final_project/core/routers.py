@@ -0,0 +1,67 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+REPLICA = "replica"
+
+_state = threading.local()
+
+
+def set_replica_reads(enabled):
+    """
+    Turns routing of reads to the replica on or off for the current thread
+    """
+    _state.replica_reads = enabled
+
+
+def replica_reads_enabled():
+    return getattr(_state, "replica_reads", False)
+
+
+def _pin_key(request):
+    user = getattr(request, "user", None)
+
+    if user is not None and user.is_authenticated:
+        return f"replica:pin:user:{user.pk}"
+
+    return f"replica:pin:addr:{request.META.get('REMOTE_ADDR')}"
+
+
+def pin_to_primary(request):
+    """
+    Keeps reads of the request's user on primary for REPLICA_PIN_SECONDS,
+    so they read their own writes while the replica catches up
+    """
+    cache.set(_pin_key(request), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(request):
+    return cache.get(_pin_key(request), False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads to the replica while replica reads are enabled for the current thread.
+    Everything else, including all writes, goes to the default database
+    """
+
+    def replica_available(self):
+        return REPLICA in connections.databases
+
+    def db_for_read(self, model, **hints):
+        if replica_reads_enabled() and self.replica_available():
+            return REPLICA
+
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of primary and gets its schema through replication
+        return db != REPLICA
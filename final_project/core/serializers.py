@@ -0,0 +1,9 @@
+from rest_framework import serializers
+
+
+class AutocompleteSerializer(serializers.Serializer):
+    """
+    Responsible for validating parameters of an autocomplete query
+    """
+    prefix = serializers.CharField(max_length=100, trim_whitespace=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, required=False)
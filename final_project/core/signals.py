@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import autocomplete
+
+
+def invalidate_autocomplete(sender, using, update_fields=None, **kwargs):
+    """
+    Drops autocomplete indexes of the changed model once the change is committed
+    """
+    # Logins only touch last_login, which is not part of any index
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+
+    for kind, (_, models, _) in autocomplete.KINDS.items():
+        if sender._meta.label in models:
+            transaction.on_commit(lambda kind=kind: autocomplete.invalidate(kind), using=using)
+
+
+for _, models, _ in autocomplete.KINDS.values():
+    for model in models:
+        post_save.connect(invalidate_autocomplete, sender=model)
+        post_delete.connect(invalidate_autocomplete, sender=model)
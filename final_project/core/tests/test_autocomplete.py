@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import autocomplete
+from meals.models import Meal
+from meals.tests.utils import MealFactory
+from orders.tests.utils import OrderFactory, TableFactory, create_user_model
+from users.models import User
+from users.tests.utils import RoleFactory
+
+
+class TestAutocomplete(TransactionTestCase):
+    """
+    Testing typeahead of meals, tables and staff
+    """
+
+    def setUp(self):
+        cache.clear()
+        for kind in autocomplete.KINDS:
+            autocomplete.invalidate(kind)
+
+        self.soup = MealFactory(name="Tomato soup")
+        self.salad = MealFactory(name="Tomato salad")
+        self.toast = MealFactory(name="Toast")
+        Meal.objects.filter(pk=self.salad.pk).update(ordered_30_days=5)
+        Meal.objects.filter(pk=self.toast.pk).update(ordered_30_days=1)
+
+    def test_prefix_ranked_by_popularity(self):
+        """
+        Testing that names beginning with a prefix, or with a word of them, come the most popular first
+        """
+        names = [row["label"] for row in autocomplete.complete("meals", "to")]
+
+        self.assertEqual(names, ["Tomato salad", "Toast", "Tomato soup"])
+        self.assertEqual([row["id"] for row in autocomplete.complete("meals", "SOU")], [self.soup.id])
+        self.assertEqual([row["id"] for row in autocomplete.complete("meals", "tomato  s", limit=1)], [self.salad.id])
+
+    def test_keystrokes_do_not_query(self):
+        """
+        Testing that a built index answers without the database, and is rebuilt after a change
+        """
+        autocomplete.complete("meals", "t")
+
+        with CaptureQueriesContext(connection) as queries:
+            autocomplete.complete("meals", "to")
+            autocomplete.complete("meals", "tom")
+        self.assertEqual(len(queries), 0)
+
+        MealFactory(name="Tomahawk")
+        self.assertEqual(autocomplete.complete("meals", "tomah")[0]["label"], "Tomahawk")
+
+    def test_evicted_generation_does_not_repeat(self):
+        """
+        Testing that a generation evicted from the cache and bumped by another process rebuilds the index here
+        """
+        autocomplete.complete("meals", "t")
+
+        cache.delete(autocomplete.generation_key("meals"))
+        Meal.objects.filter(pk=self.toast.pk).update(name="Tofu")
+        autocomplete.start_generation("meals")
+        cache.incr(autocomplete.generation_key("meals"))
+
+        self.assertEqual(autocomplete.complete("meals", "tof")[0]["id"], self.toast.id)
+
+    def test_tables_by_orders(self):
+        """
+        Testing that tables are ranked by their recent orders
+        """
+        quiet, busy = TableFactory(name="Terrace 1"), TableFactory(name="Terrace 2")
+        OrderFactory(table_id=busy, waiter_id=create_user_model())
+
+        self.assertEqual([row["id"] for row in autocomplete.complete("tables", "terr")], [busy.id, quiet.id])
+
+    def test_endpoint(self):
+        """
+        Testing autocomplete/<kind>/ endpoint
+        """
+        response = APIClient().get(reverse("autocomplete", args=["meals"]), {"prefix": "toa"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{"id": self.toast.id, "label": "Toast", "popularity": 1, "available": True}])
+        self.assertEqual(
+            APIClient().get(reverse("autocomplete", args=["dishes"]), {"prefix": "t"}).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_staff_is_for_admins(self):
+        """
+        Testing that staff is completed by name or login for admins only
+        """
+        url = reverse("autocomplete", args=["staff"])
+        admin = User.objects.create_superuser("admin", RoleFactory().id, "admin")
+        client = APIClient()
+
+        self.assertEqual(client.get(url, {"prefix": "adm"}).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        client.force_authenticate(admin)
+        response = client.get(url, {"prefix": "adm"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.data], [admin.id])
@@ -0,0 +1,83 @@
+from django.db import connection
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from core import transactions
+from core.mixins import TransactionPolicyMixin
+from orders.models import Table
+
+
+class PolicyView(TransactionPolicyMixin, APIView):
+    """
+    View recording how deep in transactions its handlers run
+    """
+    transaction_policy = {"PUT": transactions.NONE}
+
+    def get(self, request):
+        return Response({"depth": len(connection.savepoint_ids)})
+
+    def put(self, request):
+        return Response({"depth": len(connection.savepoint_ids)})
+
+    def post(self, request):
+        Table.objects.create(name="rolled back")
+        if request.data.get("fail"):
+            raise ValidationError("fail")
+        return Response({"depth": len(connection.savepoint_ids)})
+
+
+class TestTransactionPolicyMixin(TestCase):
+    """
+    Testing per-view transaction policy
+    """
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = PolicyView.as_view()
+        self.depth = len(connection.savepoint_ids)
+
+    def test_reads_are_not_atomic(self):
+        """
+        Testing that GET runs without an extra transaction
+        """
+        response = self.view(self.factory.get("/"))
+
+        self.assertEqual(response.data["depth"], self.depth)
+
+    def test_writes_are_atomic(self):
+        """
+        Testing that POST runs inside a transaction
+        """
+        response = self.view(self.factory.post("/", {}, format="json"))
+
+        self.assertEqual(response.data["depth"], self.depth + 1)
+
+    def test_declared_policy_overrides_default(self):
+        """
+        Testing that a policy declared on the view wins over the default one
+        """
+        response = self.view(self.factory.put("/", {}, format="json"))
+
+        self.assertEqual(response.data["depth"], self.depth)
+
+    def test_handled_errors_roll_back(self):
+        """
+        Testing that writes of a request answered with an error response are rolled back
+        """
+        response = self.view(self.factory.post("/", {"fail": True}, format="json"))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Table.objects.filter(name="rolled back").exists())
+
+    def test_lock_scope_yields_locked_rows(self):
+        """
+        Testing that lock_scope yields objects of the queryset
+        """
+        table = Table.objects.create(name="locked")
+
+        with transactions.lock_scope(Table.objects.filter(pk=table.pk)) as (locked, ):
+            self.assertEqual(locked, table)
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(SimpleTestCase):
+    """
+    Testing pooling of DB connections
+    """
+
+    def get_pool(self, **kwargs):
+        return ConnectionPool(FakeConnection, **kwargs)
+
+    def test_connections_are_reused(self):
+        """
+        Testing that a checked in connection is handed out again
+        """
+        pool = self.get_pool()
+
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        self.assertIs(pool.checkout(), connection)
+        self.assertEqual(pool.stats()["created"], 1)
+        self.assertEqual(pool.stats()["checkouts"], 2)
+
+    def test_checkout_times_out_when_pool_is_exhausted(self):
+        """
+        Testing that checkout gives up when every connection is in use
+        """
+        pool = self.get_pool(max_size=1, timeout=0.01)
+        pool.checkout()
+
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_expired_connections_are_replaced(self):
+        """
+        Testing that connections older than max lifetime are closed instead of reused
+        """
+        pool = self.get_pool(max_lifetime=60)
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        with mock.patch("core.db.pool.time.monotonic", return_value=10 ** 9):
+            fresh = pool.checkout()
+
+        self.assertIsNot(fresh, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()["closed"], 1)
+
+    def test_failed_health_check_replaces_connection(self):
+        """
+        Testing that an idle connection which fails the health check is not handed out
+        """
+        health_check = mock.Mock(side_effect=Exception("server closed the connection"))
+        pool = self.get_pool(health_check=health_check, health_check_after=0)
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        fresh = pool.checkout()
+
+        self.assertIsNot(fresh, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()["failed_health_checks"], 1)
+
+    def test_discarded_connection_frees_a_slot(self):
+        """
+        Testing that discarding a connection on checkin closes it and frees room for a new one
+        """
+        pool = self.get_pool(max_size=1, timeout=0.01)
+        connection = pool.checkout()
+
+        pool.checkin(connection, discard=True)
+
+        self.assertTrue(connection.closed)
+        self.assertIsNot(pool.checkout(), connection)
+        self.assertEqual(pool.stats()["size"], 1)
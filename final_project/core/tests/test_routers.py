@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import router
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from core import routers
+from core.mixins import ReplicaReadMixin
+from orders.models import Table
+
+
+class ReadView(ReplicaReadMixin, APIView):
+    """
+    View reporting the database its reads are routed to
+    """
+
+    def get(self, request):
+        return Response({"db": Table.objects.all().db})
+
+    def post(self, request):
+        return Response({"db": Table.objects.all().db})
+
+
+@mock.patch.object(routers.PrimaryReplicaRouter, "replica_available", return_value=True)
+class TestReplicaRouting(TestCase):
+    """
+    Testing routing of reads to the replica
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.view = ReadView.as_view()
+
+    def tearDown(self):
+        routers.set_replica_reads(False)
+        cache.clear()
+
+    def test_router_without_replica_reads(self, available):
+        """
+        Testing that reads go to primary unless replica reads are enabled
+        """
+        self.assertEqual(Table.objects.all().db, "default")
+
+        routers.set_replica_reads(True)
+        self.assertEqual(Table.objects.all().db, routers.REPLICA)
+        self.assertEqual(router.db_for_write(Table), "default")
+
+    def test_reads_of_view_go_to_replica(self, available):
+        """
+        Testing that GET requests of replica views read from the replica and reset routing afterwards
+        """
+        response = self.view(self.factory.get("/"))
+
+        self.assertEqual(response.data["db"], routers.REPLICA)
+        self.assertFalse(routers.replica_reads_enabled())
+
+    def test_writes_stay_on_primary(self, available):
+        """
+        Testing that reads made while handling a write go to primary
+        """
+        response = self.view(self.factory.post("/"))
+
+        self.assertEqual(response.data["db"], "default")
+
+    def test_read_your_writes(self, available):
+        """
+        Testing that a client reads from primary for a while after a write
+        """
+        client = APIClient()
+        request = self.factory.get("/")
+
+        client.post(reverse("tables"), {"name": "Table#1"})
+
+        self.assertTrue(routers.is_pinned_to_primary(request))
+        self.assertEqual(self.view(request).data["db"], "default")
+
+    def test_replica_is_not_migrated(self, available):
+        """
+        Testing that migrations never run against the replica
+        """
+        replica_router = routers.PrimaryReplicaRouter()
+
+        self.assertFalse(replica_router.allow_migrate(routers.REPLICA, "orders"))
+        self.assertTrue(replica_router.allow_migrate("default", "orders"))
@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+
+# Transaction policies a view can declare per HTTP method
+NONE = "none"
+ATOMIC = "atomic"
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def default_policy(method):
+    """
+    Reads run in autocommit mode, everything else in one transaction
+    """
+    return NONE if method in READ_METHODS else ATOMIC
+
+
+@contextmanager
+def lock_scope(queryset):
+    """
+    Opens a transaction and locks the rows of queryset until it ends.
+    Yields the locked objects
+    """
+    with transaction.atomic(using=queryset.db):
+        yield list(queryset.select_for_update())
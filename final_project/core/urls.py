@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("metrics/dbPool/", views.DatabasePoolView.as_view(), name="db-pool-metrics"),
+    path("autocomplete/<str:kind>/", views.AutocompleteView.as_view(), name="autocomplete"),
+]
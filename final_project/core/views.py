@@ -1,3 +1,49 @@
-from django.shortcuts import render
+from django.db import connections
+from django.http import Http404
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from . import autocomplete, serializers
+
+
+class DatabasePoolView(APIView):
+    """
+    Responsible for serving metrics of database connection pools of the process
+    """
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        pools = {}
+
+        for alias in connections:
+            backend = connections[alias]
+            if hasattr(backend, "pool"):
+                pools[alias] = backend.pool.stats()
+
+        return Response(pools)
+
+
+class AutocompleteView(APIView):
+    """
+    Responsible for typeahead of meals, tables and staff from memory, the most popular first.
+    Accepts prefix and limit query parameters, staff is for admins only
+    """
+
+    def get_permissions(self):
+        kind = autocomplete.KINDS.get(self.kwargs["kind"])
+        if kind is not None and kind[2]:
+            return [IsAdminUser()]
+
+        return super().get_permissions()
+
+    def get(self, request, *args, **kwargs):
+        if kwargs["kind"] not in autocomplete.KINDS:
+            raise Http404
+
+        params = serializers.AutocompleteSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        return Response(
+            autocomplete.complete(kwargs["kind"], params.validated_data["prefix"], params.validated_data.get("limit"))
+        )
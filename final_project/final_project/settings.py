@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 from datetime import timedelta
@@ -42,12 +43,15 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.sites',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     #Mine
     "meals",
     "orders",
     "users",
     "core",
+    "reports",
+    "kitchen",
 
     # 3rd party
     "rest_framework",
@@ -70,6 +74,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'final_project.urls'
@@ -98,16 +103,82 @@ WSGI_APPLICATION = 'final_project.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        # PostgreSQL with pooled, health-checked connections, see core/db/backends/postgresql/base.py
+        'ENGINE': 'core.db.backends.postgresql',
         'NAME': config("DB_NAME"),
         'USER': config("DB_USER"),
         'HOST': config("DB_HOST"),
         'PASSWORD': config("DB_PASS"),
         'PORT': config("DB_PORT"),
-        'ATOMIC_REQUESTS': True,
+        'POOL': {
+            'MAX_SIZE': config("DB_POOL_MAX_SIZE", default=10, cast=int),
+            'MAX_LIFETIME': config("DB_POOL_MAX_LIFETIME", default=1800, cast=int),
+            'TIMEOUT': config("DB_POOL_TIMEOUT", default=5, cast=float),
+            'HEALTH_CHECK_AFTER': config("DB_POOL_HEALTH_CHECK_AFTER", default=10, cast=float),
+        },
     }
 }
 
+# Read replica. List and report endpoints read from it when DB_REPLICA_HOST is set,
+# tests use the default database in its place
+
+if config("DB_REPLICA_HOST", default=""):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': config("DB_REPLICA_NAME", default=DATABASES['default']['NAME']),
+        'HOST': config("DB_REPLICA_HOST"),
+        'PORT': config("DB_REPLICA_PORT", default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Cache shared by every worker process. Replica pins, report versions and generations of the
+# in-memory kitchen, search and autocomplete indexes must be seen by all of them, a per-process
+# cache would leave other workers reading stale data
+
+CACHES = {
+    'default': {
+        'BACKEND': config("CACHE_BACKEND", default="django.core.cache.backends.memcached.MemcachedCache"),
+        'LOCATION': config("CACHE_LOCATION", default="127.0.0.1:11211"),
+        'KEY_PREFIX': config("CACHE_KEY_PREFIX", default="final_project"),
+    }
+}
+
+# Tests run in a single process and must not depend on a running memcached
+if 'test' in sys.argv[1:2]:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a user keeps reading from primary after a write, the pin is kept in the shared cache
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", default=5.0, cast=float)
+
+# Requests are not wrapped into a transaction as a whole. Views declare their
+# transaction policy with core.mixins.TransactionPolicyMixin instead:
+# reads run in autocommit mode and writes are atomic
+
+# Password hashing
+# The first hasher is preferred, passwords stored with any other one are rehashed on login
+
+PASSWORD_HASHERS = [
+    config("PASSWORD_HASHER", default="users.hashers.ConfigurablePBKDF2PasswordHasher"),
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+PASSWORD_HASH_ITERATIONS = config("PASSWORD_HASH_ITERATIONS", default=150000, cast=int)
+
+# How many password hashes may run at once per process and how long others wait for a slot. The limit is not
+# shared between processes, a host running N workers hashes up to N * PASSWORD_HASH_CONCURRENCY passwords at once
+PASSWORD_HASH_CONCURRENCY = config("PASSWORD_HASH_CONCURRENCY", default=2, cast=int)
+PASSWORD_HASH_TIMEOUT = config("PASSWORD_HASH_TIMEOUT", default=5.0, cast=float)
+
+AUTHENTICATION_BACKENDS = [
+    'users.backends.BoundedHashingBackend',
+]
 
 
 # Password validation
@@ -151,9 +222,14 @@ STATIC_URL = '/static/'
 
 AUTH_USER_MODEL = "users.User"
 
+# Number of processes used to hash passwords by the import_users command. The users/import/ endpoint hashes in
+# the process serving the request, so it takes at most USER_IMPORT_MAX_ROWS rows, bigger imports go through the command
+USER_IMPORT_HASH_WORKERS = config("USER_IMPORT_HASH_WORKERS", default=os.cpu_count() or 1, cast=int)
+USER_IMPORT_MAX_ROWS = config("USER_IMPORT_MAX_ROWS", default=100, cast=int)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.RevocationAwareJWTAuthentication',
     )
 }
 
@@ -201,3 +277,80 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 SITE_ID = 1
+
+# How often each process picks up tokens revoked by other processes when the shared cache misses a revocation,
+# and seconds a revocation may take to commit, rows revoked this recently are read again on every refresh
+TOKEN_REVOCATION_REFRESH_INTERVAL = config("TOKEN_REVOCATION_REFRESH_INTERVAL", default=5.0, cast=float)
+TOKEN_REVOCATION_SETTLE_SECONDS = config("TOKEN_REVOCATION_SETTLE_SECONDS", default=60, cast=int)
+
+# Rows fetched per round trip by the streaming check export
+CHECK_EXPORT_CHUNK_SIZE = config("CHECK_EXPORT_CHUNK_SIZE", default=2000, cast=int)
+
+# Daily partitioned columnar snapshots of sales lines for offline analytics
+ANALYTICS_SNAPSHOT_DIR = config("ANALYTICS_SNAPSHOT_DIR", default=os.path.join(BASE_DIR, "snapshots"))
+
+# Seconds a waiter report stays cached, reports are invalidated as soon as their days change
+WAITER_REPORT_CACHE_TIMEOUT = config("WAITER_REPORT_CACHE_TIMEOUT", default=3600, cast=int)
+
+# Order statuses named like these stages mark the progress of an order through the kitchen
+KITCHEN_STAGES = ("ordered", "cooking", "ready", "served")
+
+# Days of status timelines the prep time percentiles are computed from
+PREP_TIME_WINDOW_DAYS = config("PREP_TIME_WINDOW_DAYS", default=30, cast=int)
+
+# Weight of the last week in the exponentially smoothed demand forecast
+FORECAST_SMOOTHING = config("FORECAST_SMOOTHING", default=0.3, cast=float)
+
+# Weeks of history the demand forecast is computed from
+FORECAST_HISTORY_WEEKS = config("FORECAST_HISTORY_WEEKS", default=52, cast=int)
+
+# Seconds after which in-memory kitchen all day counts are reconciled with the database
+KITCHEN_RECONCILE_INTERVAL = config("KITCHEN_RECONCILE_INTERVAL", default=300, cast=int)
+
+# Seconds tickets changed in a generation are kept in the cache for other processes to catch up with, and most
+# generations a process catches up with before it reloads its kitchen index instead
+KITCHEN_CHANGES_TIMEOUT = config("KITCHEN_CHANGES_TIMEOUT", default=600, cast=int)
+KITCHEN_CATCH_UP_LIMIT = config("KITCHEN_CATCH_UP_LIMIT", default=200, cast=int)
+
+# Transports of kitchen ticket printers, Printer.transport -> class
+KITCHEN_PRINTER_TRANSPORTS = {
+    "file": "kitchen.printing.FileTransport",
+    "socket": "kitchen.printing.SocketTransport",
+}
+
+# Tickets sent to a printer at once, attempts before a print job fails and the delay before the first retry,
+# doubled after every failed attempt, in seconds
+KITCHEN_PRINT_BATCH_SIZE = config("KITCHEN_PRINT_BATCH_SIZE", default=20, cast=int)
+KITCHEN_PRINT_MAX_ATTEMPTS = config("KITCHEN_PRINT_MAX_ATTEMPTS", default=5, cast=int)
+KITCHEN_PRINT_RETRY_DELAY = config("KITCHEN_PRINT_RETRY_DELAY", default=5, cast=int)
+
+# Seconds after which a claimed print job of a stopped worker is picked up again, and printer connection timeout
+KITCHEN_PRINT_CLAIM_TIMEOUT = config("KITCHEN_PRINT_CLAIM_TIMEOUT", default=60, cast=int)
+KITCHEN_PRINTER_TIMEOUT = config("KITCHEN_PRINTER_TIMEOUT", default=5.0, cast=float)
+
+# Order change log: most changes returned by a read, seconds after which a gap in sequences is taken
+# for a rolled back transaction (must exceed the longest write transaction), and retention of changes
+CHANGELOG_READ_LIMIT = config("CHANGELOG_READ_LIMIT", default=500, cast=int)
+CHANGELOG_SETTLE_SECONDS = config("CHANGELOG_SETTLE_SECONDS", default=10, cast=int)
+CHANGELOG_COMPACT_AFTER_HOURS = config("CHANGELOG_COMPACT_AFTER_HOURS", default=24, cast=int)
+CHANGELOG_RETENTION_DAYS = config("CHANGELOG_RETENTION_DAYS", default=30, cast=int)
+
+# Closed orders older than these days are moved to the archive tables, in batches of this many orders
+ARCHIVE_AFTER_DAYS = config("ARCHIVE_AFTER_DAYS", default=90, cast=int)
+ARCHIVE_BATCH_SIZE = config("ARCHIVE_BATCH_SIZE", default=500, cast=int)
+
+# Monthly partitions of orders on Postgres: months created ahead, and full months kept attached (0 keeps all)
+PARTITION_MONTHS_AHEAD = config("PARTITION_MONTHS_AHEAD", default=3, cast=int)
+PARTITION_RETENTION_MONTHS = config("PARTITION_RETENTION_MONTHS", default=0, cast=int)
+
+# Statuses of closed orders older than these days are compacted into one timeline per order, in batches
+# of this many orders. Prep time reports read status rows, keep it above PREP_TIME_WINDOW_DAYS
+STATUS_COMPACT_AFTER_DAYS = config("STATUS_COMPACT_AFTER_DAYS", default=45, cast=int)
+STATUS_COMPACT_BATCH_SIZE = config("STATUS_COMPACT_BATCH_SIZE", default=500, cast=int)
+
+# Most meals returned by a search of /meals/search/
+MEAL_SEARCH_LIMIT = config("MEAL_SEARCH_LIMIT", default=20, cast=int)
+
+# Typeahead of /autocomplete/<kind>/: most rows returned, and seconds after which popularity is read again
+AUTOCOMPLETE_LIMIT = config("AUTOCOMPLETE_LIMIT", default=10, cast=int)
+AUTOCOMPLETE_REFRESH_SECONDS = config("AUTOCOMPLETE_REFRESH_SECONDS", default=300, cast=int)
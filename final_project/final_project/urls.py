@@ -17,12 +17,17 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework_simplejwt import views as jwt_views
 
+from users import views as user_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('token/', jwt_views.TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('refresh/', jwt_views.TokenRefreshView.as_view(), name='token_refresh'),
+    path('refresh/', user_views.TokenRefreshView.as_view(), name='token_refresh'),
     path("", include("users.urls")),
     path("", include("meals.urls")),
     path("", include("orders.urls")),
+    path("", include("core.urls")),
+    path("", include("reports.urls")),
+    path("", include("kitchen.urls")),
     path('', include('rest_auth.urls')),
 ]
@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import KitchenTicket, KitchenTicketLine, Printer, PrintJob
+
+# Register your models here.
+admin.site.register(KitchenTicket)
+admin.site.register(KitchenTicketLine)
+admin.site.register(Printer)
+admin.site.register(PrintJob)
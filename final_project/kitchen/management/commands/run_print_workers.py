@@ -0,0 +1,32 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from kitchen.printing import print_due
+
+
+class Command(BaseCommand):
+    """
+    Prints kitchen tickets from the print outbox with a pool of worker threads
+    """
+    help = "Prints due kitchen tickets, a batch per printer at a time, until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Printers served in parallel")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to wait when nothing is due")
+        parser.add_argument("--once", action="store_true", help="Print what is due and exit")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to use")
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options["workers"], thread_name_prefix="printer") as executor:
+            while True:
+                printed = print_due(executor, options["database"])
+                if printed:
+                    self.stdout.write(f"Printed {printed} tickets")
+
+                if options["once"]:
+                    break
+                if not printed:
+                    time.sleep(options["interval"])
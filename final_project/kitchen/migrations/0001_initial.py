@@ -0,0 +1,36 @@
+# Generated by Django 2.2.8 on 2026-10-19 11:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('orders', '0002_order_covers_waiter_date_index'),
+        ('meals', '0002_meal_popularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KitchenTicket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('done_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('department_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='meals.Department')),
+                ('order_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='orders.Order')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='KitchenTicketLine',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('meal_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_lines', to='meals.Meal')),
+                ('ticket_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='kitchen.KitchenTicket')),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.8 on 2026-10-19 11:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0002_meal_popularity'),
+        ('kitchen', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Printer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('transport', models.CharField(default='socket', max_length=50)),
+                ('address', models.CharField(max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+                ('department_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='printers', to='meals.Department')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PrintJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('printing', 'Printing'), ('printed', 'Printed'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.IntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claimed_by', models.CharField(blank=True, max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('printed_at', models.DateTimeField(blank=True, null=True)),
+                ('printer_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='kitchen.Printer')),
+                ('ticket_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='print_jobs', to='kitchen.KitchenTicket')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='printjob',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='kitchen_pri_status_eeae6d_idx'),
+        ),
+    ]
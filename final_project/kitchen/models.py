@@ -0,0 +1,80 @@
+from django.db import models
+from django.utils import timezone
+
+from meals.models import Department, Meal
+from orders.models import Order
+
+
+class KitchenTicket(models.Model):
+    """
+    Responsible for keeping meals of one order a department has to make, one ticket per batch of added meals
+    """
+    order_id = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="tickets", db_constraint=False)
+    department_id = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="tickets")
+    created = models.DateTimeField(auto_now_add=True)
+    done_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"Ticket #{self.pk}, order {self.order_id_id}, department {self.department_id_id}"
+
+
+class KitchenTicketLine(models.Model):
+    """
+    Responsible for keeping amount of a meal on a ticket
+    """
+    ticket_id = models.ForeignKey(KitchenTicket, on_delete=models.CASCADE, related_name="lines")
+    meal_id = models.ForeignKey(Meal, on_delete=models.CASCADE, related_name="ticket_lines")
+    amount = models.IntegerField()
+
+    def __str__(self):
+        return f"{self.ticket_id_id}, {self.meal_id_id} x{self.amount}"
+
+
+class Printer(models.Model):
+    """
+    Responsible for keeping ticket printers of a department and how to reach them.
+    Transport is a key of KITCHEN_PRINTER_TRANSPORTS, address is its target, e.g. host:port or a file path
+    """
+    name = models.CharField(max_length=50)
+    department_id = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="printers")
+    transport = models.CharField(max_length=50, default="socket")
+    address = models.CharField(max_length=255)
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.transport} {self.address})"
+
+
+class PrintJob(models.Model):
+    """
+    Responsible for keeping the outbox of tickets to print, written in the transaction which creates the ticket
+    """
+    PENDING = "pending"
+    PRINTING = "printing"
+    PRINTED = "printed"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "Pending"),
+        (PRINTING, "Printing"),
+        (PRINTED, "Printed"),
+        (FAILED, "Failed"),
+    )
+
+    ticket_id = models.ForeignKey(KitchenTicket, on_delete=models.CASCADE, related_name="print_jobs")
+    printer_id = models.ForeignKey(Printer, on_delete=models.CASCADE, related_name="jobs")
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    printed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"Ticket #{self.ticket_id_id} on {self.printer_id_id}: {self.status}"
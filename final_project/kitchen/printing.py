@@ -0,0 +1,191 @@
+"""
+Kitchen ticket printing.
+
+Tickets are not printed in the request which adds meals: PrintJob rows are
+written to an outbox in its transaction (see kitchen.tickets) and printed
+by a pool of workers (see the run_print_workers command). A worker claims
+due jobs of one printer, up to KITCHEN_PRINT_BATCH_SIZE of them, and sends
+them in one batch through the printer's transport. Claims are made by a
+conditional update, so jobs are never claimed by two workers, and claims
+of a stopped worker expire after KITCHEN_PRINT_CLAIM_TIMEOUT. Failed
+batches are retried with an exponential delay until
+KITCHEN_PRINT_MAX_ATTEMPTS is reached.
+
+Transports are pluggable, KITCHEN_PRINTER_TRANSPORTS maps Printer.transport
+to a Transport class.
+"""
+import datetime
+import logging
+import socket
+import uuid
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import KitchenTicketLine, PrintJob
+
+logger = logging.getLogger(__name__)
+
+
+class Transport:
+    """
+    Sends a batch of rendered tickets to a printer
+    """
+
+    def __init__(self, printer):
+        self.printer = printer
+
+    def send(self, documents):
+        raise NotImplementedError
+
+
+class FileTransport(Transport):
+    """
+    Appends tickets to the file at the printer's address, a stand-in printer for development and tests
+    """
+
+    def send(self, documents):
+        with open(self.printer.address, "ab") as printer_file:
+            printer_file.write(b"".join(documents))
+
+
+class SocketTransport(Transport):
+    """
+    Sends tickets as raw text to a network printer at host:port, usually port 9100
+    """
+
+    def send(self, documents):
+        host, port = self.printer.address.rsplit(":", 1)
+        with socket.create_connection((host, int(port)), timeout=settings.KITCHEN_PRINTER_TIMEOUT) as connection:
+            connection.sendall(b"".join(documents))
+
+
+def get_transport(printer):
+    return import_string(settings.KITCHEN_PRINTER_TRANSPORTS[printer.transport])(printer)
+
+
+def render(ticket):
+    """
+    Returns the printed text of a ticket, tickets are separated by a form feed
+    """
+    order = ticket.order_id
+    rows = [
+        f"Ticket #{ticket.pk}",
+        f"Table {order.table_id.name}, order #{order.pk}",
+        timezone.localtime(ticket.created).strftime("%Y-%m-%d %H:%M"),
+        "",
+        *(f"{line.amount} x {line.meal_id.name}" for line in ticket.lines.all()),
+    ]
+
+    return ("\n".join(rows) + "\n\f").encode()
+
+
+def due_jobs(now, using=DEFAULT_DB_ALIAS):
+    """
+    Returns jobs which are waiting to be printed, claims of stopped workers included
+    """
+    expired = now - datetime.timedelta(seconds=settings.KITCHEN_PRINT_CLAIM_TIMEOUT)
+
+    return PrintJob.objects.using(using).filter(
+        Q(status=PrintJob.PENDING, next_attempt_at__lte=now) | Q(status=PrintJob.PRINTING, claimed_at__lt=expired)
+    )
+
+
+def claim(printer_id, limit=None, using=DEFAULT_DB_ALIAS):
+    """
+    Claims due jobs of a printer, oldest first, and returns them with their tickets
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    limit = limit or settings.KITCHEN_PRINT_BATCH_SIZE
+
+    candidates = list(
+        due_jobs(now, using).filter(printer_id=printer_id).order_by("pk").values_list("pk", flat=True)[:limit]
+    )
+    # Jobs claimed by another worker meanwhile are no longer due and are not updated
+    due_jobs(now, using).filter(pk__in=candidates).update(status=PrintJob.PRINTING, claimed_by=token, claimed_at=now)
+
+    lines = KitchenTicketLine.objects.using(using).select_related("meal_id").order_by("pk")
+    return list(
+        PrintJob.objects.using(using)
+        .filter(claimed_by=token, status=PrintJob.PRINTING)
+        .select_related("printer_id", "ticket_id__order_id__table_id")
+        .prefetch_related(Prefetch("ticket_id__lines", queryset=lines))
+        .order_by("pk")
+    )
+
+
+def fail(jobs, error, using=DEFAULT_DB_ALIAS):
+    """
+    Puts jobs back in the outbox to be retried later, jobs out of attempts are failed
+    """
+    now = timezone.now()
+
+    for job in jobs:
+        job.attempts += 1
+        job.last_error = str(error)
+        job.claimed_by, job.claimed_at = "", None
+
+        if job.attempts >= settings.KITCHEN_PRINT_MAX_ATTEMPTS:
+            job.status = PrintJob.FAILED
+        else:
+            job.status = PrintJob.PENDING
+            delay = settings.KITCHEN_PRINT_RETRY_DELAY * 2 ** (job.attempts - 1)
+            job.next_attempt_at = now + datetime.timedelta(seconds=delay)
+
+        job.save(
+            update_fields=["attempts", "last_error", "claimed_by", "claimed_at", "status", "next_attempt_at"],
+            using=using,
+        )
+
+
+def print_batch(printer_id, using=DEFAULT_DB_ALIAS):
+    """
+    Prints a batch of due jobs of a printer and returns the number of printed jobs
+    """
+    jobs = claim(printer_id, using=using)
+    if not jobs:
+        return 0
+
+    try:
+        get_transport(jobs[0].printer_id).send([render(job.ticket_id) for job in jobs])
+    except Exception as error:
+        logger.warning("Printing %s tickets on printer %s failed: %s", len(jobs), printer_id, error)
+        fail(jobs, error, using)
+        return 0
+
+    PrintJob.objects.using(using).filter(pk__in=[job.pk for job in jobs], claimed_by=jobs[0].claimed_by).update(
+        status=PrintJob.PRINTED, printed_at=timezone.now(), claimed_by="", claimed_at=None
+    )
+
+    return len(jobs)
+
+
+def print_in_thread(printer_id, using=DEFAULT_DB_ALIAS):
+    try:
+        return print_batch(printer_id, using)
+    finally:
+        # Connections are per thread, the ones of a pool thread are not closed by a request cycle
+        connections.close_all()
+
+
+def print_due(executor=None, using=DEFAULT_DB_ALIAS):
+    """
+    Prints a batch on every printer with due jobs, in parallel when an executor is given.
+    Returns the number of printed jobs
+    """
+    printers = list(
+        due_jobs(timezone.now(), using)
+        .filter(printer_id__is_active=True)
+        .values_list("printer_id", flat=True)
+        .distinct()
+        .order_by()
+    )
+
+    if executor is None:
+        return sum(print_batch(printer_id, using) for printer_id in printers)
+
+    return sum(executor.map(lambda printer_id: print_in_thread(printer_id, using), printers))
@@ -0,0 +1,255 @@
+"""
+In-memory index of pending kitchen tickets per department.
+
+Kitchen displays poll /kitchen/<department_id>/ all the time, so pending
+tickets are kept ready to serve in memory, {department id: {ticket id:
+ticket}} in the order tickets were created, and reading a queue does not
+touch the database. The index is loaded from the database on first use
+after the process starts, then every committed change of a ticket
+refreshes just that ticket (see kitchen.tickets). Each process keeps its
+own index: a generation counter in the shared cache (settings.CACHES) is
+bumped on every change, and the tickets changed are kept in the cache under
+that generation. A process which sees generations it has not applied
+itself refreshes the tickets changed in them, the same way, and reloads
+its index only when some of them are gone from the cache or it is more
+than KITCHEN_CATCH_UP_LIMIT generations behind. A counter evicted from the
+cache starts again from a random value, so it cannot come back to a
+generation a process has already applied.
+
+Along with tickets the index keeps "all day" counts, amounts of every meal
+pending per department, updated with the difference every refreshed
+ticket makes, in every process. Counts are reconciled with a single aggregate query over
+pending tickets once KITCHEN_RECONCILE_INTERVAL seconds have passed.
+"""
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Prefetch, Sum
+
+from .models import KitchenTicket, KitchenTicketLine
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "kitchen:generation"
+CHANGES_KEY = "kitchen:changes:{generation}"
+
+_lock = threading.RLock()
+_index = None
+_counts = None
+_generation = None
+_reconciled_at = None
+
+
+def pending_tickets(ticket_ids=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns pending tickets with their order, table and meals, oldest first
+    """
+    lines = KitchenTicketLine.objects.using(using).select_related("meal_id").order_by("pk")
+    tickets = (
+        KitchenTicket.objects.using(using)
+        .filter(done_at__isnull=True, order_id__is_open=True)
+        .select_related("order_id__table_id")
+        .prefetch_related(Prefetch("lines", queryset=lines))
+        .order_by("created", "pk")
+    )
+    if ticket_ids is not None:
+        tickets = tickets.filter(pk__in=ticket_ids)
+
+    return tickets
+
+
+def as_entry(ticket):
+    """
+    Returns a ticket as it is kept in the index and served
+    """
+    order = ticket.order_id
+    return {
+        "id": ticket.pk,
+        "department_id": ticket.department_id_id,
+        "order_id": order.pk,
+        "table_id": order.table_id_id,
+        "table": order.table_id.name,
+        "created": ticket.created,
+        "lines": [
+            {"meal_id": line.meal_id_id, "meal": line.meal_id.name, "amount": line.amount}
+            for line in ticket.lines.all()
+        ],
+    }
+
+
+def count(counts, entry, sign):
+    """
+    Adds amounts of a ticket's meals to {department id: {meal id: count}}, or takes them away
+    """
+    department = counts.setdefault(entry["department_id"], {})
+    for line in entry["lines"]:
+        meal = department.setdefault(line["meal_id"], {"meal_id": line["meal_id"], "meal": line["meal"], "pending": 0})
+        meal["pending"] += sign * line["amount"]
+        if meal["pending"] <= 0:
+            del department[line["meal_id"]]
+
+    if not department:
+        del counts[entry["department_id"]]
+
+
+def start_generation():
+    cache.add(GENERATION_KEY, random.getrandbits(48), timeout=None)
+
+
+def current_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        start_generation()
+        generation = cache.get(GENERATION_KEY)
+
+    return generation
+
+
+def bump_generation():
+    start_generation()
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Evicted between add and incr, every process reloads on its next read
+        return None
+
+
+def load(using=DEFAULT_DB_ALIAS):
+    """
+    Rebuilds the index from the database
+    """
+    global _index, _counts, _generation, _reconciled_at
+
+    with _lock:
+        # Read before loading, changes made meanwhile make the next read load again
+        generation = current_generation()
+        index, counts = {}, {}
+        for ticket in pending_tickets(using=using):
+            entry = index.setdefault(ticket.department_id_id, {})[ticket.pk] = as_entry(ticket)
+            count(counts, entry, 1)
+
+        _index, _counts, _generation, _reconciled_at = index, counts, generation, time.monotonic()
+
+    return index
+
+
+def apply(ticket_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Replaces tickets in the index and their meals in the counts with their committed state
+    """
+    fresh = {ticket.pk: ticket for ticket in pending_tickets(ticket_ids, using)}
+    for tickets in _index.values():
+        for ticket_id in ticket_ids:
+            if ticket_id in tickets:
+                count(_counts, tickets[ticket_id], -1)
+            if ticket_id not in fresh:
+                tickets.pop(ticket_id, None)
+
+    # A ticket stays in its department, updating it in place keeps its position in the queue
+    for ticket in fresh.values():
+        entry = _index.setdefault(ticket.department_id_id, {})[ticket.pk] = as_entry(ticket)
+        count(_counts, entry, 1)
+
+
+def catch_up(generation, using=DEFAULT_DB_ALIAS):
+    """
+    Applies the tickets changed in generations after the applied one up to generation, returns whether it could
+    """
+    global _generation
+
+    if generation is None or _generation is None or not 0 < generation - _generation <= settings.KITCHEN_CATCH_UP_LIMIT:
+        return False
+
+    keys = [CHANGES_KEY.format(generation=number) for number in range(_generation + 1, generation + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return False
+
+    apply(sorted(set().union(*changes.values())), using)
+    _generation = generation
+    return True
+
+
+def refresh(ticket_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Replaces tickets in the index with their committed state, done and deleted tickets are dropped
+    """
+    global _index
+
+    with _lock:
+        generation = bump_generation()
+        if generation is not None:
+            cache.set(CHANGES_KEY.format(generation=generation), list(ticket_ids), settings.KITCHEN_CHANGES_TIMEOUT)
+
+        if _index is not None and not catch_up(generation, using):
+            # Changes of other processes are gone from the cache, reload on the next read
+            _index = None
+
+
+def reconcile(using=DEFAULT_DB_ALIAS):
+    """
+    Replaces all day counts with the ones summed by the database, drift is logged
+    """
+    global _counts, _reconciled_at
+
+    rows = (
+        KitchenTicketLine.objects.using(using)
+        .filter(ticket_id__done_at__isnull=True, ticket_id__order_id__is_open=True)
+        .values("ticket_id__department_id", "meal_id", "meal_id__name")
+        .annotate(pending=Sum("amount"))
+        .order_by()
+    )
+    counts = {}
+    for row in rows:
+        if row["pending"] > 0:
+            counts.setdefault(row["ticket_id__department_id"], {})[row["meal_id"]] = {
+                "meal_id": row["meal_id"], "meal": row["meal_id__name"], "pending": row["pending"],
+            }
+
+    with _lock:
+        if _counts is not None and _counts != counts:
+            logger.warning("Kitchen all day counts drifted from pending tickets, reconciled")
+
+        _counts, _reconciled_at = counts, time.monotonic()
+
+    return counts
+
+
+def ensure_loaded():
+    generation = current_generation()
+    if _index is None or generation != _generation and not catch_up(generation):
+        load()
+    elif time.monotonic() - _reconciled_at >= settings.KITCHEN_RECONCILE_INTERVAL:
+        reconcile()
+
+
+def pending(department_id):
+    """
+    Returns pending tickets of a department, oldest first
+    """
+    with _lock:
+        ensure_loaded()
+
+        return list(_index.get(department_id, {}).values())
+
+
+def all_day(department_id=None):
+    """
+    Returns {department id: pending amounts of its meals}, of one department when it is given
+    """
+    with _lock:
+        ensure_loaded()
+
+        departments = [department_id] if department_id is not None else sorted(_counts)
+        return {
+            department: sorted(
+                (dict(meal) for meal in _counts.get(department, {}).values()),
+                key=lambda meal: (-meal["pending"], meal["meal_id"]),
+            )
+            for department in departments
+        }
@@ -0,0 +1,8 @@
+from rest_framework import serializers
+
+
+class AllDaySerializer(serializers.Serializer):
+    """
+    Responsible for validating parameters of the all day counts
+    """
+    department_id = serializers.IntegerField(required=False)
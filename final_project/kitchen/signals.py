@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from orders.models import Check, Order, Status
+from orders.signals import meals_added, meals_removed
+from . import tickets
+from .models import KitchenTicket
+
+
+@receiver(meals_added, sender=Order)
+def route_added_meals(sender, order, lines, using, **kwargs):
+    """
+    Splits meals added to an order into tickets of the departments which make them
+    """
+    tickets.create_tickets(order, lines, using)
+
+
+@receiver(meals_removed, sender=Order)
+def take_off_removed_meals(sender, order, lines, using, **kwargs):
+    """
+    Takes meals removed from an order off its pending tickets
+    """
+    tickets.remove_lines(order, lines, using)
+
+
+@receiver(post_save, sender=Status)
+def finish_served_order(sender, instance, created, raw=False, using=None, **kwargs):
+    """
+    Closes tickets of an order which has reached the last kitchen stage
+    """
+    if created and not raw and instance.name.strip().lower() == settings.KITCHEN_STAGES[-1].lower():
+        tickets.finish_order(instance.order_id, using)
+
+
+@receiver(post_save, sender=Check)
+def finish_checked_out_order(sender, instance, created, raw=False, using=None, **kwargs):
+    """
+    Closes tickets left on an order which is checked out
+    """
+    if created and not raw:
+        tickets.finish_order(instance.order_id, using)
+
+
+@receiver(post_delete, sender=KitchenTicket)
+def drop_deleted_ticket(sender, instance, using=None, **kwargs):
+    """
+    Drops tickets deleted along with their order from the queue
+    """
+    tickets.refresh_on_commit([instance.pk], using)
@@ -0,0 +1,125 @@
+import datetime
+import os
+import socket
+import tempfile
+import threading
+
+from django.test import TestCase
+from django.utils import timezone
+
+from kitchen.models import Printer, PrintJob
+from kitchen.printing import SocketTransport, Transport, claim, print_due
+from meals.tests.utils import DepartmentFactory, MealCategoryFactory, MealFactory
+from orders.tests.utils import OrderFactory, create_user_model
+
+
+class BrokenTransport(Transport):
+    """
+    Printer which is always offline
+    """
+
+    def send(self, documents):
+        raise ConnectionRefusedError("Printer is offline")
+
+
+class TestPrinting(TestCase):
+    """
+    Testing the kitchen ticket print outbox
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "grill.txt")
+
+        self.grill = DepartmentFactory()
+        self.printer = Printer.objects.create(
+            name="Grill", department_id=self.grill, transport="file", address=self.path
+        )
+        self.steak = MealFactory(category_id=MealCategoryFactory(department_id=self.grill))
+        self.beer = MealFactory()
+        self.order = OrderFactory(waiter_id=create_user_model())
+
+    def test_outbox_is_written_with_added_meals(self):
+        """
+        Testing that a print job is written for tickets of departments with printers only
+        """
+        self.order.add_lines([(self.steak, 2), (self.beer, 1)])
+
+        job = PrintJob.objects.get()
+        self.assertEqual((job.printer_id, job.status), (self.printer, PrintJob.PENDING))
+        self.assertEqual(job.ticket_id.department_id, self.grill)
+
+    def test_due_jobs_are_printed_in_batches(self):
+        """
+        Testing that due jobs of a printer are sent in one batch and marked as printed
+        """
+        self.order.add_lines([(self.steak, 2)])
+        self.order.add_lines([(self.steak, 1)])
+
+        self.assertEqual(print_due(), 2)
+        self.assertEqual(print_due(), 0)
+
+        with open(self.path) as printed:
+            tickets = printed.read().split("\f")
+        self.assertEqual(len(tickets), 3)
+        self.assertIn(f"2 x {self.steak.name}", tickets[0])
+        self.assertFalse(PrintJob.objects.exclude(status=PrintJob.PRINTED).exists())
+
+    def test_failed_jobs_are_retried_then_failed(self):
+        """
+        Testing that failed jobs are retried later and fail once they run out of attempts
+        """
+        Printer.objects.filter(pk=self.printer.pk).update(transport="broken")
+        self.order.add_lines([(self.steak, 1)])
+
+        transports = {"broken": "kitchen.tests.test_printing.BrokenTransport"}
+        with self.settings(KITCHEN_PRINTER_TRANSPORTS=transports, KITCHEN_PRINT_MAX_ATTEMPTS=2), \
+                self.assertLogs("kitchen.printing", "WARNING"):
+            self.assertEqual(print_due(), 0)
+
+            job = PrintJob.objects.get()
+            self.assertEqual((job.status, job.attempts), (PrintJob.PENDING, 1))
+            self.assertGreater(job.next_attempt_at, timezone.now())
+            self.assertEqual(print_due(), 0)
+
+            PrintJob.objects.update(next_attempt_at=timezone.now())
+            print_due()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), (PrintJob.FAILED, 2, "Printer is offline"))
+
+    def test_claims_are_exclusive_until_they_expire(self):
+        """
+        Testing that claimed jobs are not claimed again unless the claim has expired
+        """
+        self.order.add_lines([(self.steak, 1)])
+
+        self.assertEqual(len(claim(self.printer.id)), 1)
+        self.assertEqual(claim(self.printer.id), [])
+
+        PrintJob.objects.update(claimed_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(len(claim(self.printer.id)), 1)
+
+    def test_socket_transport(self):
+        """
+        Testing that the socket transport sends tickets to host:port
+        """
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        self.addCleanup(server.close)
+        received = []
+
+        def accept():
+            connection, _ = server.accept()
+            with connection:
+                received.append(connection.recv(1024))
+
+        thread = threading.Thread(target=accept)
+        thread.start()
+        self.printer.address = "127.0.0.1:%s" % server.getsockname()[1]
+        SocketTransport(self.printer).send([b"ticket\f"])
+        thread.join(5)
+
+        self.assertEqual(received, [b"ticket\f"])
@@ -0,0 +1,200 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from kitchen import queue
+from kitchen.models import KitchenTicket, KitchenTicketLine
+from meals.tests.utils import DepartmentFactory, MealCategoryFactory, MealFactory
+from orders.models import Check, Status
+from orders.tests.utils import OrderFactory, create_user_model
+
+
+class TestKitchenQueue(TransactionTestCase):
+    """
+    Testing department tickets and their in-memory queue
+    """
+
+    def setUp(self):
+        cache.clear()
+        queue.load()
+
+        self.grill, self.bar = DepartmentFactory(), DepartmentFactory()
+        self.steak = MealFactory(category_id=MealCategoryFactory(department_id=self.grill))
+        self.burger = MealFactory(category_id=MealCategoryFactory(department_id=self.grill))
+        self.beer = MealFactory(category_id=MealCategoryFactory(department_id=self.bar))
+        self.order = OrderFactory(waiter_id=create_user_model())
+
+    def test_added_meals_are_split_per_department(self):
+        """
+        Testing that a batch of meals makes one ticket per department
+        """
+        self.order.add_lines([(self.steak, 1), (self.beer, 2), (self.burger, 1)])
+
+        grill_tickets = queue.pending(self.grill.id)
+        bar_tickets = queue.pending(self.bar.id)
+
+        self.assertEqual(len(grill_tickets), 1)
+        self.assertEqual(
+            sorted((line["meal_id"], line["amount"]) for line in grill_tickets[0]["lines"]),
+            [(self.steak.id, 1), (self.burger.id, 1)],
+        )
+        self.assertEqual(bar_tickets[0]["lines"], [{"meal_id": self.beer.id, "meal": self.beer.name, "amount": 2}])
+        self.assertEqual(bar_tickets[0]["table"], self.order.table_id.name)
+
+    def test_queue_is_served_without_queries(self):
+        """
+        Testing that reading a loaded queue does not query the database
+        """
+        self.order.add_lines([(self.steak, 1)])
+
+        with CaptureQueriesContext(connection) as queries:
+            tickets = queue.pending(self.grill.id)
+
+        self.assertEqual(len(tickets), 1)
+        self.assertEqual(len(queries), 0)
+
+    def test_removed_meals_leave_tickets(self):
+        """
+        Testing that removed meals are taken off the newest tickets and empty tickets are deleted
+        """
+        class Request:
+            data = {"meal_id": self.steak.id, "amount": 2}
+
+        self.order.add_lines([(self.steak, 1)])
+        self.order.add_lines([(self.steak, 2), (self.beer, 1)])
+
+        self.order.remove_meal(Request())
+
+        self.assertEqual([ticket["lines"][0]["amount"] for ticket in queue.pending(self.grill.id)], [1])
+        self.assertEqual(KitchenTicket.objects.filter(department_id=self.grill).count(), 1)
+        self.assertEqual(len(queue.pending(self.bar.id)), 1)
+
+    def test_queue_is_rebuilt_from_database(self):
+        """
+        Testing that a fresh index is loaded with pending tickets only
+        """
+        self.order.add_lines([(self.steak, 1), (self.beer, 1)])
+        KitchenTicket.objects.filter(department_id=self.bar).update(done_at="2020-01-01T00:00:00Z")
+
+        index = queue.load()
+
+        self.assertEqual(list(index), [self.grill.id])
+
+    def test_other_process_change_reloads_queue(self):
+        """
+        Testing that a generation bumped elsewhere makes the index reload
+        """
+        self.order.add_lines([(self.steak, 1)])
+        KitchenTicket.objects.all().delete()
+        queue.bump_generation()
+
+        self.assertEqual(queue.pending(self.grill.id), [])
+
+    def test_other_process_change_is_caught_up(self):
+        """
+        Testing that tickets changed by another process are refreshed here without reloading the index
+        """
+        self.order.add_lines([(self.steak, 1)])
+        self.assertEqual(len(queue.pending(self.grill.id)), 1)
+
+        # Another process has no index loaded, it only records what it changed
+        index, queue._index = queue._index, None
+        OrderFactory(waiter_id=create_user_model()).add_lines([(self.steak, 2), (self.beer, 1)])
+        queue._index = index
+
+        with mock.patch("kitchen.queue.load") as load:
+            self.assertEqual(len(queue.pending(self.grill.id)), 2)
+            self.assertEqual(queue.all_day()[self.grill.id][0]["pending"], 3)
+            self.assertEqual(queue.all_day()[self.bar.id][0]["pending"], 1)
+
+        load.assert_not_called()
+
+    def test_evicted_generation_does_not_repeat(self):
+        """
+        Testing that a generation evicted from the cache does not start again where a process has been
+        """
+        self.order.add_lines([(self.steak, 1)])
+        self.assertEqual(len(queue.pending(self.grill.id)), 1)
+
+        cache.delete(queue.GENERATION_KEY)
+        KitchenTicket.objects.all().delete()
+        queue.bump_generation()
+
+        self.assertEqual(queue.pending(self.grill.id), [])
+
+    def test_all_day_counts(self):
+        """
+        Testing that pending amounts per department and meal follow adds, removes, statuses and checks
+        """
+        class Request:
+            data = {"meal_id": self.steak.id, "amount": 1}
+
+        other_order = OrderFactory(waiter_id=create_user_model())
+        self.order.add_lines([(self.steak, 2), (self.beer, 1)])
+        other_order.add_lines([(self.steak, 1), (self.burger, 4)])
+        self.order.remove_meal(Request())
+
+        self.assertEqual(
+            [(meal["meal_id"], meal["pending"]) for meal in queue.all_day(self.grill.id)[self.grill.id]],
+            [(self.burger.id, 4), (self.steak.id, 2)],
+        )
+
+        Status.objects.create(order_id=other_order, name=" Served ")
+        self.assertEqual([meal["pending"] for meal in queue.all_day()[self.grill.id]], [1])
+
+        Check.objects.create_check(order_id=self.order)
+        self.assertEqual(queue.all_day(), {})
+
+    def test_counts_are_reconciled(self):
+        """
+        Testing that reconciliation replaces counts which drifted from pending tickets
+        """
+        self.order.add_lines([(self.beer, 3)])
+        KitchenTicketLine.objects.update(amount=5)
+
+        self.assertEqual(queue.all_day()[self.bar.id][0]["pending"], 3)
+        with self.settings(KITCHEN_RECONCILE_INTERVAL=0), self.assertLogs("kitchen.queue", "WARNING"):
+            self.assertEqual(queue.all_day()[self.bar.id][0]["pending"], 5)
+
+    def test_kitchen_endpoints(self):
+        """
+        Testing kitchen/<department_id>/ and kitchen/tickets/<pk>/done/ endpoints
+        """
+        self.order.add_lines([(self.steak, 1)])
+        client = APIClient()
+        client.force_authenticate(create_user_model())
+
+        response = client.get(reverse("kitchen-queue", args=[self.grill.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ticket_id = response.data["tickets"][0]["id"]
+
+        response = client.post(reverse("kitchen-ticket-done", args=[ticket_id]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(client.get(reverse("kitchen-queue", args=[self.grill.id])).data["tickets"], [])
+        self.assertEqual(
+            client.post(reverse("kitchen-ticket-done", args=[ticket_id])).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_all_day_endpoint(self):
+        """
+        Testing kitchen/allDay/ endpoint
+        """
+        self.order.add_lines([(self.steak, 2), (self.beer, 1)])
+        client = APIClient()
+        client.force_authenticate(create_user_model())
+
+        response = client.get(reverse("kitchen-all-day"), {"department_id": self.bar.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["departments"], [{
+            "department_id": self.bar.id,
+            "meals": [{"meal_id": self.beer.id, "meal": self.beer.name, "pending": 1}],
+        }])
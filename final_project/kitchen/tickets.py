@@ -0,0 +1,107 @@
+"""
+Kitchen tickets: meals added to an order are split into one ticket per
+department which makes them, taken off tickets when they are removed from
+the order and closed when the department is done with them, or when the
+order is served or checked out. New tickets are put in the print outbox of
+their department's printers in the same transaction. Committed
+changes are applied to the in-memory queue (see kitchen.queue).
+"""
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from meals.models import Meal
+from . import queue
+from .models import KitchenTicket, KitchenTicketLine, Printer, PrintJob
+
+
+def refresh_on_commit(ticket_ids, using=DEFAULT_DB_ALIAS):
+    ticket_ids = list(ticket_ids)
+    if ticket_ids:
+        transaction.on_commit(lambda: queue.refresh(ticket_ids, using), using=using)
+
+
+def create_tickets(order, lines, using=DEFAULT_DB_ALIAS):
+    """
+    Creates a ticket per department of {meal id: amount} added to an order and returns them
+    """
+    departments = {}
+    for meal_id, department_id in Meal.objects.using(using).filter(pk__in=lines).values_list(
+        "pk", "category_id__department_id"
+    ):
+        departments.setdefault(department_id, []).append(meal_id)
+
+    with transaction.atomic(using=using):
+        tickets = [
+            (KitchenTicket.objects.using(using).create(order_id=order, department_id_id=department_id), meal_ids)
+            for department_id, meal_ids in sorted(departments.items())
+        ]
+        KitchenTicketLine.objects.using(using).bulk_create([
+            KitchenTicketLine(ticket_id=ticket, meal_id_id=meal_id, amount=lines[meal_id])
+            for ticket, meal_ids in tickets
+            for meal_id in sorted(meal_ids)
+        ])
+
+        printers = {}
+        for printer in Printer.objects.using(using).filter(department_id__in=departments, is_active=True):
+            printers.setdefault(printer.department_id_id, []).append(printer)
+        PrintJob.objects.using(using).bulk_create([
+            PrintJob(ticket_id=ticket, printer_id=printer)
+            for ticket, _ in tickets
+            for printer in printers.get(ticket.department_id_id, [])
+        ])
+
+        refresh_on_commit((ticket.pk for ticket, _ in tickets), using)
+
+    return [ticket for ticket, _ in tickets]
+
+
+def remove_lines(order, lines, using=DEFAULT_DB_ALIAS):
+    """
+    Takes {meal id: amount} removed from an order off its pending tickets, newest tickets first.
+    Tickets left without meals are deleted
+    """
+    remaining = dict(lines)
+    changed = set()
+
+    with transaction.atomic(using=using):
+        pending_lines = KitchenTicketLine.objects.using(using).filter(
+            ticket_id__order_id=order, ticket_id__done_at__isnull=True, meal_id__in=remaining
+        ).order_by("-ticket_id__created", "-ticket_id")
+
+        for line in pending_lines:
+            taken = min(line.amount, remaining[line.meal_id_id])
+            if taken <= 0:
+                continue
+
+            remaining[line.meal_id_id] -= taken
+            changed.add(line.ticket_id_id)
+            if taken == line.amount:
+                line.delete()
+            else:
+                KitchenTicketLine.objects.using(using).filter(pk=line.pk).update(amount=F("amount") - taken)
+
+        KitchenTicket.objects.using(using).filter(pk__in=changed, lines__isnull=True).delete()
+        refresh_on_commit(changed, using)
+
+
+def finish(ticket, using=DEFAULT_DB_ALIAS):
+    """
+    Marks a ticket as done, it leaves the queue of its department
+    """
+    ticket.done_at = timezone.now()
+    ticket.save(update_fields=["done_at"], using=using)
+    refresh_on_commit([ticket.pk], using)
+
+    return ticket
+
+
+def finish_order(order, using=DEFAULT_DB_ALIAS):
+    """
+    Marks all pending tickets of an order as done
+    """
+    pending = KitchenTicket.objects.using(using).filter(order_id=order, done_at__isnull=True)
+    ticket_ids = list(pending.values_list("pk", flat=True))
+
+    KitchenTicket.objects.using(using).filter(pk__in=ticket_ids).update(done_at=timezone.now())
+    refresh_on_commit(ticket_ids, using)
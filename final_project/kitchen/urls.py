@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("kitchen/<int:department_id>/", views.KitchenQueueView.as_view(), name="kitchen-queue"),
+    path("kitchen/allDay/", views.AllDayView.as_view(), name="kitchen-all-day"),
+    path("kitchen/tickets/<int:pk>/done/", views.TicketDoneView.as_view(), name="kitchen-ticket-done"),
+]
@@ -0,0 +1,51 @@
+from rest_framework import status
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.mixins import TransactionPolicyMixin
+from . import queue, serializers, tickets
+from .models import KitchenTicket
+
+
+class KitchenQueueView(APIView):
+    """
+    Responsible for pending tickets of a department, oldest first.
+    Served from the in-memory queue, the database is not queried
+    """
+
+    def get(self, request, department_id, *args, **kwargs):
+        return Response({
+            "department_id": department_id,
+            "tickets": queue.pending(department_id),
+        })
+
+
+class AllDayView(APIView):
+    """
+    Responsible for amounts of every meal pending on open orders per department, the "all day" count.
+    Accepts an optional department_id query parameter, served from memory like the queues
+    """
+
+    def get(self, request, *args, **kwargs):
+        params = serializers.AllDaySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        counts = queue.all_day(params.validated_data.get("department_id"))
+
+        return Response({
+            "departments": [
+                {"department_id": department_id, "meals": meals} for department_id, meals in counts.items()
+            ],
+        })
+
+
+class TicketDoneView(TransactionPolicyMixin, APIView):
+    """
+    Responsible for marking a pending ticket as done
+    """
+
+    def post(self, request, pk, *args, **kwargs):
+        ticket = get_object_or_404(KitchenTicket, pk=pk, done_at__isnull=True)
+        tickets.finish(ticket)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MealsConfig(AppConfig):
     name = 'meals'
+
+    def ready(self):
+        from . import signals  # noqa: F401
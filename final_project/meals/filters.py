@@ -0,0 +1,8 @@
+from rest_framework.filters import OrderingFilter
+
+
+class MealOrderingFilter(OrderingFilter):
+    """
+    Lets clients order meals, by popularity too, e.g. ?ordering=-ordered_7_days
+    """
+    ordering_fields = ("name", "price", "ordered_7_days", "ordered_30_days")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from meals import popularity
+
+
+class Command(BaseCommand):
+    """
+    Moves the popularity windows of meals and categories to the current day
+    """
+    help = "Recomputes rolling 7 and 30 day popularity of meals, run it once a day"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild", action="store_true", help="Recompute ordered amounts per day from order lines first"
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to refresh")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            popularity.rebuild(using=options["database"])
+        else:
+            popularity.refresh(using=options["database"])
+
+        self.stdout.write(self.style.SUCCESS("Meal popularity refreshed"))
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.8 on 2026-10-19 11:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meal',
+            name='ordered_30_days',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='ordered_7_days',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mealcategory',
+            name='ordered_30_days',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mealcategory',
+            name='ordered_7_days',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='DailyMealOrders',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('amount', models.IntegerField(default=0)),
+                ('meal_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_orders', to='meals.Meal')),
+            ],
+            options={
+                'unique_together': {('day', 'meal_id')},
+            },
+        ),
+    ]
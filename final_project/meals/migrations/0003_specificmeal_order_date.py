@@ -0,0 +1,33 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_order_dates(apps, schema_editor):
+    SpecificMeal = apps.get_model("meals", "SpecificMeal")
+    Order = apps.get_model("orders", "Order")
+
+    SpecificMeal.objects.using(schema_editor.connection.alias).update(
+        order_date=Subquery(Order.objects.filter(pk=OuterRef("order_id")).values("date")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_history_order_date'),
+        ('meals', '0002_meal_popularity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='specificmeal',
+            name='order_date',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(fill_order_dates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='specificmeal',
+            name='order_date',
+            field=models.DateTimeField(),
+        ),
+    ]
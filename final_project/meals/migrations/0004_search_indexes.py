@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Indexes of meals.search on Postgres, the document is the expression of SearchVector("name", "description")
+SEARCH_INDEXES = (
+    "CREATE INDEX meals_meal_search_document ON meals_meal USING gin "
+    "(to_tsvector('simple'::regconfig, COALESCE(name, '') || ' ' || COALESCE(description, '')))",
+    "CREATE INDEX meals_meal_search_name_trigram ON meals_meal USING gin (name gin_trgm_ops)",
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for statement in SEARCH_INDEXES:
+        schema_editor.execute(statement)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS meals_meal_search_document")
+    schema_editor.execute("DROP INDEX IF EXISTS meals_meal_search_name_trigram")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0003_specificmeal_order_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
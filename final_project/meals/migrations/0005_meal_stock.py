@@ -0,0 +1,23 @@
+# Generated by Django 2.2.8 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0004_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meal',
+            name='is_available',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
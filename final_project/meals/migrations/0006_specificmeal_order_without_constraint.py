@@ -0,0 +1,23 @@
+# Generated by Django 2.2.8 on 2026-10-19 13:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # orders 0006_partitioning drops the constraint on Postgres, other databases keep it
+
+    dependencies = [
+        ('meals', '0005_meal_stock'),
+        ('orders', '0006_partitioning'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='specificmeal',
+                name='order_id',
+                field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='meals_id', to='orders.Order'),
+            ),
+        ]),
+    ]
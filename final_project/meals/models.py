@@ -22,6 +22,9 @@ class MealCategory(models.Model):
     department_id = models.ForeignKey(
         Department, on_delete=models.CASCADE, related_name="categories"
     )
+    # Rolling popularity, kept by meals.popularity
+    ordered_7_days = models.IntegerField(default=0)
+    ordered_30_days = models.IntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -38,6 +41,12 @@ class Meal(models.Model):
     )
     price = models.IntegerField()
     description = models.TextField()
+    # Rolling popularity, kept by meals.popularity
+    ordered_7_days = models.IntegerField(default=0)
+    ordered_30_days = models.IntegerField(default=0)
+    # Stop-list and portions left, meals without a stock are not counted, see meals.stock
+    is_available = models.BooleanField(default=True)
+    stock = models.PositiveIntegerField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.name} - {self.price} - {self.description}"
@@ -49,7 +58,15 @@ class SpecificMeal(models.Model):
     """
     meal_id = models.ForeignKey(Meal, on_delete=models.CASCADE, related_name="specific_meals")
     amount = models.IntegerField()
-    order_id = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="meals_id")
+    order_id = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="meals_id", db_constraint=False)
+    # Date of the order, lines are partitioned by it together with orders
+    order_date = models.DateTimeField()
+
+    def save(self, *args, **kwargs):
+        if self.order_date is None:
+            self.order_date = self.order_id.date
+
+        super().save(*args, **kwargs)
 
     def get_total_price(self):
         """
@@ -58,3 +75,18 @@ class SpecificMeal(models.Model):
         total = self.meal_id.price * self.amount
 
         return total
+
+
+class DailyMealOrders(models.Model):
+    """
+    Responsible to keep amount of a meal ordered per day, source of rolling popularity
+    """
+    day = models.DateField()
+    meal_id = models.ForeignKey(Meal, on_delete=models.CASCADE, related_name="daily_orders")
+    amount = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("day", "meal_id")
+
+    def __str__(self):
+        return f"{self.day}, {self.meal_id_id} x{self.amount}"
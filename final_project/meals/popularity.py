@@ -0,0 +1,137 @@
+"""
+Rolling meal popularity.
+
+Meal and MealCategory keep how many portions were ordered in the last 7 and
+30 days, so menus are sorted by popularity without aggregating order lines.
+DailyMealOrders holds the ordered amount per day and meal. Adding meals to
+an order or removing them updates its day and the counters once the order
+is committed, in a short transaction of their own (see meals.signals):
+every order touches the rows of the days, meals and categories it takes,
+holding their locks until the order commits would serialize orders on the
+most popular ones. refresh() recomputes the counters from the days which
+are still inside the windows and has to run once a day,
+refresh_meal_popularity. Updates lost with a process stopped right after
+a commit are recovered by rebuild(), which recomputes the days from order
+lines.
+"""
+import datetime
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Case, F, IntegerField, Sum, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.counters import increment
+from orders.models import SpecificMealHistory
+from .models import DailyMealOrders, Meal, MealCategory
+
+# Counter field -> window length in days, today included
+WINDOWS = {
+    "ordered_7_days": 7,
+    "ordered_30_days": 30,
+}
+
+
+def window_start(days, today):
+    return today - datetime.timedelta(days=days - 1)
+
+
+def windows_of(day, today=None):
+    """
+    Returns counter fields whose window includes day
+    """
+    today = today or timezone.localdate()
+
+    return [field for field, days in WINDOWS.items() if window_start(days, today) <= day <= today]
+
+
+def record(lines, day, sign=1, using=DEFAULT_DB_ALIAS):
+    """
+    Adds {meal id: amount} ordered on day to the popularity of the day, or takes it away with sign -1,
+    once the transaction is committed
+    """
+    lines = dict(lines)
+    transaction.on_commit(lambda: count(lines, day, sign, using), using=using)
+
+
+def count(lines, day, sign=1, using=DEFAULT_DB_ALIAS):
+    """
+    Adds {meal id: amount} ordered on day to the day and to the counters of meals and their categories
+    whose windows include it, or takes it away with sign -1
+    """
+    fields = windows_of(day)
+    meal_ids = sorted(lines)
+
+    with transaction.atomic(using=using):
+        category_of = dict(Meal.objects.using(using).filter(pk__in=meal_ids).values_list("pk", "category_id"))
+        categories = {}
+
+        # Rows are updated in id order, so concurrent orders do not deadlock each other
+        for meal_id in meal_ids:
+            if meal_id not in category_of:
+                # Deleted in the meantime
+                continue
+
+            amount = sign * lines[meal_id]
+            increment(DailyMealOrders, {"day": day, "meal_id_id": meal_id}, {"amount": amount}, using)
+            if fields:
+                Meal.objects.using(using).filter(pk=meal_id).update(**{field: F(field) + amount for field in fields})
+                categories[category_of[meal_id]] = categories.get(category_of[meal_id], 0) + amount
+
+        for category_id in sorted(categories):
+            amount = categories[category_id]
+            MealCategory.objects.using(using).filter(pk=category_id).update(
+                **{field: F(field) + amount for field in fields}
+            )
+
+
+def refresh(today=None, using=DEFAULT_DB_ALIAS):
+    """
+    Recomputes popularity counters from the days inside the windows and drops older days
+    """
+    today = today or timezone.localdate()
+    oldest = window_start(max(WINDOWS.values()), today)
+    sums = {
+        field: Sum(Case(
+            When(day__gte=window_start(days, today), then=F("amount")),
+            default=0,
+            output_field=IntegerField(),
+        ))
+        for field, days in WINDOWS.items()
+    }
+    reset = {field: 0 for field in WINDOWS}
+
+    with transaction.atomic(using=using):
+        DailyMealOrders.objects.using(using).filter(day__lt=oldest).delete()
+        recent = DailyMealOrders.objects.using(using).filter(day__gte=oldest, day__lte=today)
+
+        Meal.objects.using(using).exclude(**reset).update(**reset)
+        for row in recent.values("meal_id").annotate(**sums).order_by("meal_id"):
+            Meal.objects.using(using).filter(pk=row.pop("meal_id")).update(**row)
+
+        MealCategory.objects.using(using).exclude(**reset).update(**reset)
+        for row in recent.values("meal_id__category_id").annotate(**sums).order_by("meal_id__category_id"):
+            MealCategory.objects.using(using).filter(pk=row.pop("meal_id__category_id")).update(**row)
+
+
+def rebuild(today=None, using=DEFAULT_DB_ALIAS):
+    """
+    Recomputes ordered amounts per day from order lines inside the windows, then the counters
+    """
+    today = today or timezone.localdate()
+    oldest = window_start(max(WINDOWS.values()), today)
+    lines = (
+        SpecificMealHistory.objects.using(using)
+        .annotate(day=TruncDate("order_date"))
+        .filter(day__gte=oldest, day__lte=today)
+        .values("day", "meal_id")
+        .annotate(ordered=Sum("amount"))
+        .order_by()
+    )
+
+    with transaction.atomic(using=using):
+        DailyMealOrders.objects.using(using).all().delete()
+        DailyMealOrders.objects.using(using).bulk_create([
+            DailyMealOrders(day=row["day"], meal_id_id=row["meal_id"], amount=row["ordered"]) for row in lines
+        ])
+        refresh(today, using)
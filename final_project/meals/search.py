@@ -0,0 +1,209 @@
+"""
+Search of meals by name and description.
+
+Waiters type the start of a word, so every word of a query matches words
+which begin with it, and meals must match all the words of a query.
+
+On Postgres meals are searched with full text search over name and
+description ('simple' configuration, prefix queries) together with
+trigram similarity of the name, which catches typos. Both are backed by
+GIN indexes, see migration 0004_search_indexes, and results are ranked by
+the sum of both.
+
+Other databases, e.g. SQLite in tests, use an inverted index kept in
+memory: {word: {meal id: weight}} with the words sorted, so the words
+beginning with a prefix are a range found by bisection. Words of the name
+weigh more than ones of the description. The index is loaded on first use
+and every committed save or delete of a meal refreshes that meal (see
+meals.signals). Like the kitchen queue, each process keeps its own index
+and reloads it when the generation counter in the cache shows a change it
+has not applied itself.
+"""
+import bisect
+import heapq
+import random
+import re
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .models import Meal
+
+GENERATION_KEY = "meals:search:generation"
+
+WORD = re.compile(r"\w+")
+NAME_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+_lock = threading.RLock()
+_postings = None
+_words = None
+_meal_words = None
+_names = None
+_generation = None
+
+
+def words(text):
+    return WORD.findall(text.lower())
+
+
+def search(query, limit=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns ids of meals matching query, best matches first
+    """
+    terms = words(query)
+    if not terms:
+        return []
+
+    limit = limit or settings.MEAL_SEARCH_LIMIT
+    if connections[using].vendor == "postgresql":
+        return search_database(query, terms, limit, using)
+
+    return search_index(terms, limit, using)
+
+
+def search_database(query, terms, limit, using=DEFAULT_DB_ALIAS):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+    from django.db.models import F, Q
+
+    # Same expression as the index, terms are word characters only
+    vector = SearchVector("name", "description", config="simple")
+    prefixes = SearchQuery(" & ".join(f"{term}:*" for term in terms), config="simple", search_type="raw")
+
+    meals = (
+        Meal.objects.using(using)
+        .annotate(document=vector, rank=SearchRank(vector, prefixes) + TrigramSimilarity("name", query))
+        .filter(Q(document=prefixes) | Q(name__trigram_similar=query))
+        .order_by(F("rank").desc(), "name", "pk")
+        .values_list("pk", flat=True)
+    )
+    return list(meals[:limit])
+
+
+def meal_words(meal):
+    """
+    Returns {word: weight} of a meal
+    """
+    weights = {}
+    for word in words(meal.description):
+        weights[word] = DESCRIPTION_WEIGHT
+    for word in words(meal.name):
+        weights[word] = NAME_WEIGHT
+
+    return weights
+
+
+def start_generation():
+    # A random start, so a counter evicted from the cache does not repeat a generation a process has applied
+    cache.add(GENERATION_KEY, random.getrandbits(48), timeout=None)
+
+
+def current_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        start_generation()
+        generation = cache.get(GENERATION_KEY)
+
+    return generation
+
+
+def bump_generation():
+    start_generation()
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Evicted between add and incr, every process reloads on its next search
+        return None
+
+
+def add(meal):
+    weights = meal_words(meal)
+    for word, weight in weights.items():
+        if word not in _postings:
+            bisect.insort(_words, word)
+            _postings[word] = {}
+        _postings[word][meal.pk] = weight
+
+    _meal_words[meal.pk] = list(weights)
+    _names[meal.pk] = meal.name.lower()
+
+
+def remove(meal_id):
+    for word in _meal_words.pop(meal_id, ()):
+        postings = _postings[word]
+        postings.pop(meal_id, None)
+        if not postings:
+            del _postings[word]
+            del _words[bisect.bisect_left(_words, word)]
+
+    _names.pop(meal_id, None)
+
+
+def load(using=DEFAULT_DB_ALIAS):
+    """
+    Rebuilds the index from the database
+    """
+    global _postings, _words, _meal_words, _names, _generation
+
+    with _lock:
+        # Read before loading, changes made meanwhile make the next search load again
+        generation = current_generation()
+        _postings, _words, _meal_words, _names = {}, [], {}, {}
+        for meal in Meal.objects.using(using).only("name", "description").iterator():
+            add(meal)
+
+        _generation = generation
+
+
+def refresh(meal_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Replaces meals in the index with their committed state, deleted meals are dropped
+    """
+    global _postings, _generation
+
+    with _lock:
+        generation = bump_generation()
+        if _postings is None:
+            return
+
+        if generation is None or _generation is None or generation != _generation + 1:
+            # Another process has changed meals too, reload on the next search
+            _postings = None
+            return
+
+        for meal_id in meal_ids:
+            remove(meal_id)
+        for meal in Meal.objects.using(using).filter(pk__in=meal_ids).only("name", "description"):
+            add(meal)
+
+        _generation = generation
+
+
+def search_index(terms, limit, using=DEFAULT_DB_ALIAS):
+    with _lock:
+        if _postings is None or current_generation() != _generation:
+            load(using)
+
+        scores = None
+        for term in set(terms):
+            start = bisect.bisect_left(_words, term)
+            end = bisect.bisect_left(_words, term + "\uffff", start)
+
+            matches = {}
+            for word in _words[start:end]:
+                for meal_id, weight in _postings[word].items():
+                    if matches.get(meal_id, 0) < weight:
+                        matches[meal_id] = weight
+            # A whole word outweighs a word it only begins
+            for meal_id, weight in _postings.get(term, {}).items():
+                matches[meal_id] = 2 * weight
+
+            if scores is not None:
+                matches = {meal_id: score + matches[meal_id] for meal_id, score in scores.items() if meal_id in matches}
+            scores = matches
+            if not scores:
+                return []
+
+        return heapq.nsmallest(limit, scores, key=lambda meal_id: (-scores[meal_id], _names[meal_id], meal_id))
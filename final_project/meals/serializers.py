@@ -28,8 +28,10 @@ class MealCategorySerializer(serializers.ModelSerializer):
             "id",
             "name",
             "department_id",
+            "ordered_7_days",
+            "ordered_30_days",
         )
-        read_only_fields = ("id",)
+        read_only_fields = ("id", "ordered_7_days", "ordered_30_days")
 
 
 class MealSerializer(serializers.ModelSerializer):
@@ -47,9 +49,21 @@ class MealSerializer(serializers.ModelSerializer):
             "category_id",
             "name",
             "price",
-            "description"
+            "description",
+            "ordered_7_days",
+            "ordered_30_days",
+            "is_available",
+            "stock",
         )
-        read_only_fields = ("id",)
+        read_only_fields = ("id", "ordered_7_days", "ordered_30_days")
+
+
+class MealSearchSerializer(serializers.Serializer):
+    """
+    Responsible for validating parameters of a meal search
+    """
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=100, required=False)
 
 
 class CategoriesByDep(serializers.ModelSerializer):
@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from orders.models import Order
+from orders.signals import meals_added, meals_removed
+from . import popularity, search, stock
+from .models import Meal, SpecificMeal
+
+
+@receiver(meals_added, sender=Order)
+def count_added_meals(sender, order, lines, using, **kwargs):
+    """
+    Adds meals put on an order to the popularity of the order's day
+    """
+    popularity.record(lines, timezone.localdate(order.date), 1, using)
+
+
+@receiver(meals_removed, sender=Order)
+def discount_removed_meals(sender, order, lines, using, **kwargs):
+    """
+    Takes meals taken off an order out of the popularity of the order's day
+    """
+    popularity.record(lines, timezone.localdate(order.date), -1, using)
+
+
+@receiver(meals_removed, sender=Order)
+def restore_stock(sender, order, lines, using, **kwargs):
+    """
+    Returns portions of meals taken off an order to stock
+    """
+    stock.give_back(lines, using)
+
+
+@receiver(post_delete, sender=SpecificMeal)
+def restore_deleted_stock(sender, instance, using=None, **kwargs):
+    """
+    Returns portions of a meal deleted from an open order to stock, alone or along with its order.
+    Lines deleted by Order.remove_meal have no amount left, their portions are given back by restore_stock
+    """
+    if instance.amount > 0 and Order.objects.using(using).filter(pk=instance.order_id_id, is_open=True).exists():
+        stock.give_back({instance.meal_id_id: instance.amount}, using)
+
+
+@receiver(post_save, sender=Meal)
+@receiver(post_delete, sender=Meal)
+def refresh_search(sender, instance, using, **kwargs):
+    """
+    Refreshes the meal in the search index once the change is committed
+    """
+    meal_id = instance.pk
+    transaction.on_commit(lambda: search.refresh([meal_id], using), using=using)
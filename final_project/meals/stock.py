@@ -0,0 +1,71 @@
+"""
+Meal availability and portion stock.
+
+A meal on the stop-list (Meal.is_available is false) cannot be ordered.
+A meal with a stock, the number of portions left, can be ordered while
+there are enough portions, meals without one are not counted. Portions
+are taken when meals are added to an order (Order.add_lines) with one
+conditional UPDATE ... SET stock = stock - n WHERE stock >= n per meal, so
+concurrent orders lock only the rows of the meals they take and never sell
+more than there is. Portions come back when meals are removed from an
+open order, or deleted from it along with the order. Quiet deletes of the
+archive send no signals and give nothing back, archived orders are closed.
+
+Meals which sell out or come back drop the meals autocomplete index of
+every process once committed (its generation is in the shared cache), so
+tablets see them right away.
+"""
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+
+from core import autocomplete
+from .models import Meal
+
+
+class SoldOut(IntegrityError):
+    """
+    Raised when meals added to an order are on the stop-list or have fewer portions left than ordered
+    """
+
+    def __init__(self, meal_ids):
+        self.meal_ids = sorted(meal_ids)
+        super().__init__(f"Meals are sold out: {', '.join(map(str, self.meal_ids))}")
+
+
+def refresh_menu_on_commit(using=DEFAULT_DB_ALIAS):
+    transaction.on_commit(lambda: autocomplete.invalidate("meals"), using=using)
+
+
+def take(lines, using=DEFAULT_DB_ALIAS):
+    """
+    Takes portions of {meal id: amount} out of stock, all of them or none: raises SoldOut.
+    Must run in the transaction which adds the meals
+    """
+    meals = Meal.objects.using(using).filter(pk__in=lines)
+    sold_out = set(lines) - set(meals.filter(is_available=True).values_list("pk", flat=True))
+
+    # Rows are updated in the order of their ids, concurrent orders lock them in the same order
+    counted = sorted(meals.filter(is_available=True, stock__isnull=False).values_list("pk", flat=True))
+    for meal_id in counted:
+        amount = lines[meal_id]
+        if not meals.filter(pk=meal_id, is_available=True, stock__gte=amount).update(stock=F("stock") - amount):
+            sold_out.add(meal_id)
+
+    if sold_out:
+        raise SoldOut(sold_out)
+
+    if counted and meals.filter(pk__in=counted, stock=0).exists():
+        refresh_menu_on_commit(using)
+
+
+def give_back(lines, using=DEFAULT_DB_ALIAS):
+    """
+    Returns portions of {meal id: amount} to stock
+    """
+    meals = Meal.objects.using(using).filter(pk__in=lines, stock__isnull=False)
+    for meal_id in sorted(lines):
+        meals.filter(pk=meal_id).update(stock=F("stock") + lines[meal_id])
+
+    # Meals which had no portions left are back
+    if any(stock == lines[meal_id] for meal_id, stock in meals.values_list("pk", "stock")):
+        refresh_menu_on_commit(using)
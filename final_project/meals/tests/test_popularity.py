@@ -0,0 +1,132 @@
+import datetime
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from meals import popularity
+from meals.models import DailyMealOrders, Meal
+from orders.tests.utils import OrderFactory, create_user_model
+from .utils import MealCategoryFactory, MealFactory
+
+MEALS_URL = reverse("meals")
+
+
+class TestMealPopularity(TransactionTestCase):
+    """
+    Testing rolling popularity of meals and categories
+    """
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.user = create_user_model()
+        self.category = MealCategoryFactory()
+        self.meal = MealFactory(category_id=self.category)
+        self.other_meal = MealFactory(category_id=self.category)
+
+    def test_added_meals_are_counted(self):
+        """
+        Testing that adding meals to orders updates meal and category counters
+        """
+        order = OrderFactory(waiter_id=self.user)
+        order.add_lines([(self.meal, 2), (self.other_meal, 1)])
+        order.add_lines([(self.meal, 3)])
+
+        self.meal.refresh_from_db()
+        self.category.refresh_from_db()
+
+        self.assertEqual((self.meal.ordered_7_days, self.meal.ordered_30_days), (5, 5))
+        self.assertEqual(self.category.ordered_7_days, 6)
+        self.assertEqual(DailyMealOrders.objects.get(meal_id=self.meal).amount, 5)
+
+    def test_removed_meals_are_discounted(self):
+        """
+        Testing that removing meals from an order takes them out of the counters
+        """
+        class Request:
+            data = {"meal_id": self.meal.id, "amount": 10}
+
+        order = OrderFactory(waiter_id=self.user)
+        order.add_lines([(self.meal, 2)])
+        order.remove_meal(Request())
+
+        self.meal.refresh_from_db()
+        self.assertEqual(self.meal.ordered_7_days, 0)
+
+    def test_counters_follow_the_commit(self):
+        """
+        Testing that the order transaction writes no popularity and the day and counters are updated
+        once it is committed
+        """
+        order = OrderFactory(waiter_id=self.user)
+
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            order.add_lines([(self.meal, 2)])
+            self.assertEqual(Meal.objects.get(pk=self.meal.pk).ordered_7_days, 0)
+
+        writes = (
+            'UPDATE "meals_mealcategory"', 'UPDATE "meals_dailymealorders"', 'INSERT INTO "meals_dailymealorders"',
+        )
+        self.assertFalse(any(write in query["sql"] for query in queries for write in writes))
+        self.assertEqual(Meal.objects.get(pk=self.meal.pk).ordered_7_days, 2)
+        self.assertEqual(DailyMealOrders.objects.get(meal_id=self.meal).amount, 2)
+
+    def test_refresh_moves_windows(self):
+        """
+        Testing that days leave the windows on refresh and old days are dropped
+        """
+        for days_ago, amount in ((2, 1), (10, 4), (40, 100)):
+            DailyMealOrders.objects.create(
+                day=self.today - datetime.timedelta(days=days_ago), meal_id=self.meal, amount=amount
+            )
+
+        popularity.refresh(self.today)
+        self.meal.refresh_from_db()
+        self.category.refresh_from_db()
+
+        self.assertEqual((self.meal.ordered_7_days, self.meal.ordered_30_days), (1, 5))
+        self.assertEqual((self.category.ordered_7_days, self.category.ordered_30_days), (1, 5))
+        self.assertEqual(DailyMealOrders.objects.count(), 2)
+
+        popularity.refresh(self.today + datetime.timedelta(days=25))
+        self.meal.refresh_from_db()
+        self.assertEqual((self.meal.ordered_7_days, self.meal.ordered_30_days), (0, 1))
+
+    def test_rebuild_from_order_lines(self):
+        """
+        Testing that counters are rebuilt from order lines
+        """
+        order = OrderFactory(waiter_id=self.user)
+        order.add_lines([(self.meal, 3)])
+        DailyMealOrders.objects.all().delete()
+        Meal.objects.update(ordered_7_days=0, ordered_30_days=0)
+
+        popularity.rebuild()
+
+        self.meal.refresh_from_db()
+        self.assertEqual(self.meal.ordered_30_days, 3)
+
+    def test_order_meals_by_popularity(self):
+        """
+        Testing that meals are listed by popularity on request
+        """
+        Meal.objects.filter(pk=self.other_meal.pk).update(ordered_7_days=10)
+
+        response = APIClient().get(MEALS_URL, {"ordering": "-ordered_7_days"})
+
+        self.assertEqual([meal["id"] for meal in response.data][:2], [self.other_meal.id, self.meal.id])
+
+    def test_order_meals_of_category_by_popularity(self):
+        """
+        Testing that meals of a category are listed by popularity on request
+        """
+        Meal.objects.filter(pk=self.meal.pk).update(ordered_30_days=10)
+
+        response = APIClient().get(
+            reverse("meals-by-category", args=[self.category.id]), {"ordering": "-ordered_30_days"}
+        )
+
+        self.assertEqual([meal["id"] for meal in response.data], [self.meal.id, self.other_meal.id])
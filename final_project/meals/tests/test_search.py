@@ -0,0 +1,90 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from meals import search
+from meals.models import Meal
+from meals.tests.utils import MealCategoryFactory, MealFactory
+
+MEALS_SEARCH_URL = reverse("meals-search")
+
+
+class TestMealSearch(TransactionTestCase):
+    """
+    Testing search of meals and its in-memory index
+    """
+
+    def setUp(self):
+        cache.clear()
+        search.load()
+
+        self.category = MealCategoryFactory()
+        self.soup = MealFactory(category_id=self.category, name="Tomato soup", description="Basil and cream")
+        self.pasta = MealFactory(category_id=self.category, name="Pasta", description="Tomato sauce and basil")
+        self.steak = MealFactory(category_id=self.category, name="Grilled steak", description="Pepper sauce")
+
+    def test_words_match_by_prefix(self):
+        """
+        Testing that meals match the start of words of their name and description
+        """
+        self.assertEqual(search.search("gri"), [self.steak.id])
+        self.assertEqual(search.search("Sauc"), [self.steak.id, self.pasta.id])
+        self.assertEqual(search.search("basil crea"), [self.soup.id])
+        self.assertEqual(search.search("oup"), [])
+
+    def test_name_ranks_above_description(self):
+        """
+        Testing that a match in the name outranks a match in the description
+        """
+        self.assertEqual(search.search("tomato"), [self.soup.id, self.pasta.id])
+        self.assertEqual(search.search("tomato", limit=1), [self.soup.id])
+
+    def test_index_follows_changes(self):
+        """
+        Testing that saved and deleted meals are searched right after they are committed
+        """
+        self.steak.name = "Tomahawk steak"
+        self.steak.save()
+        salad = MealFactory(category_id=self.category, name="Tomato salad", description="")
+        self.pasta.delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            found = search.search("toma")
+
+        self.assertEqual(found, [self.steak.id, salad.id, self.soup.id])
+        self.assertEqual(len(queries), 0)
+
+    def test_evicted_generation_does_not_repeat(self):
+        """
+        Testing that a generation evicted from the cache does not start again where a process has been
+        """
+        self.assertEqual(search.search("gri"), [self.steak.id])
+
+        cache.delete(search.GENERATION_KEY)
+        Meal.objects.filter(pk=self.steak.pk).update(name="Ribeye")
+        # As many changes as the meals created in setUp
+        for _ in range(3):
+            search.bump_generation()
+
+        self.assertEqual(search.search("gri"), [])
+
+    def test_search_endpoint(self):
+        """
+        Testing meals/search/ endpoint
+        """
+        response = APIClient().get(MEALS_SEARCH_URL, {"q": "past"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([meal["name"] for meal in response.data], ["Pasta"])
+
+    def test_search_endpoint_requires_query(self):
+        """
+        Testing that a search without a query is rejected
+        """
+        response = APIClient().get(MEALS_SEARCH_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
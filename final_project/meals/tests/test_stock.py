@@ -0,0 +1,170 @@
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import autocomplete
+from meals.models import Meal, SpecificMeal
+from meals.stock import SoldOut
+from meals.tests.utils import MealFactory
+from orders.models import Order
+from orders.tests.utils import OrderFactory, TableFactory, create_user_model
+
+ORDERS_URL = reverse("orders")
+MEALS_TO_ORDERS = reverse("meals-to-orders")
+
+
+class Request:
+    """
+    Request of Order.remove_meal
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+
+class TestMealStock(TestCase):
+    """
+    Testing stop-list and portion stock of meals
+    """
+
+    def setUp(self):
+        self.order = OrderFactory(waiter_id=create_user_model())
+        self.counted = MealFactory(stock=3)
+        self.uncounted = MealFactory()
+
+    def stock(self, meal):
+        return Meal.objects.get(pk=meal.pk).stock
+
+    def test_portions_are_taken(self):
+        """
+        Testing that added meals take their portions and meals without a stock are not counted
+        """
+        self.order.add_lines([(self.counted, 2), (self.uncounted, 10)])
+
+        self.assertEqual(self.stock(self.counted), 1)
+        self.assertIsNone(self.stock(self.uncounted))
+
+    def test_no_oversell(self):
+        """
+        Testing that a batch asking for more portions than there are adds nothing
+        """
+        with self.assertRaises(SoldOut) as raised:
+            self.order.add_lines([(self.uncounted, 1), (self.counted, 4)])
+
+        self.assertEqual(raised.exception.meal_ids, [self.counted.id])
+        self.assertEqual(self.stock(self.counted), 3)
+        self.assertFalse(SpecificMeal.objects.filter(order_id=self.order).exists())
+
+    def test_stop_list(self):
+        """
+        Testing that meals on the stop-list cannot be ordered
+        """
+        Meal.objects.filter(pk=self.uncounted.pk).update(is_available=False)
+
+        with self.assertRaises(SoldOut):
+            self.order.add_lines([(self.uncounted, 1)])
+
+    def test_removed_portions_come_back(self):
+        """
+        Testing that portions of meals removed from an order go back to stock
+        """
+        self.order.add_lines([(self.counted, 3)])
+
+        self.order.remove_meal(Request({"meal_id": self.counted.id, "amount": 5}))
+
+        self.assertEqual(self.stock(self.counted), 3)
+
+    def test_removed_line_comes_back_once(self):
+        """
+        Testing that removing meals of a line removed already gives nothing back again
+        """
+        self.order.add_lines([(self.counted, 2)])
+        Meal.objects.filter(pk=self.counted.pk).update(stock=0)
+
+        self.order.remove_meal(Request({"meal_id": self.counted.id, "amount": 2}))
+        self.order.remove_meal(Request({"meal_id": self.counted.id, "amount": 2}))
+
+        self.assertEqual(self.stock(self.counted), 2)
+
+    def test_deleted_lines_come_back(self):
+        """
+        Testing that portions of lines deleted from an open order, or with it, go back to stock
+        """
+        self.order.add_lines([(self.counted, 2)])
+        SpecificMeal.objects.get(order_id=self.order).delete()
+        self.assertEqual(self.stock(self.counted), 3)
+
+        self.order.add_lines([(self.counted, 1)])
+        client = APIClient()
+        client.force_authenticate(create_user_model())
+
+        response = client.delete(ORDERS_URL, {"id": self.order.id}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.stock(self.counted), 3)
+
+    def test_closed_order_keeps_its_portions(self):
+        """
+        Testing that deleting a closed order gives nothing back, its meals were served
+        """
+        self.order.add_lines([(self.counted, 2)])
+        Order.objects.filter(pk=self.order.pk).update(is_open=False)
+
+        Order.objects.get(pk=self.order.pk).delete()
+
+        self.assertEqual(self.stock(self.counted), 1)
+
+    def test_order_endpoint_rejects_sold_out(self):
+        """
+        Testing that an order with sold out meals is rejected and not created
+        """
+        client = APIClient()
+        client.force_authenticate(create_user_model())
+        orders = Order.objects.count()
+
+        response = client.post(
+            ORDERS_URL,
+            {"table_id": TableFactory().id, "meals_id": [{"meal_id": self.counted.id, "amount": 4}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), orders)
+
+    def test_add_meals_endpoint_rejects_sold_out(self):
+        """
+        Testing that adding sold out meals to an order is rejected
+        """
+        response = APIClient().post(
+            MEALS_TO_ORDERS,
+            {"order_id": self.order.id, "meals_id": [{"meal_id": self.counted.id, "amount": 4}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.stock(self.counted), 3)
+
+
+class TestSoldOutMenu(TransactionTestCase):
+    """
+    Testing that the menu shows meals which sell out right away
+    """
+
+    def test_sold_out_meal_in_autocomplete(self):
+        """
+        Testing that a meal which sells out and comes back is shown so in autocomplete once committed
+        """
+        cache.clear()
+        autocomplete.invalidate("meals")
+        meal = MealFactory(name="Lasagna", stock=1)
+        order = OrderFactory(waiter_id=create_user_model())
+
+        self.assertTrue(autocomplete.complete("meals", "las")[0]["available"])
+
+        order.add_lines([(meal, 1)])
+        self.assertFalse(autocomplete.complete("meals", "las")[0]["available"])
+
+        order.remove_meal(Request({"meal_id": meal.id, "amount": 1}))
+        self.assertTrue(autocomplete.complete("meals", "las")[0]["available"])
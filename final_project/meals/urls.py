@@ -6,6 +6,7 @@ urlpatterns = [
     path("departments/", views.DepartamentView().as_view(), name="departments"),
     path("mealCategories/", views.MealCategoryView.as_view(), name="meal-categories"),
     path("meals/", views.MealView.as_view(), name="meals"),
+    path("meals/search/", views.MealSearch.as_view(), name="meals-search"),
     path("categoriesByDepartment/<int:pk>/", views.MealCategoriesByDepartment.as_view(), name="category-by-dep"),
     path("mealsByCategory/<int:pk>", views.MealsByCategory.as_view(), name="meals-by-category")
 ]
@@ -1,12 +1,14 @@
 from rest_framework.generics import ListCreateAPIView, RetrieveAPIView
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from core.mixins import CustomDeleteMixin, CustomUpdateMixin
-from . import serializers
+from core.mixins import CustomDeleteMixin, CustomUpdateMixin, ReplicaReadMixin, TransactionPolicyMixin
+from . import search, serializers
+from .filters import MealOrderingFilter
 from .models import Department, Meal, MealCategory
 
 
-class DepartamentView(ListCreateAPIView, CustomDeleteMixin):
+class DepartamentView(ReplicaReadMixin, TransactionPolicyMixin, ListCreateAPIView, CustomDeleteMixin):
     """
     Responsible for endpoints/views of departments model
     """
@@ -22,7 +24,7 @@ class DepartamentView(ListCreateAPIView, CustomDeleteMixin):
         return self.destroy(request, *args, **kwargs)
 
 
-class MealCategoryView(ListCreateAPIView, CustomDeleteMixin):
+class MealCategoryView(ReplicaReadMixin, TransactionPolicyMixin, ListCreateAPIView, CustomDeleteMixin):
     """
     Responsible for endpoints/views of MealCategory model
     """
@@ -37,13 +39,14 @@ class MealCategoryView(ListCreateAPIView, CustomDeleteMixin):
         return self.destroy(request, *args, **kwargs)
 
 
-class MealView(ListCreateAPIView, CustomDeleteMixin, CustomUpdateMixin):
+class MealView(ReplicaReadMixin, TransactionPolicyMixin, ListCreateAPIView, CustomDeleteMixin, CustomUpdateMixin):
     """
     Responsible for endpoints/views of Meals model
     """
     model = Meal
     queryset = Meal.objects.all()
     serializer_class = serializers.MealSerializer
+    filter_backends = (MealOrderingFilter, )
 
     def delete(self, request, *args, **kwargs):
         """
@@ -58,7 +61,25 @@ class MealView(ListCreateAPIView, CustomDeleteMixin, CustomUpdateMixin):
         return self.partial_update(request, *args, **kwargs)
 
 
-class MealCategoriesByDepartment(RetrieveAPIView):
+class MealSearch(ReplicaReadMixin, TransactionPolicyMixin, APIView):
+    """
+    Responsible for searching meals by the start of words of their name and description, best matches first.
+    Accepts q and limit query parameters
+    """
+
+    def get(self, request, *args, **kwargs):
+        params = serializers.MealSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        meals = Meal.objects.all()
+        meal_ids = search.search(params.validated_data["q"], params.validated_data.get("limit"), meals.db)
+        found = meals.in_bulk(meal_ids)
+
+        serializer = serializers.MealSerializer([found[pk] for pk in meal_ids if pk in found], many=True)
+        return Response(serializer.data)
+
+
+class MealCategoriesByDepartment(ReplicaReadMixin, TransactionPolicyMixin, RetrieveAPIView):
     """
     Responsible for serving list of categories, which belong to specific department
     """
@@ -74,7 +95,7 @@ class MealCategoriesByDepartment(RetrieveAPIView):
         return Response(serializer.data)
 
 
-class MealsByCategory(RetrieveAPIView):
+class MealsByCategory(ReplicaReadMixin, TransactionPolicyMixin, RetrieveAPIView):
     """
     Responsible for serving list of meals, which belong to specific category
     """
@@ -85,7 +106,7 @@ class MealsByCategory(RetrieveAPIView):
 
     def get(self, request, *args, **kwargs):
         instance = self.get_object()
-        meals = Meal.objects.filter(category_id=instance.id)
+        meals = MealOrderingFilter().filter_queryset(request, Meal.objects.filter(category_id=instance.id), self)
         serializer = serializers.MealSerializer(meals, many=True)
         return Response(serializer.data)
 
@@ -6,3 +6,4 @@ admin.site.register(models.Table)
 admin.site.register(models.Check)
 admin.site.register(models.Order)
 admin.site.register(models.Status)
+admin.site.register(models.OrderChange)
@@ -0,0 +1,108 @@
+"""
+Archival of closed orders.
+
+Closed orders older than ARCHIVE_AFTER_DAYS are moved with their meals,
+statuses, status timeline, check and service percentage to the Archived* tables, in
+batches of ARCHIVE_BATCH_SIZE orders, each in its own transaction. Rows
+keep their ids. The live tables hold open and recent orders only, so
+they and their indexes stay small.
+
+Archived orders have not changed, so they are deleted from the live
+tables without model signals: rollups, counters and the change log keep
+them as they are. Rows depending on orders elsewhere, e.g. kitchen
+tickets, are deleted with them.
+
+History and reports read the *History models, views over live and
+archived rows with the fields and related names of the live models.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from meals.models import SpecificMeal
+from .models import (
+    ArchivedCheck, ArchivedOrder, ArchivedServicePercentage, ArchivedSpecificMeal, ArchivedStatus,
+    ArchivedStatusTimeline, Check, Order, ServicePercentage, Status, StatusTimeline,
+)
+
+# Live model, archive model, lookup of the order, parents first
+ARCHIVES = (
+    (Order, ArchivedOrder, "pk"),
+    (SpecificMeal, ArchivedSpecificMeal, "order_id"),
+    (Status, ArchivedStatus, "order_id"),
+    (StatusTimeline, ArchivedStatusTimeline, "order_id"),
+    (Check, ArchivedCheck, "order_id"),
+    (ServicePercentage, ArchivedServicePercentage, "order_id"),
+)
+
+
+def copy_rows(model, archive_model, lookup, order_ids, using=DEFAULT_DB_ALIAS):
+    fields = [field.attname for field in model._meta.concrete_fields]
+    rows = model.objects.using(using).filter(**{f"{lookup}__in": order_ids}).values(*fields)
+
+    archive_model.objects.using(using).bulk_create([archive_model(**row) for row in rows])
+
+
+def delete_quietly(rows, using=DEFAULT_DB_ALIAS):
+    """
+    Deletes rows, e.g. orders, and rows depending on them like Model.delete() does, but without model signals
+    """
+    collector = Collector(using=using)
+    collector.collect(rows)
+    collector.sort()
+
+    for queryset in collector.fast_deletes:
+        queryset._raw_delete(using=using)
+
+    for model, updates in collector.field_updates.items():
+        for (field, value), instances in updates.items():
+            model._base_manager.using(using).filter(pk__in=[obj.pk for obj in instances]).update(**{field.name: value})
+
+    for model, instances in collector.data.items():
+        model._base_manager.using(using).filter(pk__in=[obj.pk for obj in instances])._raw_delete(using=using)
+
+
+def archive_batch(cutoff, batch_size, using=DEFAULT_DB_ALIAS):
+    """
+    Moves one batch of closed orders opened before cutoff to the archive, returns the number of moved orders
+    """
+    with transaction.atomic(using=using):
+        orders = list(
+            Order.objects.using(using)
+            .select_for_update()
+            .filter(is_open=False, date__lt=cutoff)
+            .order_by("pk")[:batch_size]
+        )
+        if not orders:
+            return 0
+
+        order_ids = [order.pk for order in orders]
+        for model, archive_model, lookup in ARCHIVES:
+            copy_rows(model, archive_model, lookup, order_ids, using)
+
+        delete_quietly(orders, using)
+
+    return len(orders)
+
+
+def archive(days=None, batch_size=None, max_batches=None, using=DEFAULT_DB_ALIAS):
+    """
+    Moves closed orders older than days to the archive batch by batch, returns the number of moved orders
+    """
+    days = days or settings.ARCHIVE_AFTER_DAYS
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+
+    moved, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        archived = archive_batch(cutoff, batch_size, using)
+        if not archived:
+            break
+
+        moved += archived
+        batches += 1
+
+    return moved
@@ -0,0 +1,131 @@
+"""
+Change log of orders.
+
+Every change of an Order, SpecificMeal, Status, Check or ServicePercentage
+is appended to OrderChange in the transaction which makes it, so a change
+is logged if and only if it is committed. Data of a change is a snapshot
+of the object's fields. Meals added in a batch by Order.add_lines are
+logged with a single insert. Consumers read changes after the last
+sequence they have seen with read().
+
+Sequences are handed out when a change is written but become visible when
+its transaction commits, so a later change may be visible before an
+earlier one. read() stops at a gap in sequences unless the change after
+it is older than CHANGELOG_SETTLE_SECONDS, by then the missing sequences
+belong to rolled back transactions or compacted changes.
+
+compact() keeps only the last change of every object among changes older
+than CHANGELOG_COMPACT_AFTER_HOURS and deletes changes older than
+CHANGELOG_RETENTION_DAYS.
+"""
+import datetime
+import json
+
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Exists, OuterRef
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from meals.models import SpecificMeal
+from .models import Check, Order, OrderChange, ServicePercentage, Status
+from .signals import meals_added
+
+LOGGED_MODELS = (Order, SpecificMeal, Status, Check, ServicePercentage)
+
+
+def as_change(instance, action):
+    """
+    Returns an unsaved change of an object
+    """
+    fields = serializers.serialize("python", [instance])[0]["fields"]
+
+    return OrderChange(
+        model=instance._meta.label_lower,
+        object_id=instance.pk,
+        order_id=instance.pk if isinstance(instance, Order) else instance.order_id_id,
+        action=action,
+        data=json.dumps(fields, cls=DjangoJSONEncoder),
+    )
+
+
+def record(instances, action, using=DEFAULT_DB_ALIAS):
+    """
+    Appends changes of objects to the log in one insert
+    """
+    OrderChange.objects.using(using).bulk_create([as_change(instance, action) for instance in instances])
+
+
+def read(offset=0, limit=None, models=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns changes after the offset sequence, of the given models only when they are given,
+    and the offset to read from next time
+    """
+    limit = limit or settings.CHANGELOG_READ_LIMIT
+    settled = timezone.now() - datetime.timedelta(seconds=settings.CHANGELOG_SETTLE_SECONDS)
+
+    changes = []
+    for change in OrderChange.objects.using(using).filter(sequence__gt=offset).order_by("sequence")[:limit]:
+        # A recent gap may still be filled by a transaction which has not committed yet
+        if change.sequence != offset + 1 and change.created > settled:
+            break
+
+        offset = change.sequence
+        if not models or change.model in models:
+            changes.append(change)
+
+    return changes, offset
+
+
+def compact(retention_days=None, compact_after_hours=None, using=DEFAULT_DB_ALIAS):
+    """
+    Deletes expired changes and changes superseded by a later change of the same object.
+    Returns numbers of expired and compacted changes
+    """
+    now = timezone.now()
+    retention_days = retention_days or settings.CHANGELOG_RETENTION_DAYS
+    compact_after_hours = compact_after_hours or settings.CHANGELOG_COMPACT_AFTER_HOURS
+    changes = OrderChange.objects.using(using)
+
+    expired, _ = changes.filter(created__lt=now - datetime.timedelta(days=retention_days)).delete()
+
+    later = changes.filter(model=OuterRef("model"), object_id=OuterRef("object_id"), sequence__gt=OuterRef("sequence"))
+    superseded = list(
+        changes.filter(created__lt=now - datetime.timedelta(hours=compact_after_hours))
+        .annotate(superseded=Exists(later))
+        .filter(superseded=True)
+        .values_list("sequence", flat=True)
+    )
+    for start in range(0, len(superseded), 1000):
+        changes.filter(sequence__in=superseded[start:start + 1000]).delete()
+
+    return expired, len(superseded)
+
+
+def log_saved(sender, instance, created, raw=False, using=None, **kwargs):
+    if not raw:
+        record([instance], OrderChange.CREATED if created else OrderChange.UPDATED, using)
+
+
+def log_deleted(sender, instance, using=None, **kwargs):
+    record([instance], OrderChange.DELETED, using)
+
+
+# Connected per model, a post_delete receiver of any sender would stop fast deletes of every model
+for model in LOGGED_MODELS:
+    post_save.connect(log_saved, sender=model)
+    post_delete.connect(log_deleted, sender=model)
+
+
+@receiver(meals_added, sender=Order)
+def log_added_meals(sender, order, lines, using, created=(), **kwargs):
+    """
+    Logs meals of a batch, which are bulk created and updated without model signals
+    """
+    specific_meals = list(SpecificMeal.objects.using(using).filter(order_id=order, meal_id__in=lines).order_by("pk"))
+
+    record([meal for meal in specific_meals if meal.meal_id_id in created], OrderChange.CREATED, using)
+    record([meal for meal in specific_meals if meal.meal_id_id not in created], OrderChange.UPDATED, using)
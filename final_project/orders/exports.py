@@ -0,0 +1,100 @@
+import csv
+import datetime
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from .models import CheckHistory
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+# Column name -> lookup from Check, archived checks included. Meals are joined with LEFT OUTER JOIN,
+# so a check without meals still produces one row with empty meal columns
+EXPORT_COLUMNS = (
+    ("check_id", "id"),
+    ("check_date", "date"),
+    ("order_id", "order_id"),
+    ("table_id", "order_id__table_id"),
+    ("waiter_id", "order_id__waiter_id"),
+    ("service_fee", "service_fee"),
+    ("total_sum", "total_sum"),
+    ("meal_id", "order_id__meals_id__meal_id"),
+    ("meal_name", "order_id__meals_id__meal_id__name"),
+    ("price", "order_id__meals_id__meal_id__price"),
+    ("amount", "order_id__meals_id__amount"),
+)
+
+HEADER = tuple(column for column, _ in EXPORT_COLUMNS)
+
+
+def date_range(start, end):
+    """
+    Returns aware datetimes covering the days from start to end, both inclusive
+    """
+    since = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min))
+    until = timezone.make_aware(datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min))
+
+    return since, until
+
+
+def export_rows(start, end, chunk_size=None, using=DEFAULT_DB_ALIAS):
+    """
+    Yields one tuple per check line for checks closed between start and end.
+    Rows are fetched through a server-side cursor, chunk_size rows at a time,
+    so memory use does not depend on the length of the range
+    """
+    if chunk_size is None:
+        chunk_size = settings.CHECK_EXPORT_CHUNK_SIZE
+
+    since, until = date_range(start, end)
+    queryset = (
+        CheckHistory.objects.using(using)
+        .filter(date__gte=since, date__lt=until)
+        .order_by("date", "id", "order_id__meals_id__id")
+        .values_list(*(lookup for _, lookup in EXPORT_COLUMNS))
+    )
+
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+class Echo:
+    """
+    File-like object which returns what is written to it, lets csv.writer produce lines one by one
+    """
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows):
+    writer = csv.writer(Echo())
+
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def render_jsonl(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(HEADER, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def render(rows, export_format):
+    """
+    Turns export rows into an iterator of text lines in the given format
+    """
+    if export_format == "csv":
+        return render_csv(rows)
+
+    if export_format == "jsonl":
+        return render_jsonl(rows)
+
+    raise ValueError(f"Unsupported export format: {export_format}")
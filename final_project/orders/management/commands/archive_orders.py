@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from orders.archive import archive
+
+
+class Command(BaseCommand):
+    """
+    Moves closed orders to the archive tables, meant to run nightly
+    """
+    help = "Moves closed orders older than some days with their meals, statuses, checks and percentages to the archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="Age of closed orders to archive"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE, help="Orders moved per transaction"
+        )
+        parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to use")
+
+    def handle(self, *args, **options):
+        moved = archive(options["days"], options["batch_size"], options["max_batches"], options["database"])
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} orders"))
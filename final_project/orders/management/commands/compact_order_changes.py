@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from orders.changelog import compact
+
+
+class Command(BaseCommand):
+    """
+    Compacts the order change log and drops expired changes, meant to run periodically
+    """
+    help = "Keeps only the last change of every object among old changes and deletes expired ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days", type=int, default=settings.CHANGELOG_RETENTION_DAYS, help="Days changes are kept"
+        )
+        parser.add_argument(
+            "--compact-after-hours",
+            type=int,
+            default=settings.CHANGELOG_COMPACT_AFTER_HOURS,
+            help="Hours after which superseded changes are deleted",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to use")
+
+    def handle(self, *args, **options):
+        expired, compacted = compact(options["retention_days"], options["compact_after_hours"], options["database"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {expired} expired and {compacted} superseded changes"))
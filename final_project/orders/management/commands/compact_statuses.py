@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from orders.timelines import compact
+
+
+class Command(BaseCommand):
+    """
+    Compacts statuses of closed orders into timelines, meant to run nightly
+    """
+    help = "Folds statuses of closed orders older than some days into one timeline per order"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.STATUS_COMPACT_AFTER_DAYS, help="Age of closed orders to compact"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.STATUS_COMPACT_BATCH_SIZE,
+            help="Orders compacted per transaction",
+        )
+        parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to use")
+
+    def handle(self, *args, **options):
+        compacted = compact(options["days"], options["batch_size"], options["max_batches"], options["database"])
+
+        self.stdout.write(self.style.SUCCESS(f"Compacted statuses of {compacted} orders"))
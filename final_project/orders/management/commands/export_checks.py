@@ -0,0 +1,44 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from orders.exports import EXPORT_FORMATS, export_rows, render
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    """
+    Streams check lines of a date range to a file or stdout
+    """
+    help = "Exports checks with their meals for a date range as CSV or JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("start", help="First day of the range, YYYY-MM-DD")
+        parser.add_argument("end", help="Last day of the range, YYYY-MM-DD")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="Output format")
+        parser.add_argument("--output", help="Path of the file to write, stdout by default")
+        parser.add_argument("--chunk-size", type=int, help="Rows fetched per round trip")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to read from")
+
+    def handle(self, *args, **options):
+        start, end = parse_date(options["start"]), parse_date(options["end"])
+        if start > end:
+            raise CommandError("Start of the range must not be after its end")
+
+        rows = export_rows(start, end, options["chunk_size"], options["database"])
+        lines = render(rows, options["format"])
+
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        with open(options["output"], "w", newline="") as stream:
+            stream.writelines(lines)
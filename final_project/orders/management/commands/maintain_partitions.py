@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from orders.partitions import maintain
+
+
+class Command(BaseCommand):
+    """
+    Creates monthly partitions ahead of time and detaches expired ones, meant to run daily
+    """
+    help = "Maintains monthly partitions of orders, statuses and order meals on Postgres"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.PARTITION_MONTHS_AHEAD,
+            help="Months after the current one to create partitions for",
+        )
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=settings.PARTITION_RETENTION_MONTHS,
+            help="Full months before the current one to keep attached, all of them when 0",
+        )
+        parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to use")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError("Tables are partitioned on Postgres only.")
+
+        with transaction.atomic(using=options["database"]), connection.cursor() as cursor:
+            created, detached = maintain(
+                cursor, options["months_ahead"], options["retention_months"], options["drop"]
+            )
+
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        for name in detached:
+            self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {name}")
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} and detached {len(detached)} partitions"))
@@ -0,0 +1,143 @@
+# Generated by Django 2.2.8 on 2026-10-19 12:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# History views: live rows and archived rows together, see orders.archive
+HISTORY_VIEWS = (
+    ("orders_orderhistory", "orders_order", "orders_archivedorder",
+     "id, table_id_id, waiter_id_id, date, is_open, covers"),
+    ("orders_specificmealhistory", "meals_specificmeal", "orders_archivedspecificmeal",
+     "id, meal_id_id, amount, order_id_id"),
+    ("orders_statushistory", "orders_status", "orders_archivedstatus",
+     "id, name, date, order_id_id"),
+    ("orders_checkhistory", "orders_check", "orders_archivedcheck",
+     "id, order_id_id, date, service_fee, total_sum"),
+    ("orders_servicepercentagehistory", "orders_servicepercentage", "orders_archivedservicepercentage",
+     "percentage, order_id_id"),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0002_meal_popularity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0003_orderchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckHistory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateTimeField()),
+                ('service_fee', models.IntegerField()),
+                ('total_sum', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'orders_checkhistory',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderHistory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateTimeField()),
+                ('is_open', models.BooleanField()),
+                ('covers', models.PositiveIntegerField()),
+            ],
+            options={
+                'db_table': 'orders_orderhistory',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SpecificMealHistory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'orders_specificmealhistory',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='StatusHistory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('date', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'orders_statushistory',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateTimeField(db_index=True)),
+                ('is_open', models.BooleanField(default=False)),
+                ('covers', models.PositiveIntegerField(default=1)),
+                ('table_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='orders.Table')),
+                ('waiter_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ServicePercentageHistory',
+            fields=[
+                ('percentage', models.IntegerField()),
+                ('order_id', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='percentage', serialize=False, to='orders.OrderHistory')),
+            ],
+            options={
+                'db_table': 'orders_servicepercentagehistory',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedServicePercentage',
+            fields=[
+                ('percentage', models.IntegerField()),
+                ('order_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='percentage', serialize=False, to='orders.ArchivedOrder')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedStatus',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50)),
+                ('date', models.DateTimeField()),
+                ('order_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statuses', to='orders.ArchivedOrder')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedSpecificMeal',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('amount', models.IntegerField()),
+                ('meal_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_specific_meals', to='meals.Meal')),
+                ('order_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meals_id', to='orders.ArchivedOrder')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedCheck',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateTimeField(db_index=True)),
+                ('service_fee', models.IntegerField()),
+                ('total_sum', models.IntegerField()),
+                ('order_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='order_check', to='orders.ArchivedOrder')),
+            ],
+        ),
+    ] + [
+        migrations.RunSQL(
+            f"CREATE VIEW {view} AS SELECT {columns} FROM {live} UNION ALL SELECT {columns} FROM {archive}",
+            f"DROP VIEW {view}",
+        )
+        for view, live, archive, columns in HISTORY_VIEWS
+    ]
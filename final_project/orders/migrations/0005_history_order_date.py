@@ -0,0 +1,53 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# History views of 0004_archive, they are recreated with the order date of lines in 0006_partitioning
+HISTORY_VIEWS = (
+    "orders_orderhistory",
+    "orders_specificmealhistory",
+    "orders_statushistory",
+    "orders_checkhistory",
+    "orders_servicepercentagehistory",
+)
+
+
+def fill_archived_order_dates(apps, schema_editor):
+    ArchivedSpecificMeal = apps.get_model("orders", "ArchivedSpecificMeal")
+    ArchivedOrder = apps.get_model("orders", "ArchivedOrder")
+
+    ArchivedSpecificMeal.objects.using(schema_editor.connection.alias).update(
+        order_date=Subquery(ArchivedOrder.objects.filter(pk=OuterRef("order_id")).values("date")[:1])
+    )
+
+
+def drop_views(apps, schema_editor):
+    # Views would keep tables which are rebuilt or partitioned from being renamed
+    for view in HISTORY_VIEWS:
+        schema_editor.execute(f"DROP VIEW IF EXISTS {view}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_views, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='archivedspecificmeal',
+            name='order_date',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(fill_archived_order_dates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='archivedspecificmeal',
+            name='order_date',
+            field=models.DateTimeField(),
+        ),
+        migrations.AddField(
+            model_name='specificmealhistory',
+            name='order_date',
+            field=models.DateTimeField(),
+        ),
+    ]
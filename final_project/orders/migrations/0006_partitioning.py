@@ -0,0 +1,203 @@
+import datetime
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+# Table, partition key, tables are partitioned in this order and unpartitioned in the reverse one
+PARTITIONED_TABLES = (
+    ("orders_order", "date"),
+    ("orders_status", "date"),
+    ("meals_specificmeal", "order_date"),
+)
+
+# Tables and columns referencing orders_order, their foreign key constraints are dropped on Postgres, where
+# the partitioned orders_order has no unique key of id alone. The fields of every database leave the constraint
+# out from here on, meals and kitchen alter the state of theirs in migrations depending on this one
+ORDER_FOREIGN_KEYS = (
+    ("orders_status", "order_id_id"),
+    ("orders_check", "order_id_id"),
+    ("orders_servicepercentage", "order_id_id"),
+    ("meals_specificmeal", "order_id_id"),
+    ("kitchen_kitchenticket", "order_id_id"),
+)
+
+# Months with partitions created ahead of the current one
+MONTHS_AHEAD = 3
+
+# History views of live and archived rows, the ones of 0004_archive with the order date of lines
+HISTORY_VIEWS = (
+    ("orders_orderhistory", "orders_order", "orders_archivedorder",
+     "id, table_id_id, waiter_id_id, date, is_open, covers"),
+    ("orders_specificmealhistory", "meals_specificmeal", "orders_archivedspecificmeal",
+     "id, meal_id_id, amount, order_id_id, order_date"),
+    ("orders_statushistory", "orders_status", "orders_archivedstatus",
+     "id, name, date, order_id_id"),
+    ("orders_checkhistory", "orders_check", "orders_archivedcheck",
+     "id, order_id_id, date, service_fee, total_sum"),
+    ("orders_servicepercentagehistory", "orders_servicepercentage", "orders_archivedservicepercentage",
+     "percentage, order_id_id"),
+)
+
+
+def month_start(day):
+    return timezone.make_aware(datetime.datetime(day.year, day.month, 1))
+
+
+def add_months(month, count):
+    year, index = divmod(month.year * 12 + month.month - 1 + count, 12)
+    return month_start(datetime.date(year, index + 1, 1))
+
+
+def literal(moment):
+    # Bounds of Postgres before 12 must be literals, not expressions such as casts of parameters
+    return f"'{moment.isoformat()}'"
+
+
+def copy_table(cursor, table, old, create, primary_key):
+    """
+    Replaces table, renamed to old, with a new one made by the create statement holding its rows, indexes,
+    foreign keys and id sequence
+    """
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+    # Frees the name of the primary key for the new table
+    cursor.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT "{table}_pkey" TO "{old}_pkey"')
+
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND NOT indisunique",
+        [old],
+    )
+    indexes = [
+        re.sub(rf' ON (ONLY )?(\S+\.)?"?{old}"? ', f' ON "{table}" ', definition) for definition, in cursor.fetchall()
+    ]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [old],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [old])
+    sequence, = cursor.fetchone()
+
+    cursor.execute(create)
+    cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ({primary_key})')
+    cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}"."id"')
+
+    return indexes, foreign_keys
+
+
+def finish_copy(cursor, table, old, indexes, foreign_keys):
+    cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+    cursor.execute(f'DROP TABLE "{old}" CASCADE')
+
+    for definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for table, _ in PARTITIONED_TABLES:
+            cursor.execute(
+                "SELECT conrelid::regclass, conname FROM pg_constraint WHERE confrelid = %s::regclass AND contype = 'f'",
+                [table],
+            )
+            for referencing, name in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE {referencing} DROP CONSTRAINT "{name}"')
+
+        for table, key in PARTITIONED_TABLES:
+            legacy = f"{table}_unpartitioned"
+            indexes, foreign_keys = copy_table(
+                cursor, table, legacy,
+                f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+                f'PARTITION BY RANGE ("{key}")',
+                f'"id", "{key}"',
+            )
+            cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+            # A partition for every month with rows and the months ahead
+            cursor.execute(f'SELECT min("{key}") FROM "{legacy}"')
+            first, = cursor.fetchone()
+            month = month_start(timezone.localdate(first) if first else timezone.localdate())
+            last = add_months(month_start(timezone.localdate()), MONTHS_AHEAD)
+            while month <= last:
+                cursor.execute(
+                    f'CREATE TABLE "{table}_p{month:%Y_%m}" PARTITION OF "{table}" '
+                    f'FOR VALUES FROM ({literal(month)}) TO ({literal(add_months(month, 1))})'
+                )
+                month = add_months(month, 1)
+
+            finish_copy(cursor, table, legacy, indexes, foreign_keys)
+
+
+def unpartition_tables(apps, schema_editor):
+    # Rows of partitions detached by maintain_partitions stay in the detached tables
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for table, _ in reversed(PARTITIONED_TABLES):
+            partitioned = f"{table}_partitioned"
+            indexes, foreign_keys = copy_table(
+                cursor, table, partitioned,
+                f'CREATE TABLE "{table}" (LIKE "{partitioned}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                '"id"',
+            )
+            finish_copy(cursor, table, partitioned, indexes, foreign_keys)
+
+        for table, column in ORDER_FOREIGN_KEYS:
+            cursor.execute(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_{column}_fk_orders_order_id" '
+                f'FOREIGN KEY ("{column}") REFERENCES "orders_order" ("id") DEFERRABLE INITIALLY DEFERRED'
+            )
+
+
+def create_views(apps, schema_editor):
+    for view, live, archive, columns in HISTORY_VIEWS:
+        schema_editor.execute(
+            f"CREATE VIEW {view} AS SELECT {columns} FROM {live} UNION ALL SELECT {columns} FROM {archive}"
+        )
+
+
+def drop_views(apps, schema_editor):
+    for view, _, _, _ in HISTORY_VIEWS:
+        schema_editor.execute(f"DROP VIEW IF EXISTS {view}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0003_specificmeal_order_date'),
+        ('kitchen', '0002_printers'),
+        ('orders', '0005_history_order_date'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_tables, unpartition_tables),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='check',
+                    name='order_id',
+                    field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='order_check', to='orders.Order'),
+                ),
+                migrations.AlterField(
+                    model_name='servicepercentage',
+                    name='order_id',
+                    field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='percentage', serialize=False, to='orders.Order'),
+                ),
+                migrations.AlterField(
+                    model_name='status',
+                    name='order_id',
+                    field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='statuses', to='orders.Order'),
+                ),
+            ],
+        ),
+        migrations.RunPython(create_views, drop_views),
+    ]
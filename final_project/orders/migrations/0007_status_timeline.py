@@ -0,0 +1,28 @@
+# Generated by Django 2.2.8 on 2026-10-19 12:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_partitioning'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedStatusTimeline',
+            fields=[
+                ('order_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='status_timeline', serialize=False, to='orders.ArchivedOrder')),
+                ('entries', models.TextField(default='[]')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatusTimeline',
+            fields=[
+                ('order_id', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='status_timeline', serialize=False, to='orders.Order')),
+                ('entries', models.TextField(default='[]')),
+            ],
+        ),
+    ]
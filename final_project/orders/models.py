@@ -1,8 +1,12 @@
+import json
+
 from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import IntegrityError, models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils.dateparse import parse_datetime
 
-from meals.models import models as md
+from core.transactions import lock_scope
+from . import signals
 
 
 class Table(models.Model):
@@ -17,50 +21,101 @@ class Table(models.Model):
 
 class Order(models.Model):
     """
-    Responsible for keeping Order objects
+    Responsible for keeping Order objects.
+    Orders are partitioned by date on Postgres, foreign keys to them have no database constraint there,
+    see orders.partitions
     """
     table_id = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="orders")
     waiter_id = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="orders")
     date = models.DateTimeField(auto_now_add=True)
     is_open = models.BooleanField(default=True)
+    covers = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["waiter_id", "date"]),
+        ]
 
     def __str__(self):
         return f"Order #{self.pk}, {self.date}"
 
+    def add_lines(self, lines):
+        """
+        Responsible for adding (meal, amount) pairs to order in one batch.
+        Meals which are already in order get their amount increased.
+        Raises meals.stock.SoldOut, adding nothing, when some of the meals are sold out
+        """
+        added = {}
+        for meal, amount in lines:
+            meal_id = getattr(meal, "pk", meal)
+            added[meal_id] = added.get(meal_id, 0) + amount
+
+        if not added:
+            return self
+
+        # Meals import orders, the stock is imported when it is needed
+        from meals import stock
+
+        using = self._state.db
+        with transaction.atomic(using=using):
+            stock.take(added, using)
+            existing = set(self.meals_id.filter(meal_id__in=added).values_list("meal_id", flat=True))
+
+            for meal_id in existing:
+                self.meals_id.filter(meal_id=meal_id).update(amount=F("amount") + added[meal_id])
+
+            self.meals_id.model.objects.using(using).bulk_create([
+                self.meals_id.model(order_id=self, meal_id_id=meal_id, amount=amount, order_date=self.date)
+                for meal_id, amount in added.items() if meal_id not in existing
+            ])
+
+            signals.meals_added.send(
+                sender=Order, order=self, lines=added, created=set(added) - existing, using=using
+            )
+
+        return self
+
     def add_meals(self, request):
         """
         Responsible for adding meals to order
         """
-        specific_meals = self.meals_id
-
         data = request.data
         meals = data.pop("meals_id")
 
-        for meal in meals:
-            amount = meal["amount"]
-            meal_id = meal["meal_id"]
-            try:
-                s_meal = specific_meals.get(meal_id=meal_id)
-                s_meal.amount += amount
-                s_meal.save()
-            except ObjectDoesNotExist:
-                md.SpecificMeal.objects.create(order_id=self, amount=amount, meal_id=meal_id)
+        return self.add_lines((meal["meal_id"], meal["amount"]) for meal in meals)
 
-        return self
+    def all_statuses(self):
+        """
+        Responsible for statuses of order, the compacted ones first and then the status rows
+        """
+        compacted = self.status_timeline.statuses() if hasattr(self, "status_timeline") else []
+        return compacted + list(self.statuses.all())
 
     def remove_meal(self, request):
         """
-        Responsible for removing some meals
+        Responsible for removing some meals.
+        The line stays locked while its amount changes, only the portions it still had are signalled as removed
         """
         data = request.data
+        using = self._state.db
+
+        with lock_scope(self.meals_id.filter(meal_id=data["meal_id"])) as specific_meals:
+            # The line can be gone already, removed by a concurrent request
+            if not specific_meals:
+                return self
 
-        specific_meal = self.meals_id.get(meal_id=data["meal_id"])
-        specific_meal.amount -= data["amount"]
+            specific_meal, = specific_meals
+            removed = min(data["amount"], specific_meal.amount)
+            specific_meal.amount -= data["amount"]
 
-        if specific_meal.amount <= 0:
-            specific_meal.delete()
-        else:
-            specific_meal.save()
+            if specific_meal.amount <= 0:
+                specific_meal.delete()
+            else:
+                specific_meal.save(update_fields=["amount"])
+
+            signals.meals_removed.send(
+                sender=Order, order=self, lines={specific_meal.meal_id_id: removed}, using=using
+            )
 
         return self
 
@@ -73,18 +128,25 @@ class CheckManager(models.Manager):
         if not order_id:
             raise IntegrityError("Order is required!")
 
-        order_id.is_open = False
+        # Checkout lock scope: the order row stays locked until the check is saved
+        with lock_scope(Order.objects.using(self.db).filter(pk=order_id.pk)) as (order, ):
+            if not order.is_open:
+                raise IntegrityError("Order is already closed!")
+
+            prices = [specific_meal.get_total_price() for specific_meal in order.meals_id.select_related("meal_id")]
+            total_sum = sum(prices)
 
-        prices = [specific_meal.get_total_price() for specific_meal in order_id.meals_id.all()]
-        total_sum = sum(prices)
+            service_fee = total_sum / 4
+            check = self.model(
+                order_id=order_id,
+                service_fee=service_fee,
+                total_sum=total_sum
+            )
+            check.save(using=self.db)
 
-        service_fee = total_sum / 4
-        check = self.model(
-            order_id=order_id,
-            service_fee=service_fee,
-            total_sum=total_sum
-        )
-        check.save(using=self._db)
+            order.is_open = False
+            order.save(update_fields=["is_open"])
+            order_id.is_open = False
 
         return check
 
@@ -93,8 +155,8 @@ class Check(models.Model):
     """
     Responsible for Check objects
     """
-    order_id = models.OneToOneField(Order, on_delete=models.CASCADE, related_name="order_check")
-    date = models.DateTimeField(auto_now_add=True)
+    order_id = models.OneToOneField(Order, on_delete=models.CASCADE, related_name="order_check", db_constraint=False)
+    date = models.DateTimeField(auto_now_add=True, db_index=True)
     service_fee = models.IntegerField()
     total_sum = models.IntegerField()
 
@@ -110,18 +172,235 @@ class Status(models.Model):
     """
     name = models.CharField(max_length=50)
     date = models.DateTimeField(auto_now_add=True)
-    order_id = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="statuses")
+    order_id = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="statuses", db_constraint=False)
 
     def __str__(self):
         return f"{self.order_id}-{self.name}"
 
 
+class StatusTimeline(models.Model):
+    """
+    Responsible for keeping compacted statuses of a closed order as a JSON array of [id, name, date],
+    see orders.timelines
+    """
+    order_id = models.OneToOneField(
+        Order, on_delete=models.CASCADE, related_name="status_timeline", primary_key=True, db_constraint=False
+    )
+    entries = models.TextField(default="[]")
+
+    def __str__(self):
+        return f"{self.order_id_id} timeline"
+
+    def statuses(self):
+        """
+        Returns unsaved Status instances of the compacted statuses
+        """
+        return [
+            Status(id=status_id, name=name, date=parse_datetime(date), order_id_id=self.order_id_id)
+            for status_id, name, date in json.loads(self.entries)
+        ]
+
+
 class ServicePercentage(models.Model):
     """
     Responsible for Service Percentage
     """
     percentage = models.IntegerField()
-    order_id = models.OneToOneField(Order, on_delete=models.CASCADE, related_name="percentage", primary_key=True)
+    order_id = models.OneToOneField(
+        Order, on_delete=models.CASCADE, related_name="percentage", primary_key=True, db_constraint=False
+    )
 
     def __str__(self):
         return f"{self.order_id}- {self.percentage}%"
+
+
+class OrderChange(models.Model):
+    """
+    Responsible for the append-only change log of orders, their meals, statuses, checks and service percentages.
+    Written in the transaction of every change, sequence orders the changes for consumers
+    """
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ACTIONS = (
+        (CREATED, "Created"),
+        (UPDATED, "Updated"),
+        (DELETED, "Deleted"),
+    )
+
+    sequence = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    # Not a foreign key, changes of an order outlive it
+    order_id = models.IntegerField(null=True, db_index=True)
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    data = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["model", "object_id"]),
+        ]
+
+    def __str__(self):
+        return f"#{self.sequence} {self.model} {self.object_id} {self.action}"
+
+
+# Archive of closed orders, see orders.archive. Rows keep their ids and fields
+
+class ArchivedOrder(models.Model):
+    """
+    Responsible for keeping archived orders
+    """
+    id = models.IntegerField(primary_key=True)
+    table_id = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="archived_orders")
+    waiter_id = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_orders")
+    date = models.DateTimeField(db_index=True)
+    is_open = models.BooleanField(default=False)
+    covers = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f"Archived order #{self.pk}, {self.date}"
+
+
+class ArchivedSpecificMeal(models.Model):
+    """
+    Responsible for keeping meals of archived orders
+    """
+    id = models.IntegerField(primary_key=True)
+    meal_id = models.ForeignKey("meals.Meal", on_delete=models.CASCADE, related_name="archived_specific_meals")
+    amount = models.IntegerField()
+    order_id = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name="meals_id")
+    order_date = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.order_id_id}, {self.meal_id_id} x{self.amount}"
+
+
+class ArchivedStatus(models.Model):
+    """
+    Responsible for keeping statuses of archived orders
+    """
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=50)
+    date = models.DateTimeField()
+    order_id = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name="statuses")
+
+    def __str__(self):
+        return f"{self.order_id_id}-{self.name}"
+
+
+class ArchivedStatusTimeline(models.Model):
+    """
+    Responsible for keeping compacted statuses of archived orders
+    """
+    order_id = models.OneToOneField(
+        ArchivedOrder, on_delete=models.CASCADE, related_name="status_timeline", primary_key=True
+    )
+    entries = models.TextField(default="[]")
+
+    def __str__(self):
+        return f"{self.order_id_id} timeline"
+
+
+class ArchivedCheck(models.Model):
+    """
+    Responsible for keeping checks of archived orders
+    """
+    id = models.IntegerField(primary_key=True)
+    order_id = models.OneToOneField(ArchivedOrder, on_delete=models.CASCADE, related_name="order_check")
+    date = models.DateTimeField(db_index=True)
+    service_fee = models.IntegerField()
+    total_sum = models.IntegerField()
+
+    def __str__(self):
+        return f"Archived order ID-{self.order_id_id}, Date-{self.date}, Total sum-{self.total_sum}"
+
+
+class ArchivedServicePercentage(models.Model):
+    """
+    Responsible for keeping service percentages of archived orders
+    """
+    percentage = models.IntegerField()
+    order_id = models.OneToOneField(
+        ArchivedOrder, on_delete=models.CASCADE, related_name="percentage", primary_key=True
+    )
+
+    def __str__(self):
+        return f"{self.order_id_id}- {self.percentage}%"
+
+
+# Read only views of live and archived rows together, for history and reports. Fields and related names
+# are the ones of the live models, so the same lookups work on both
+
+class OrderHistory(models.Model):
+    """
+    Responsible for reading live and archived orders
+    """
+    table_id = models.ForeignKey(Table, on_delete=models.DO_NOTHING, related_name="+")
+    waiter_id = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, related_name="+")
+    date = models.DateTimeField()
+    is_open = models.BooleanField()
+    covers = models.PositiveIntegerField()
+
+    class Meta:
+        managed = False
+        db_table = "orders_orderhistory"
+
+
+class SpecificMealHistory(models.Model):
+    """
+    Responsible for reading meals of live and archived orders
+    """
+    meal_id = models.ForeignKey("meals.Meal", on_delete=models.DO_NOTHING, related_name="+")
+    amount = models.IntegerField()
+    order_id = models.ForeignKey(OrderHistory, on_delete=models.DO_NOTHING, related_name="meals_id")
+    order_date = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "orders_specificmealhistory"
+
+    def get_total_price(self):
+        return self.meal_id.price * self.amount
+
+
+class StatusHistory(models.Model):
+    """
+    Responsible for reading statuses of live and archived orders
+    """
+    name = models.CharField(max_length=50)
+    date = models.DateTimeField()
+    order_id = models.ForeignKey(OrderHistory, on_delete=models.DO_NOTHING, related_name="statuses")
+
+    class Meta:
+        managed = False
+        db_table = "orders_statushistory"
+
+
+class CheckHistory(models.Model):
+    """
+    Responsible for reading checks of live and archived orders
+    """
+    order_id = models.OneToOneField(OrderHistory, on_delete=models.DO_NOTHING, related_name="order_check")
+    date = models.DateTimeField()
+    service_fee = models.IntegerField()
+    total_sum = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = "orders_checkhistory"
+
+
+class ServicePercentageHistory(models.Model):
+    """
+    Responsible for reading service percentages of live and archived orders
+    """
+    percentage = models.IntegerField()
+    order_id = models.OneToOneField(
+        OrderHistory, on_delete=models.DO_NOTHING, related_name="percentage", primary_key=True
+    )
+
+    class Meta:
+        managed = False
+        db_table = "orders_servicepercentagehistory"
@@ -0,0 +1,206 @@
+"""
+Monthly range partitions of orders, their statuses and meals on Postgres.
+
+orders_order and orders_status are partitioned by their date and
+meals_specificmeal by the date of its order (SpecificMeal.order_date), so
+the meals of an order live in the partition of the order's month.
+Partitions are named <table>_pYYYY_MM and hold one month in the project's
+time zone, <table>_default catches rows of months without a partition.
+Queries which filter on the partition key read only the partitions of
+their range.
+
+A partitioned table cannot have a unique constraint without its partition
+key, so primary keys are (id, key) and foreign keys to orders have no
+database constraint on Postgres. Their fields declare db_constraint=False
+on every database, migration 0006_partitioning drops the constraints on
+Postgres only, when it partitions the tables. Later foreign keys to orders
+leave the constraint out as well, as StatusTimeline does. Ids still come
+from one sequence per table.
+
+Partitions are created ahead of time and old ones detached by the
+maintain_partitions command, so retention is a DETACH (and DROP) of whole
+months instead of a large DELETE. Rows of tables which are not
+partitioned and depend on the detached orders, e.g. checks, service
+percentages and kitchen tickets, are deleted first so that none is left
+without its order. Other databases keep plain tables.
+"""
+import datetime
+import re
+
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .archive import delete_quietly
+from .models import Order
+
+# Table, partition key
+PARTITIONED_TABLES = (
+    ("orders_order", "date"),
+    ("orders_status", "date"),
+    ("meals_specificmeal", "order_date"),
+)
+
+PARTITION_NAME = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(day):
+    """
+    Returns the aware beginning of the month of a date
+    """
+    return timezone.make_aware(datetime.datetime(day.year, day.month, 1))
+
+
+def add_months(month, count):
+    year, index = divmod(month.year * 12 + month.month - 1 + count, 12)
+    return month_start(datetime.date(year, index + 1, 1))
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def literal(moment):
+    # Bounds of Postgres before 12 must be literals, not expressions such as casts of parameters
+    return f"'{moment.isoformat()}'"
+
+
+def partitions(cursor, table):
+    """
+    Returns {month: partition name} of the monthly partitions of a table
+    """
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = %s::regclass",
+        [table],
+    )
+
+    months = {}
+    for name, in cursor.fetchall():
+        match = PARTITION_NAME.search(name)
+        if match:
+            months[month_start(datetime.date(int(match.group(1)), int(match.group(2)), 1))] = name
+
+    return months
+
+
+def create_partition(cursor, table, key, month):
+    """
+    Creates the partition of a month, rows of the month are moved to it out of the default partition.
+    Returns its name, or None when it already exists
+    """
+    if month in partitions(cursor, table):
+        return None
+
+    name, default = partition_name(table, month), f"{table}_default"
+    start, end = literal(month), literal(add_months(month, 1))
+
+    cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"')
+    cursor.execute(f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES FROM ({start}) TO ({end})')
+    cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{default}" WHERE "{key}" >= {start} AND "{key}" < {end}')
+    cursor.execute(f'DELETE FROM "{default}" WHERE "{key}" >= {start} AND "{key}" < {end}')
+    cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT')
+
+    return name
+
+
+def delete_dependents(cursor, name):
+    """
+    Deletes rows of tables which are not partitioned and depend on the orders of a partition of orders_order,
+    without model signals
+    """
+    partitioned = {table for table, _ in PARTITIONED_TABLES}
+    orders = RawSQL(f'SELECT "id" FROM "{name}"', [])
+
+    for related in Order._meta.related_objects:
+        model = related.related_model
+        if model._meta.db_table not in partitioned:
+            rows = model._base_manager.using(cursor.db.alias).filter(**{f"{related.field.name}__in": orders})
+            delete_quietly(rows, cursor.db.alias)
+
+
+def detach_partition(cursor, table, name, drop=False):
+    cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+    if drop:
+        cursor.execute(f'DROP TABLE "{name}"')
+
+
+def partition_table(cursor, table, key, months_ahead=3):
+    """
+    Replaces a plain table with a table partitioned by month on key, with the same rows, columns,
+    defaults, checks, indexes and foreign keys. Partitions are created for every month with rows
+    and the months ahead
+    """
+    legacy = f"{table}_unpartitioned"
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+    # Frees the name of the primary key for the new table
+    cursor.execute(f'ALTER TABLE "{legacy}" RENAME CONSTRAINT "{table}_pkey" TO "{legacy}_pkey"')
+
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND NOT indisunique",
+        [legacy],
+    )
+    indexes = [
+        re.sub(rf' ON (\S+\.)?"?{legacy}"? ', f' ON "{table}" ', definition) for definition, in cursor.fetchall()
+    ]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [legacy],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [legacy])
+    sequence, = cursor.fetchone()
+
+    cursor.execute(
+        f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ("{key}")'
+    )
+    cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ("id", "{key}")')
+    cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}"."id"')
+    cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+    cursor.execute(f'SELECT min("{key}") FROM "{legacy}"')
+    first, = cursor.fetchone()
+    month = month_start(timezone.localdate(first) if first else timezone.localdate())
+    last = add_months(month_start(timezone.localdate()), months_ahead)
+    while month <= last:
+        cursor.execute(
+            f'CREATE TABLE "{partition_name(table, month)}" PARTITION OF "{table}" '
+            f'FOR VALUES FROM ({literal(month)}) TO ({literal(add_months(month, 1))})'
+        )
+        month = add_months(month, 1)
+
+    cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}"')
+    # Constraints of other tables which still reference the old table go with it
+    cursor.execute(f'DROP TABLE "{legacy}" CASCADE')
+
+    for definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+
+def maintain(cursor, months_ahead, retention_months=None, drop=False, today=None):
+    """
+    Creates partitions of the current month and the months ahead, and detaches partitions of months
+    which ended before the retention period when one is given, rows depending on their orders are deleted first.
+    Returns names of created and detached partitions
+    """
+    current = month_start(today or timezone.localdate())
+    created, detached = [], []
+
+    for table, key in PARTITIONED_TABLES:
+        for count in range(months_ahead + 1):
+            name = create_partition(cursor, table, key, add_months(current, count))
+            if name:
+                created.append(name)
+
+        if retention_months:
+            oldest = add_months(current, -retention_months)
+            for month, name in sorted(partitions(cursor, table).items()):
+                if month < oldest:
+                    if table == "orders_order":
+                        delete_dependents(cursor, name)
+                    detach_partition(cursor, table, name, drop)
+                    detached.append(name)
+
+    return created, detached
@@ -1,8 +1,13 @@
+import json
+
+from django.conf import settings
+from django.db import IntegrityError
 from rest_framework import serializers
 
-from meals.models import SpecificMeal
 from meals.serializers import SmSerializer
-from .models import Check, Order, Table, Status, ServicePercentage
+from meals.stock import SoldOut
+from .exports import EXPORT_FORMATS
+from .models import Check, Order, OrderChange, Table, Status, ServicePercentage
 
 
 class TableSerializer(serializers.ModelSerializer):
@@ -40,6 +45,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "table_name",
             "is_open",
             "date",
+            "covers",
             "meals_id",
         )
         read_only_fields = ("id", "is_open", "waiter_id")
@@ -64,10 +70,11 @@ class OrderSerializer(serializers.ModelSerializer):
         meals_id = validated_data.pop("meals_id")
         order = Order.objects.create(**validated_data)
 
-        for specific_meal in meals_id:
-            SpecificMeal.objects.create(order_id=order, **specific_meal)
-
-        return order
+        try:
+            return order.add_lines((specific_meal["meal_id"], specific_meal["amount"]) for specific_meal in meals_id)
+        except SoldOut as error:
+            # The view's transaction rolls the order back
+            raise serializers.ValidationError({"meals_id": [str(error)]})
 
 
 class CheckSerializer(serializers.ModelSerializer):
@@ -95,12 +102,37 @@ class CheckSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("id", "date", "service_fee", "total_sum")
 
+    def validate_order_id(self, order):
+        if not order.is_open:
+            raise serializers.ValidationError("Order is already closed.")
+
+        return order
+
     def create(self, validated_data):
-        check = Check.objects.create_check(**validated_data)
+        try:
+            check = Check.objects.create_check(**validated_data)
+        except IntegrityError as error:
+            # A concurrent checkout has closed the order since it was validated
+            raise serializers.ValidationError({"order_id": [str(error)]})
 
         return check
 
 
+class CheckExportSerializer(serializers.Serializer):
+    """
+    Responsible for validating parameters of the check export
+    """
+    start = serializers.DateField()
+    end = serializers.DateField()
+    output = serializers.ChoiceField(choices=EXPORT_FORMATS, default="csv")
+
+    def validate(self, attrs):
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError("Start of the range must not be after its end.")
+
+        return attrs
+
+
 class MealToOrderSerializer(serializers.ModelSerializer):
     """
     Responsible for serializing Meals To orders
@@ -132,10 +164,11 @@ class StatusSerializer(serializers.ModelSerializer):
 
 class StatusesOfOrder(serializers.ModelSerializer):
     """
-    Responsible for serializing statuses for specific order
+    Responsible for serializing statuses for specific order, compacted ones included
     """
     order_id = serializers.IntegerField(source="id", read_only=True)
     statuses = StatusSerializer(
+        source="all_statuses",
         many=True,
         read_only=True
     )
@@ -164,3 +197,41 @@ class SpSerializer(serializers.ModelSerializer):
             "order_id",
             "percentage"
         )
+
+
+class ChangeLogSerializer(serializers.Serializer):
+    """
+    Responsible for validating parameters of change log reads,
+    models is an optional comma separated list of model labels, e.g. orders.order,meals.specificmeal
+    """
+    offset = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, required=False)
+    models = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_limit(self, value):
+        return min(value, settings.CHANGELOG_READ_LIMIT)
+
+    def validate_models(self, value):
+        return [model.strip().lower() for model in value.split(",") if model.strip()]
+
+
+class OrderChangeSerializer(serializers.ModelSerializer):
+    """
+    Responsible for serializing change log entries
+    """
+    data = serializers.SerializerMethodField("get_data")
+
+    class Meta:
+        model = OrderChange
+        fields = (
+            "sequence",
+            "model",
+            "object_id",
+            "order_id",
+            "action",
+            "data",
+            "created",
+        )
+
+    def get_data(self, obj):
+        return json.loads(obj.data) if obj.data else None
@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Sent with the order and a {meal id: amount} dict once meals are added to an order,
+# created is the set of meal ids which were not in the order before
+meals_added = Signal(providing_args=["order", "lines", "created", "using"])
+
+# Sent with the order and a {meal id: amount} dict of the amounts actually taken off an order
+meals_removed = Signal(providing_args=["order", "lines", "using"])
@@ -0,0 +1,89 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from meals.models import SpecificMeal
+from meals.tests.utils import MealFactory
+from orders.archive import archive
+from orders.exports import export_rows
+from orders.models import (
+    ArchivedCheck, ArchivedOrder, ArchivedServicePercentage, ArchivedSpecificMeal, ArchivedStatus, Check, Order,
+    OrderChange, OrderHistory, ServicePercentage, SpecificMealHistory, Status,
+)
+from orders.tests.utils import OrderFactory, create_user_model
+from reports.models import DailySales
+
+
+def closed_order(days_ago, meal):
+    order = OrderFactory(waiter_id=create_user_model())
+    order.add_lines([(meal, 2)])
+    Status.objects.create(order_id=order, name="served")
+    ServicePercentage.objects.create(order_id=order, percentage=10)
+    Check.objects.create_check(order_id=order)
+    Order.objects.filter(pk=order.pk).update(date=timezone.now() - datetime.timedelta(days=days_ago))
+    return order
+
+
+class TestArchive(TestCase):
+    """
+    Testing archival of closed orders
+    """
+
+    def setUp(self):
+        self.meal = MealFactory()
+        self.old_orders = [closed_order(120, self.meal), closed_order(100, self.meal)]
+        self.recent_order = closed_order(5, self.meal)
+        self.open_order = OrderFactory(waiter_id=create_user_model())
+        Order.objects.filter(pk=self.open_order.pk).update(date=timezone.now() - datetime.timedelta(days=200))
+
+    def test_old_closed_orders_are_moved(self):
+        """
+        Testing that old closed orders are moved with their rows and keep their ids
+        """
+        old_ids = sorted(order.id for order in self.old_orders)
+
+        self.assertEqual(archive(days=90), 2)
+
+        self.assertEqual(sorted(ArchivedOrder.objects.values_list("id", flat=True)), old_ids)
+        self.assertEqual(
+            sorted(Order.objects.values_list("id", flat=True)), sorted([self.recent_order.id, self.open_order.id])
+        )
+        for model in (ArchivedSpecificMeal, ArchivedStatus, ArchivedCheck, ArchivedServicePercentage):
+            self.assertEqual(sorted(model.objects.values_list("order_id", flat=True)), old_ids)
+        self.assertFalse(SpecificMeal.objects.filter(order_id__in=old_ids).exists())
+
+    def test_archival_is_not_a_change(self):
+        """
+        Testing that archival leaves rollups and the change log alone
+        """
+        sales = list(DailySales.objects.values_list("quantity", flat=True))
+        changes = OrderChange.objects.count()
+
+        archive(days=90)
+
+        self.assertEqual(list(DailySales.objects.values_list("quantity", flat=True)), sales)
+        self.assertEqual(OrderChange.objects.count(), changes)
+
+    def test_history_includes_archive(self):
+        """
+        Testing that history views and reads built on them include archived orders
+        """
+        today = timezone.localdate()
+        exported = len(list(export_rows(today, today)))
+
+        archive(days=90)
+
+        self.assertEqual(OrderHistory.objects.count(), 4)
+        self.assertEqual(SpecificMealHistory.objects.filter(order_id__order_check__isnull=False).count(), 3)
+        self.assertEqual(len(list(export_rows(today, today))), exported)
+
+    def test_batches(self):
+        """
+        Testing that orders are moved in bounded batches
+        """
+        call_command("archive_orders", "--batch-size", "1", "--max-batches", "1", stdout=StringIO())
+
+        self.assertEqual(ArchivedOrder.objects.count(), 1)
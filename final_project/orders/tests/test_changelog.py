@@ -0,0 +1,133 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models.deletion import Collector
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from meals.tests.utils import MealFactory
+from orders import changelog
+from orders.models import Check, Order, OrderChange, Status
+from orders.tests.utils import OrderFactory, create_user_model
+from reports.models import DailySales
+from users.models import User
+from users.tests.utils import RoleFactory
+
+
+class TestChangeLog(TestCase):
+    """
+    Testing the order change log
+    """
+
+    def setUp(self):
+        self.meal = MealFactory()
+        self.order = OrderFactory(waiter_id=create_user_model())
+
+    def test_changes_are_logged(self):
+        """
+        Testing that changes of orders, batched meals, statuses and checks are logged in order
+        """
+        self.order.add_lines([(self.meal, 2)])
+        self.order.add_lines([(self.meal, 1)])
+        Status.objects.create(order_id=self.order, name="cooking")
+        Check.objects.create_check(order_id=self.order)
+
+        changes = list(OrderChange.objects.filter(order_id=self.order.id).order_by("sequence"))
+
+        self.assertEqual(
+            [(change.model, change.action) for change in changes],
+            [
+                ("orders.order", OrderChange.CREATED),
+                ("meals.specificmeal", OrderChange.CREATED),
+                ("meals.specificmeal", OrderChange.UPDATED),
+                ("orders.status", OrderChange.CREATED),
+                ("orders.check", OrderChange.CREATED),
+                ("orders.order", OrderChange.UPDATED),
+            ],
+        )
+        self.assertIn('"amount": 3', changes[2].data)
+
+    def test_deletes_are_logged(self):
+        """
+        Testing that a deleted order and its meals are logged as deleted
+        """
+        self.order.add_lines([(self.meal, 2)])
+        order_id = self.order.id
+        Order.objects.filter(pk=order_id).delete()
+
+        deleted = OrderChange.objects.filter(order_id=order_id, action=OrderChange.DELETED)
+
+        self.assertEqual(set(deleted.values_list("model", flat=True)), {"orders.order", "meals.specificmeal"})
+
+    def test_read_from_offset(self):
+        """
+        Testing that changes are read after an offset, a page at a time
+        """
+        self.order.add_lines([(self.meal, 2)])
+        first = OrderChange.objects.order_by("sequence").first().sequence
+
+        changes, offset = changelog.read(first - 1, limit=1)
+        self.assertEqual([change.sequence for change in changes], [first])
+
+        changes, offset = changelog.read(offset, models=["meals.specificmeal"])
+        self.assertEqual([change.model for change in changes], ["meals.specificmeal"])
+        self.assertEqual(changelog.read(offset), ([], offset))
+
+    def test_read_stops_at_recent_gap(self):
+        """
+        Testing that a recent gap in sequences stops reading until it settles
+        """
+        self.order.add_lines([(self.meal, 2)])
+        first, second = OrderChange.objects.order_by("sequence").values_list("sequence", flat=True)[:2]
+        OrderChange.objects.filter(sequence=first).delete()
+
+        self.assertEqual(changelog.read(first - 1), ([], first - 1))
+
+        OrderChange.objects.update(created=timezone.now() - datetime.timedelta(minutes=5))
+        changes, offset = changelog.read(first - 1)
+        self.assertEqual(changes[0].sequence, second)
+
+    def test_compaction(self):
+        """
+        Testing that superseded old changes are compacted and expired ones deleted
+        """
+        self.order.add_lines([(self.meal, 2)])
+        self.order.add_lines([(self.meal, 1)])
+        OrderChange.objects.update(created=timezone.now() - datetime.timedelta(days=2))
+        expired = OrderChange.objects.create(model="orders.order", object_id=0, action=OrderChange.CREATED)
+        OrderChange.objects.filter(pk=expired.pk).update(created=timezone.now() - datetime.timedelta(days=90))
+
+        call_command("compact_order_changes", stdout=StringIO())
+
+        self.assertEqual(
+            list(OrderChange.objects.order_by("sequence").values_list("model", "action")),
+            [("orders.order", OrderChange.CREATED), ("meals.specificmeal", OrderChange.UPDATED)],
+        )
+
+    def test_other_models_keep_fast_deletes(self):
+        """
+        Testing that logging does not make models which are not logged delete row by row
+        """
+        collector = Collector(using="default")
+
+        self.assertTrue(collector.can_fast_delete(OrderChange.objects.all()))
+        self.assertTrue(collector.can_fast_delete(DailySales.objects.all()))
+        self.assertFalse(collector.can_fast_delete(Status.objects.all()))
+
+    def test_change_log_endpoint(self):
+        """
+        Testing changes/ endpoint
+        """
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("admin", RoleFactory().id, "admin"))
+
+        response = client.get(reverse("order-changes"), {"models": "orders.order"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["changes"][-1]["object_id"], self.order.id)
+        self.assertEqual(response.data["changes"][-1]["data"]["table_id"], self.order.table_id_id)
+        self.assertGreaterEqual(response.data["next_offset"], response.data["changes"][-1]["sequence"])
@@ -0,0 +1,104 @@
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from meals.tests.utils import SMFactory
+from orders import models
+from orders.exports import HEADER, export_rows
+from users.models import User
+from users.tests.utils import RoleFactory
+from .utils import OrderFactory, create_user_model
+
+CHECKS_EXPORT_URL = reverse("checks-export")
+
+
+class TestCheckExport(TestCase):
+    """
+    Testing streaming export of checks
+    """
+
+    def setUp(self):
+        self.today = timezone.localdate()
+
+        user = create_user_model()
+        self.order = OrderFactory(waiter_id=user)
+        self.meals = [SMFactory(order_id=self.order), SMFactory(order_id=self.order)]
+        self.check = models.Check.objects.create_check(order_id=self.order)
+
+        self.empty_check = models.Check.objects.create_check(order_id=OrderFactory(waiter_id=user))
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", RoleFactory().id, "admin"))
+
+    def test_export_rows(self):
+        """
+        Testing that every meal of a check is a row and checks without meals are kept
+        """
+        rows = [dict(zip(HEADER, row)) for row in export_rows(self.today, self.today, chunk_size=1)]
+
+        self.assertEqual([row["check_id"] for row in rows], [self.check.id, self.check.id, self.empty_check.id])
+        self.assertEqual({row["meal_id"] for row in rows[:2]}, {meal.meal_id.id for meal in self.meals})
+        self.assertIsNone(rows[2]["meal_id"])
+
+    def test_export_rows_outside_range(self):
+        """
+        Testing that checks outside of the range are not exported
+        """
+        yesterday = self.today - datetime.timedelta(days=1)
+
+        self.assertEqual(list(export_rows(yesterday, yesterday)), [])
+
+    def test_csv_endpoint(self):
+        """
+        Testing that the endpoint streams CSV with a header row
+        """
+        response = self.client.get(CHECKS_EXPORT_URL, {"start": self.today, "end": self.today})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(tuple(rows[0]), HEADER)
+        self.assertEqual(len(rows), 4)
+
+    def test_jsonl_endpoint(self):
+        """
+        Testing that the endpoint streams one JSON object per line
+        """
+        response = self.client.get(CHECKS_EXPORT_URL, {"start": self.today, "end": self.today, "output": "jsonl"})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(json.loads(lines[0])["total_sum"], self.check.total_sum)
+
+    def test_invalid_range(self):
+        """
+        Testing that a range which ends before it starts is rejected
+        """
+        yesterday = self.today - datetime.timedelta(days=1)
+
+        response = self.client.get(CHECKS_EXPORT_URL, {"start": self.today, "end": yesterday})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        """
+        Testing that the management command writes the export to a file
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checks.jsonl")
+            call_command("export_checks", str(self.today), str(self.today), format="jsonl", output=path)
+
+            with open(path) as stream:
+                self.assertEqual(len(stream.readlines()), 3)
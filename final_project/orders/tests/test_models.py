@@ -1,7 +1,7 @@
 from django.db.utils import IntegrityError
 from django.test import TestCase
 
-from meals.tests.utils import SMFactory
+from meals.tests.utils import MealFactory, SMFactory
 from orders import models
 from .utils import OrderFactory, TableFactory, create_user_model, ServiceFactory
 
@@ -119,3 +119,33 @@ class TestCheckModel(TestCase):
         self.assertEqual(check.total_sum, total_sum)
         self.assertEqual(check.service_fee, total_sum / 4)
         self.assertEqual(order.is_open, False)
+
+    def test_create_check_closes_order(self):
+        """
+        Testing that create_check stores the order as closed and refuses closed orders
+        """
+        user = create_user_model()
+        order = OrderFactory(waiter_id=user)
+
+        models.Check.objects.create_check(order_id=order)
+        order.refresh_from_db()
+
+        self.assertFalse(order.is_open)
+        with self.assertRaises(IntegrityError):
+            models.Check.objects.create_check(order_id=order)
+
+    def test_add_lines(self):
+        """
+        Testing that adding meals merges them with meals which are already in order
+        """
+        user = create_user_model()
+        order = OrderFactory(waiter_id=user)
+        existing = SMFactory(order_id=order, amount=2)
+        new_meal = MealFactory()
+
+        order.add_lines([(existing.meal_id, 3), (new_meal.id, 1), (new_meal.id, 1)])
+
+        self.assertEqual(
+            dict(order.meals_id.values_list("meal_id", "amount")),
+            {existing.meal_id.id: 5, new_meal.id: 2}
+        )
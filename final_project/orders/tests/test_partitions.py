@@ -0,0 +1,168 @@
+import datetime
+from unittest import skipIf, skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from kitchen.models import KitchenTicket
+from meals.models import SpecificMeal
+from meals.tests.utils import DepartmentFactory, MealFactory
+from orders.models import Check, Order, ServicePercentage
+from orders.partitions import (
+    add_months, create_partition, maintain, month_start, partition_name, partition_table, partitions,
+)
+from orders.tests.utils import OrderFactory, create_user_model
+
+
+class TestPartitions(TestCase):
+    """
+    Testing monthly partitions of orders
+    """
+
+    def test_months(self):
+        """
+        Testing month arithmetic and names of partitions
+        """
+        month = month_start(datetime.date(2020, 11, 17))
+
+        self.assertEqual((month.year, month.month, month.day, month.hour), (2020, 11, 1, 0))
+        self.assertEqual(add_months(month, 2), month_start(datetime.date(2021, 1, 1)))
+        self.assertEqual(add_months(month, -11), month_start(datetime.date(2019, 12, 1)))
+        self.assertEqual(partition_name("orders_order", month), "orders_order_p2020_11")
+
+    def test_lines_carry_order_date(self):
+        """
+        Testing that order meals get the date of their order, the key of their partition
+        """
+        order = OrderFactory(waiter_id=create_user_model())
+        order.add_lines([(MealFactory(), 2)])
+        line = SpecificMeal.objects.create(order_id=order, meal_id=MealFactory(), amount=1)
+
+        self.assertEqual(set(order.meals_id.values_list("order_date", flat=True)), {order.date})
+        self.assertEqual(line.order_date, order.date)
+
+    @skipIf(connection.vendor == "postgresql", "Partitions are maintained on Postgres")
+    def test_command_requires_postgres(self):
+        """
+        Testing that partitions are not maintained on other databases
+        """
+        with self.assertRaises(CommandError):
+            call_command("maintain_partitions")
+
+
+@skipUnless(connection.vendor == "postgresql", "Tables are partitioned on Postgres only")
+class TestPostgresPartitions(TestCase):
+    """
+    Testing monthly partitions of orders on Postgres
+    """
+
+    def setUp(self):
+        self.month = month_start(timezone.localdate())
+        self.old_month = add_months(self.month, -6)
+        self.order = OrderFactory(waiter_id=create_user_model())
+
+    def partition_of(self, table, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT tableoid::regclass::text FROM "{table}" WHERE id = %s', [pk])
+            return cursor.fetchone()[0]
+
+    def test_partition_table(self):
+        """
+        Testing that a plain table is replaced by a partitioned one with its rows, indexes and primary key
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE "partition_test" (id serial PRIMARY KEY, day timestamptz NOT NULL, note text)'
+            )
+            cursor.execute('CREATE INDEX "partition_test_note" ON "partition_test" (note)')
+            cursor.execute(
+                'INSERT INTO "partition_test" (day, note) VALUES (%s, %s), (%s, %s)',
+                [self.old_month, "old", self.month, "new"],
+            )
+
+            partition_table(cursor, "partition_test", "day", months_ahead=1)
+
+            self.assertEqual(
+                sorted(partitions(cursor, "partition_test")),
+                [add_months(self.old_month, count) for count in range(8)],
+            )
+            cursor.execute('SELECT note, tableoid::regclass::text FROM "partition_test" ORDER BY id')
+            self.assertEqual(cursor.fetchall(), [
+                ("old", partition_name("partition_test", self.old_month)),
+                ("new", partition_name("partition_test", self.month)),
+            ])
+            cursor.execute(
+                "SELECT pg_get_constraintdef(oid) FROM pg_constraint WHERE conname = 'partition_test_pkey'"
+            )
+            self.assertEqual(cursor.fetchone()[0], "PRIMARY KEY (id, day)")
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'partition_test'")
+            self.assertIn("partition_test_note", {name for name, in cursor.fetchall()})
+
+            cursor.execute('INSERT INTO "partition_test" (day) VALUES (%s) RETURNING id', [self.month])
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+    def test_create_partition_moves_default_rows(self):
+        """
+        Testing that rows of a month without a partition are moved out of the default one into its new partition
+        """
+        Order.objects.filter(pk=self.order.pk).update(date=self.old_month)
+        self.assertEqual(self.partition_of("orders_order", self.order.pk), "orders_order_default")
+
+        with connection.cursor() as cursor:
+            name = create_partition(cursor, "orders_order", "date", self.old_month)
+            self.assertIsNone(create_partition(cursor, "orders_order", "date", self.old_month))
+
+        self.assertEqual(name, partition_name("orders_order", self.old_month))
+        self.assertEqual(self.partition_of("orders_order", self.order.pk), name)
+        self.assertTrue(Order.objects.filter(pk=self.order.pk).exists())
+
+    def test_maintain_detaches_expired_months(self):
+        """
+        Testing that partitions ahead are created and the ones past the retention period are detached
+        """
+        Order.objects.filter(pk=self.order.pk).update(date=self.old_month)
+        with connection.cursor() as cursor:
+            create_partition(cursor, "orders_order", "date", self.old_month)
+
+            created, detached = maintain(cursor, months_ahead=6, retention_months=3)
+
+        self.assertIn(partition_name("orders_order", add_months(self.month, 6)), created)
+        self.assertEqual(detached, [partition_name("orders_order", self.old_month)])
+        self.assertFalse(Order.objects.filter(pk=self.order.pk).exists())
+
+    def test_maintain_deletes_dependents_of_detached_orders(self):
+        """
+        Testing that checks, service percentages and kitchen tickets of detached orders are deleted with them
+        """
+        Check.objects.create(order_id=self.order, service_fee=1, total_sum=4)
+        ServicePercentage.objects.create(order_id=self.order, percentage=10)
+        KitchenTicket.objects.create(order_id=self.order, department_id=DepartmentFactory())
+        kept = OrderFactory(waiter_id=create_user_model())
+        Check.objects.create(order_id=kept, service_fee=1, total_sum=4)
+        Order.objects.filter(pk=self.order.pk).update(date=self.old_month)
+
+        with connection.cursor() as cursor:
+            create_partition(cursor, "orders_order", "date", self.old_month)
+            maintain(cursor, months_ahead=1, retention_months=3)
+
+        self.assertEqual(list(Check.objects.values_list("order_id", flat=True)), [kept.pk])
+        self.assertFalse(ServicePercentage.objects.exists())
+        self.assertFalse(KitchenTicket.objects.exists())
+
+    def test_queries_read_partitions_of_their_range(self):
+        """
+        Testing that a query on a range of dates reads only the partitions of the range
+        """
+        since = add_months(self.month, 1)
+        orders = Order.objects.filter(date__gte=since, date__lt=add_months(since, 1)).values("id")
+        sql, params = orders.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}", params)
+            plan = "\n".join(line for line, in cursor.fetchall())
+
+        self.assertIn(partition_name("orders_order", since), plan)
+        self.assertNotIn(partition_name("orders_order", self.month), plan)
+        self.assertNotIn("orders_order_default", plan)
@@ -0,0 +1,97 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.archive import archive
+from orders.models import ArchivedStatusTimeline, Check, Order, OrderChange, Status, StatusTimeline
+from orders.tests.utils import OrderFactory, create_user_model
+from orders.timelines import compact
+
+
+def order_with_statuses(days_ago, names, close=True):
+    order = OrderFactory(waiter_id=create_user_model())
+    statuses = [Status.objects.create(order_id=order, name=name) for name in names]
+    if close:
+        Check.objects.create_check(order_id=order)
+    Order.objects.filter(pk=order.pk).update(date=timezone.now() - datetime.timedelta(days=days_ago))
+    return order, statuses
+
+
+class TestStatusTimelines(TestCase):
+    """
+    Testing compaction of statuses into timelines
+    """
+
+    def setUp(self):
+        self.old_order, self.old_statuses = order_with_statuses(60, ["new", "cooking", "served"])
+        self.recent_order, _ = order_with_statuses(5, ["new"])
+        self.open_order, _ = order_with_statuses(60, ["new"], close=False)
+
+    def test_old_closed_orders_are_compacted(self):
+        """
+        Testing that statuses of old closed orders become one timeline and their rows are deleted
+        """
+        self.assertEqual(compact(days=45), 1)
+
+        self.assertFalse(Status.objects.filter(order_id=self.old_order).exists())
+        self.assertEqual(Status.objects.count(), 2)
+        timeline = StatusTimeline.objects.get(pk=self.old_order.pk)
+        self.assertEqual(
+            [(entry.id, entry.name, entry.date) for entry in timeline.statuses()],
+            [(entry.id, entry.name, entry.date) for entry in self.old_statuses],
+        )
+
+    def test_compaction_is_not_a_change(self):
+        """
+        Testing that compaction leaves the change log alone
+        """
+        changes = OrderChange.objects.count()
+
+        compact(days=45)
+
+        self.assertEqual(OrderChange.objects.count(), changes)
+
+    def test_statuses_endpoint_reads_timeline(self):
+        """
+        Testing that statuses endpoint returns compacted statuses as they were
+        """
+        url = reverse("statuses", args=[self.old_order.id])
+        before = APIClient().get(url).data
+
+        compact(days=45)
+        response = APIClient().get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, before)
+        self.assertEqual([entry["name"] for entry in response.data["statuses"]], ["new", "cooking", "served"])
+
+    def test_later_statuses_are_appended(self):
+        """
+        Testing that statuses added after a compaction are appended to the timeline
+        """
+        compact(days=45)
+        Status.objects.create(order_id=self.old_order, name="paid")
+
+        call_command("compact_statuses", "--days", "45", stdout=StringIO())
+
+        self.assertEqual(
+            [entry.name for entry in self.old_order.all_statuses()], ["new", "cooking", "served", "paid"]
+        )
+
+    def test_timeline_is_archived(self):
+        """
+        Testing that timelines are moved with their orders to the archive
+        """
+        compact(days=45)
+        Order.objects.filter(pk=self.old_order.pk).update(date=timezone.now() - datetime.timedelta(days=100))
+
+        archive(days=90)
+
+        self.assertFalse(StatusTimeline.objects.exists())
+        self.assertEqual(list(ArchivedStatusTimeline.objects.values_list("order_id", flat=True)), [self.old_order.id])
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
@@ -203,6 +205,21 @@ class TestCheckView(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_post_check_of_order_closed_meanwhile(self):
+        """
+        Testing that a check of an order closed by a concurrent checkout after validation is rejected
+        """
+        order = OrderFactory(waiter_id=create_user_model())
+        SMFactory(order_id=order)
+        models.Order.objects.filter(pk=order.pk).update(is_open=False)
+
+        with mock.patch.object(serializers.CheckSerializer, "validate_order_id", lambda self, order: order):
+            response = self.client.post(CHECKS_URL, data={"order_id": order.id})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("order_id", response.data)
+        self.assertFalse(models.Check.objects.filter(order_id=order).exists())
+
     def test_delete_check(self):
         """
         Testing DELETE method for CheckView
@@ -0,0 +1,86 @@
+"""
+Compaction of status history.
+
+Statuses of closed orders opened more than STATUS_COMPACT_AFTER_DAYS ago
+do not change anymore, so they are folded into one StatusTimeline row per
+order, a JSON array of [id, name, date], and their Status rows are
+deleted in batches of STATUS_COMPACT_BATCH_SIZE orders, each in its own
+transaction.
+Order.all_statuses() reads both forms, compacted statuses come first.
+
+Like archival the statuses have not changed, so the rows are deleted
+without model signals and the change log keeps them as they are. Reports
+of the last PREP_TIME_WINDOW_DAYS read status rows, compaction should
+start after that window.
+"""
+import datetime
+import json
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from .models import Status, StatusTimeline
+
+
+def as_entry(status):
+    return [status.id, status.name, status.date.isoformat()]
+
+
+def compact_batch(cutoff, batch_size, using=DEFAULT_DB_ALIAS):
+    """
+    Compacts statuses of one batch of orders closed and opened before cutoff, returns the number of compacted orders
+    """
+    with transaction.atomic(using=using):
+        order_ids = list(
+            Status.objects.using(using)
+            .filter(order_id__is_open=False, order_id__date__lt=cutoff)
+            .order_by("order_id")
+            .values_list("order_id", flat=True)
+            .distinct()[:batch_size]
+        )
+        if not order_ids:
+            return 0
+
+        statuses = list(
+            Status.objects.using(using).select_for_update().filter(order_id__in=order_ids).order_by("date", "pk")
+        )
+        timelines = StatusTimeline.objects.using(using).select_for_update().in_bulk(order_ids)
+
+        entries = {}
+        for order_id, timeline in timelines.items():
+            entries[order_id] = json.loads(timeline.entries)
+        for status in statuses:
+            entries.setdefault(status.order_id_id, []).append(as_entry(status))
+
+        for order_id, timeline in timelines.items():
+            timeline.entries = json.dumps(entries[order_id])
+        StatusTimeline.objects.using(using).bulk_update(timelines.values(), ["entries"])
+        StatusTimeline.objects.using(using).bulk_create([
+            StatusTimeline(order_id_id=order_id, entries=json.dumps(order_entries))
+            for order_id, order_entries in entries.items() if order_id not in timelines
+        ])
+
+        Status.objects.using(using).filter(pk__in=[status.pk for status in statuses])._raw_delete(using=using)
+
+    return len(order_ids)
+
+
+def compact(days=None, batch_size=None, max_batches=None, using=DEFAULT_DB_ALIAS):
+    """
+    Compacts statuses of closed orders older than days batch by batch, returns the number of compacted orders
+    """
+    days = days or settings.STATUS_COMPACT_AFTER_DAYS
+    batch_size = batch_size or settings.STATUS_COMPACT_BATCH_SIZE
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+
+    compacted, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        count = compact_batch(cutoff, batch_size, using)
+        if not count:
+            break
+
+        compacted += count
+        batches += 1
+
+    return compacted
@@ -7,6 +7,8 @@ urlpatterns = [
     path('orders/', views.OrderView.as_view(), name="orders"),
     path("activeOrders/", views.GetAllActiveOrders.as_view(), name="active-orders"),
     path("checks/", views.CheckView.as_view(), name="checks"),
+    path("checks/export/", views.CheckExportView.as_view(), name="checks-export"),
+    path("changes/", views.ChangeLogView.as_view(), name="order-changes"),
     path("mealsToOrder/", views.AddMealToOrder.as_view(), name="meals-to-orders"),
     path("statuses/<int:pk>/", views.StatusViews.as_view(), name="statuses"),
     path("servicePercentage/", views.PercentageCreate.as_view(), name="create_percentage"),
@@ -1,15 +1,21 @@
+from django.db import router
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveDestroyAPIView, get_object_or_404, \
     CreateAPIView
 from rest_framework.mixins import CreateModelMixin, RetrieveModelMixin, UpdateModelMixin
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from core.mixins import CustomDeleteMixin
-from . import serializers
+from core.mixins import CustomDeleteMixin, ReplicaReadMixin, TransactionPolicyMixin
+from meals.stock import SoldOut
+from . import changelog, exports, serializers
 from .models import Check, Order, Status, Table, ServicePercentage
 
 
-class TableView(ListCreateAPIView, CustomDeleteMixin):
+class TableView(ReplicaReadMixin, TransactionPolicyMixin, ListCreateAPIView, CustomDeleteMixin):
     """
     Responsible for endpoints/views of Table model
     """
@@ -25,7 +31,7 @@ class TableView(ListCreateAPIView, CustomDeleteMixin):
         return self.destroy(request, *args, **kwargs)
 
 
-class OrderView(ListCreateAPIView, CustomDeleteMixin):
+class OrderView(ReplicaReadMixin, TransactionPolicyMixin, ListCreateAPIView, CustomDeleteMixin):
     """
     Responsible for endpoints/views of Order model
     """
@@ -45,7 +51,7 @@ class OrderView(ListCreateAPIView, CustomDeleteMixin):
         serializer.save(waiter_id=self.request.user)
 
 
-class GetAllActiveOrders(ListAPIView):
+class GetAllActiveOrders(ReplicaReadMixin, TransactionPolicyMixin, ListAPIView):
     """
     Responsible for listing orders that are active
     """
@@ -54,7 +60,7 @@ class GetAllActiveOrders(ListAPIView):
     serializer_class = serializers.OrderSerializer
 
 
-class AddMealToOrder(ListCreateAPIView, UpdateModelMixin, RetrieveModelMixin):
+class AddMealToOrder(TransactionPolicyMixin, ListCreateAPIView, UpdateModelMixin, RetrieveModelMixin):
     """
     Responsible for listing meals of an order and adding additional meals to order
     """
@@ -74,10 +80,14 @@ class AddMealToOrder(ListCreateAPIView, UpdateModelMixin, RetrieveModelMixin):
 
     def post(self, request, *args, **kwargs):
         """
-        Needed for 'POST' method that accepts order_id and meals and updates them
+        Needed for 'POST' method that accepts order_id and meals and updates them,
+        nothing is added when some of the meals are sold out
         """
         instance = self.get_object()
-        instance.add_meals(request)
+        try:
+            instance.add_meals(request)
+        except SoldOut as error:
+            raise ValidationError({"meals_id": [str(error)]})
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -103,7 +113,7 @@ class AddMealToOrder(ListCreateAPIView, UpdateModelMixin, RetrieveModelMixin):
         return obj
 
 
-class CheckView(ListCreateAPIView, CustomDeleteMixin):
+class CheckView(ReplicaReadMixin, TransactionPolicyMixin, ListCreateAPIView, CustomDeleteMixin):
     """
     Responsible for endpoints/views of departments model
     """
@@ -119,7 +129,48 @@ class CheckView(ListCreateAPIView, CustomDeleteMixin):
         return self.destroy(request, *args, **kwargs)
 
 
-class StatusViews(RetrieveDestroyAPIView, CreateModelMixin):
+class CheckExportView(ReplicaReadMixin, APIView):
+    """
+    Responsible for streaming check lines of a date range as CSV or JSONL,
+    accepts start, end and output query parameters
+    """
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        params = serializers.CheckExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end, output = (params.validated_data[key] for key in ("start", "end", "output"))
+
+        # Rows are read after the view returns, so the database is picked while routing is still set up
+        rows = exports.export_rows(start, end, using=router.db_for_read(Check))
+
+        response = StreamingHttpResponse(exports.render(rows, output), content_type=exports.CONTENT_TYPES[output])
+        response["Content-Disposition"] = f'attachment; filename="checks_{start}_{end}.{output}"'
+        return response
+
+
+class ChangeLogView(APIView):
+    """
+    Responsible for reading the change log of orders from an offset,
+    accepts offset, limit and models query parameters. Consumers pass next_offset of a response to the next read
+    """
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        params = serializers.ChangeLogSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        changes, offset = changelog.read(
+            params.validated_data["offset"], params.validated_data.get("limit"), params.validated_data.get("models")
+        )
+
+        return Response({
+            "changes": serializers.OrderChangeSerializer(changes, many=True).data,
+            "next_offset": offset,
+        })
+
+
+class StatusViews(TransactionPolicyMixin, RetrieveDestroyAPIView, CreateModelMixin):
     """
     View responsible for status endpoints
     """
@@ -162,7 +213,7 @@ class StatusViews(RetrieveDestroyAPIView, CreateModelMixin):
         serializer.save(order_id=self.get_object())
 
 
-class PercentageCreate(CreateAPIView):
+class PercentageCreate(TransactionPolicyMixin, CreateAPIView):
     """
     View responsible for Service PERCENTAGE Creation
     """
@@ -171,7 +222,7 @@ class PercentageCreate(CreateAPIView):
     serializer_class = serializers.SpSerializer
 
 
-class PercentageView(RetrieveDestroyAPIView):
+class PercentageView(TransactionPolicyMixin, RetrieveDestroyAPIView):
     """
     View responsible for Service PERCENTAGE
     """
@@ -0,0 +1,119 @@
+"""
+Next day demand forecast per meal and hour.
+
+Demand is seasonal by weekday, so the forecast of a day is an exponentially
+weighted average of the same weekday in previous weeks: the last week
+weighs alpha, the one before alpha * (1 - alpha) and so on. Quantities are
+summed by the database per meal, week and hour, and the smoothing is a
+single weighted sum over a meals x weeks x hours array. Weeks before a meal
+was first sold and weeks when nothing was sold at all (the restaurant was
+closed) are left out of the average of that meal.
+"""
+import datetime
+
+import numpy as np
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+from orders.exports import date_range
+from orders.models import SpecificMealHistory
+from .models import MealForecast
+
+HOURS = 24
+
+
+def weekday_history(day, weeks=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns meal ids and an array of quantities per meal, week and hour of the same weekday as day
+    in previous weeks, the most recent week first. All of the history is read when weeks is empty
+    """
+    tz = timezone.get_current_timezone()
+    first_day = day - datetime.timedelta(weeks=weeks) if weeks else None
+    since = date_range(first_day, first_day)[0] if first_day else None
+    until = date_range(day, day)[0]
+
+    # Lines carry the date of their order, filtering on it needs no join and prunes partitions
+    lines = SpecificMealHistory.objects.using(using).filter(
+        order_date__lt=until,
+        # Django numbers weekdays from Sunday = 1, isoweekday from Monday = 1
+        order_date__week_day=day.isoweekday() % 7 + 1,
+    )
+    if since is not None:
+        lines = lines.filter(order_date__gte=since)
+
+    rows = list(
+        lines.annotate(day=TruncDate("order_date"), hour=ExtractHour("order_date", tzinfo=tz))
+        .values("meal_id", "day", "hour")
+        .annotate(quantity=Sum("amount"))
+        .values_list("meal_id", "day", "hour", "quantity")
+        .order_by()
+    )
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.zeros((0, 0, HOURS))
+
+    meal_ids, days, hours, quantities = zip(*rows)
+    meals, meal_rows = np.unique(np.asarray(meal_ids, dtype=np.int64), return_inverse=True)
+    weeks_ago = np.fromiter(((day - sold_on).days // 7 - 1 for sold_on in days), dtype=np.int64, count=len(days))
+
+    history = np.zeros((len(meals), weeks_ago.max() + 1, HOURS))
+    np.add.at(history, (meal_rows, weeks_ago, np.asarray(hours, dtype=np.int64)), np.asarray(quantities, dtype=float))
+
+    return meals, history
+
+
+def smooth(history, alpha):
+    """
+    Returns the exponentially weighted average of every meal and hour over weeks, an array of meals x hours
+    """
+    meals, weeks, _ = history.shape
+    if not meals:
+        return np.zeros((0, HOURS))
+
+    weights = alpha * (1 - alpha) ** np.arange(weeks)
+
+    sold = history.sum(axis=2) > 0
+    open_weeks = sold.any(axis=0)
+    # Weeks are ordered from the most recent one, the last week with sales is the first one of the meal
+    first_week = weeks - 1 - np.argmax(sold[:, ::-1], axis=1)
+    on_menu = np.arange(weeks)[np.newaxis, :] <= first_week[:, np.newaxis]
+
+    meal_weights = weights[np.newaxis, :] * on_menu * open_weeks[np.newaxis, :]
+    totals = meal_weights.sum(axis=1, keepdims=True)
+    meal_weights = np.divide(meal_weights, totals, out=np.zeros_like(meal_weights), where=totals > 0)
+
+    return np.einsum("mw,mwh->mh", meal_weights, history)
+
+
+def forecast(day, alpha=None, weeks=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns meal ids and the forecast quantity per meal and hour of day
+    """
+    alpha = alpha or settings.FORECAST_SMOOTHING
+    weeks = weeks or settings.FORECAST_HISTORY_WEEKS
+    meals, history = weekday_history(day, weeks, using)
+
+    return meals, smooth(history, alpha)
+
+
+def refresh(day=None, alpha=None, weeks=None, using=DEFAULT_DB_ALIAS):
+    """
+    Replaces stored forecasts of day, tomorrow by default, and returns the number of rows stored
+    """
+    day = day or timezone.localdate() + datetime.timedelta(days=1)
+    meals, quantities = forecast(day, alpha, weeks, using)
+    meal_rows, hours = np.nonzero(quantities >= 0.01)
+
+    with transaction.atomic(using=using):
+        MealForecast.objects.using(using).filter(day=day).delete()
+        MealForecast.objects.using(using).bulk_create(
+            [
+                MealForecast(day=day, meal_id_id=int(meals[row]), hour=int(hour), quantity=round(float(quantity), 2))
+                for row, hour, quantity in zip(meal_rows, hours, quantities[meal_rows, hours])
+            ],
+            batch_size=1000,
+        )
+
+    return len(meal_rows)
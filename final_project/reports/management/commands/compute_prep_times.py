@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from reports.prep_times import refresh
+
+
+class Command(BaseCommand):
+    """
+    Recomputes kitchen prep time percentiles from order status timelines
+    """
+    help = "Computes p50/p90 of times between kitchen stages per meal, per department and kitchen wide"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.PREP_TIME_WINDOW_DAYS, help="Days of orders to compute from"
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to use")
+
+    def handle(self, *args, **options):
+        rows = refresh(options["days"], using=options["database"])
+
+        self.stdout.write(self.style.SUCCESS(f"Stored {len(rows)} prep time percentiles"))
@@ -0,0 +1,54 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.routers import REPLICA, PrimaryReplicaRouter
+from reports.snapshots import SNAPSHOT_FORMATS, export_snapshots
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    """
+    Writes daily partitions of sales lines which have not been exported yet
+    """
+    help = "Exports sales lines as daily partitioned Parquet or Arrow files for offline analytics"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--root", default=settings.ANALYTICS_SNAPSHOT_DIR, help="Directory of the partitions")
+        parser.add_argument("--format", choices=SNAPSHOT_FORMATS, default="parquet", help="File format")
+        parser.add_argument("--since", help="First day to export, YYYY-MM-DD")
+        parser.add_argument("--until", help="Last day to export, YYYY-MM-DD, yesterday at most")
+        parser.add_argument("--force", action="store_true", help="Write days which were exported before again")
+        parser.add_argument("--chunk-size", type=int, help="Rows fetched and written at a time")
+        parser.add_argument("--database", help="Database alias to read from, the replica if there is one")
+
+    def handle(self, *args, **options):
+        since = parse_date(options["since"]) if options["since"] else None
+        until = parse_date(options["until"]) if options["until"] else None
+        database = options["database"]
+
+        if database is None:
+            database = REPLICA if PrimaryReplicaRouter().replica_available() else DEFAULT_DB_ALIAS
+
+        exported = export_snapshots(
+            root=options["root"],
+            snapshot_format=options["format"],
+            since=since,
+            until=until,
+            force=options["force"],
+            chunk_size=options["chunk_size"],
+            using=database,
+        )
+
+        for day, rows in exported.items():
+            self.stdout.write(f"{day}: {rows} lines")
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {len(exported)} days to {options['root']}"))
@@ -0,0 +1,36 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from reports.forecast import refresh
+
+
+class Command(BaseCommand):
+    """
+    Forecasts demand per meal and hour of a day, meant to run nightly for the next day
+    """
+    help = "Forecasts quantities per meal and hour from the same weekday of previous weeks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--day",
+            type=datetime.date.fromisoformat,
+            help="Day to forecast as YYYY-MM-DD, tomorrow by default",
+        )
+        parser.add_argument(
+            "--alpha", type=float, default=settings.FORECAST_SMOOTHING, help="Weight of the last week, 0 to 1"
+        )
+        parser.add_argument(
+            "--weeks", type=int, default=settings.FORECAST_HISTORY_WEEKS, help="Weeks of history to use"
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to use")
+
+    def handle(self, *args, **options):
+        if not 0 < options["alpha"] <= 1:
+            raise CommandError("Alpha must be greater than 0 and at most 1.")
+
+        rows = refresh(options["day"], options["alpha"], options["weeks"], options["database"])
+
+        self.stdout.write(self.style.SUCCESS(f"Stored {rows} forecasts"))
@@ -0,0 +1,34 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from reports.rollups import rebuild
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    """
+    Recomputes daily sales rollups from checks
+    """
+    help = "Backfills daily sales rollups, for the whole history by default"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First day to rebuild, YYYY-MM-DD")
+        parser.add_argument("--until", help="Last day to rebuild, YYYY-MM-DD")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows inserted per query")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to rebuild")
+
+    def handle(self, *args, **options):
+        since = parse_date(options["since"]) if options["since"] else None
+        until = parse_date(options["until"]) if options["until"] else None
+
+        sales, checks = rebuild(since, until, options["batch_size"], options["database"])
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {sales} daily sales rows and {checks} daily check rows"))
@@ -0,0 +1,37 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from orders.exports import date_range
+from reports.occupancy import rebuild
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the occupancy timeline of tables from orders and checks
+    """
+    help = "Backfills the table occupancy timeline, for the whole history by default"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First day to rebuild, YYYY-MM-DD")
+        parser.add_argument("--until", help="Last day to rebuild, YYYY-MM-DD")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to rebuild")
+
+    def handle(self, *args, **options):
+        since = until = None
+        if options["since"]:
+            since, _ = date_range(parse_date(options["since"]), parse_date(options["since"]))
+        if options["until"]:
+            _, until = date_range(parse_date(options["until"]), parse_date(options["until"]))
+
+        rows = rebuild(since, until, options["database"])
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} table occupancy rows"))
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.8 on 2026-10-19 11:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('meals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.BigIntegerField(default=0)),
+                ('category_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='meals.MealCategory')),
+                ('department_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='meals.Department')),
+                ('meal_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='meals.Meal')),
+                ('waiter_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('day', 'department_id', 'category_id', 'meal_id', 'waiter_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyChecks',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('checks', models.IntegerField(default=0)),
+                ('total_sum', models.BigIntegerField(default=0)),
+                ('service_fee', models.BigIntegerField(default=0)),
+                ('waiter_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_checks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('day', 'waiter_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.8 on 2026-10-19 11:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0002_meal_popularity'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrepTime',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_stage', models.CharField(max_length=50)),
+                ('to_stage', models.CharField(max_length=50)),
+                ('samples', models.IntegerField()),
+                ('p50', models.FloatField()),
+                ('p90', models.FloatField()),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('department_id', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='prep_times', to='meals.Department')),
+                ('meal_id', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='prep_times', to='meals.Meal')),
+            ],
+        ),
+    ]
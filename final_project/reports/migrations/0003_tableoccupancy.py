@@ -0,0 +1,29 @@
+# Generated by Django 2.2.8 on 2026-10-19 11:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_covers_waiter_date_index'),
+        ('reports', '0002_preptime'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableOccupancy',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(db_index=True)),
+                ('occupied_seconds', models.IntegerField(default=0)),
+                ('seatings', models.IntegerField(default=0)),
+                ('dwell_seconds', models.BigIntegerField(default=0)),
+                ('table_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='orders.Table')),
+            ],
+            options={
+                'unique_together': {('table_id', 'hour')},
+            },
+        ),
+    ]
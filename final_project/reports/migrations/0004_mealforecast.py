@@ -0,0 +1,28 @@
+# Generated by Django 2.2.8 on 2026-10-19 11:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0002_meal_popularity'),
+        ('reports', '0003_tableoccupancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MealForecast',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('quantity', models.FloatField()),
+                ('meal_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecasts', to='meals.Meal')),
+            ],
+            options={
+                'unique_together': {('day', 'meal_id', 'hour')},
+            },
+        ),
+    ]
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import models
+
+from meals.models import Department, Meal, MealCategory
+from orders.models import Table
+
+
+class DailySales(models.Model):
+    """
+    Responsible for keeping sold meals rolled up per day, department, category, meal and waiter
+    """
+    day = models.DateField()
+    department_id = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="daily_sales")
+    category_id = models.ForeignKey(MealCategory, on_delete=models.CASCADE, related_name="daily_sales")
+    meal_id = models.ForeignKey(Meal, on_delete=models.CASCADE, related_name="daily_sales")
+    waiter_id = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="daily_sales")
+    quantity = models.IntegerField(default=0)
+    revenue = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("day", "department_id", "category_id", "meal_id", "waiter_id")
+
+    def __str__(self):
+        return f"{self.day}, {self.meal_id_id} x{self.quantity}"
+
+
+class DailyChecks(models.Model):
+    """
+    Responsible for keeping checks rolled up per day and waiter
+    """
+    day = models.DateField()
+    waiter_id = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="daily_checks")
+    checks = models.IntegerField(default=0)
+    total_sum = models.BigIntegerField(default=0)
+    service_fee = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("day", "waiter_id")
+
+    def __str__(self):
+        return f"{self.day}, waiter {self.waiter_id_id}: {self.checks} checks"
+
+
+class PrepTime(models.Model):
+    """
+    Responsible for keeping p50/p90 of the time between two kitchen stages in seconds,
+    per meal, per department, or kitchen wide when both are empty
+    """
+    meal_id = models.ForeignKey(Meal, on_delete=models.CASCADE, related_name="prep_times", null=True)
+    department_id = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="prep_times", null=True)
+    from_stage = models.CharField(max_length=50)
+    to_stage = models.CharField(max_length=50)
+    samples = models.IntegerField()
+    p50 = models.FloatField()
+    p90 = models.FloatField()
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.from_stage} -> {self.to_stage}: p50 {self.p50:.0f}s, p90 {self.p90:.0f}s"
+
+
+class TableOccupancy(models.Model):
+    """
+    Responsible for keeping the occupancy timeline of a table, one row per table and hour.
+    Seatings and their dwell time are counted in the hour they started
+    """
+    table_id = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="occupancy")
+    hour = models.DateTimeField(db_index=True)
+    occupied_seconds = models.IntegerField(default=0)
+    seatings = models.IntegerField(default=0)
+    dwell_seconds = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("table_id", "hour")
+
+    def __str__(self):
+        return f"{self.table_id_id}, {self.hour}: {self.occupied_seconds}s"
+
+
+class MealForecast(models.Model):
+    """
+    Responsible for keeping the forecast quantity of a meal in an hour of a day
+    """
+    day = models.DateField()
+    meal_id = models.ForeignKey(Meal, on_delete=models.CASCADE, related_name="forecasts")
+    hour = models.PositiveSmallIntegerField()
+    quantity = models.FloatField()
+
+    class Meta:
+        unique_together = ("day", "meal_id", "hour")
+
+    def __str__(self):
+        return f"{self.day} {self.hour}h, {self.meal_id_id} x{self.quantity}"
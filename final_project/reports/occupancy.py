@@ -0,0 +1,183 @@
+"""
+Table occupancy timeline.
+
+A seating lasts from the order (Order.date) until its check (Check.date).
+Every seating is cut into hour long segments which are added to
+TableOccupancy, one row per table and hour, so occupancy between any two
+moments is a sum over an index range of that timeline instead of a scan
+of orders. Seatings are added when their check is created and taken away
+when it is deleted (see reports.signals), rebuild() recomputes a range.
+Tables which are seated right now are not part of the timeline until
+their check is created.
+"""
+import datetime
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Sum
+from django.db.models.functions import ExtractHour
+from django.utils import timezone
+
+from core.counters import increment
+from orders.models import CheckHistory
+from .models import TableOccupancy
+
+HOUR = datetime.timedelta(hours=1)
+
+
+def floor_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def hourly_segments(seated_at, left_at):
+    """
+    Yields (hour, seconds occupied in that hour) of a seating
+    """
+    hour = floor_hour(seated_at)
+    while hour < left_at:
+        yield hour, (min(left_at, hour + HOUR) - max(seated_at, hour)).total_seconds()
+        hour += HOUR
+
+
+def seating_counters(table_id, seated_at, left_at):
+    """
+    Returns {(table, hour): counters} of a seating, the seating itself is counted in the hour it started
+    """
+    counters = {}
+    for hour, seconds in hourly_segments(seated_at, left_at):
+        counters[(table_id, hour)] = {"occupied_seconds": round(seconds), "seatings": 0, "dwell_seconds": 0}
+
+    first_hour = (table_id, floor_hour(seated_at))
+    counters.setdefault(first_hour, {"occupied_seconds": 0, "seatings": 0, "dwell_seconds": 0})
+    counters[first_hour]["seatings"] = 1
+    counters[first_hour]["dwell_seconds"] = max(0, round((left_at - seated_at).total_seconds()))
+
+    return counters
+
+
+def apply_check(check, sign, using=DEFAULT_DB_ALIAS):
+    order = check.order_id
+    counters = seating_counters(order.table_id_id, order.date, check.date)
+
+    with transaction.atomic(using=using):
+        for (table_id, hour), values in sorted(counters.items()):
+            increment(
+                TableOccupancy,
+                {"table_id_id": table_id, "hour": hour},
+                {field: sign * value for field, value in values.items()},
+                using,
+            )
+
+        if sign < 0:
+            TableOccupancy.objects.using(using).filter(
+                table_id=order.table_id_id, hour__in=[hour for _, hour in counters], occupied_seconds=0, seatings=0
+            ).delete()
+
+
+def add_check(check, using=DEFAULT_DB_ALIAS):
+    """
+    Adds the seating closed by a new check to the timeline
+    """
+    apply_check(check, 1, using)
+
+
+def remove_check(check, using=DEFAULT_DB_ALIAS):
+    """
+    Takes the seating of a deleted check out of the timeline
+    """
+    apply_check(check, -1, using)
+
+
+def rebuild(since=None, until=None, using=DEFAULT_DB_ALIAS):
+    """
+    Recomputes the timeline between since and until, both optional moments.
+    Seatings which overlap the range are counted only for their hours inside of it.
+    Returns the number of rows written
+    """
+    checks = CheckHistory.objects.using(using).select_related("order_id")
+    timeline = TableOccupancy.objects.using(using)
+
+    if since is not None:
+        since = floor_hour(since)
+        checks, timeline = checks.filter(date__gt=since), timeline.filter(hour__gte=since)
+    if until is not None:
+        checks, timeline = checks.filter(order_id__date__lt=until), timeline.filter(hour__lt=until)
+
+    rows = {}
+    for check in checks.iterator():
+        counters = seating_counters(check.order_id.table_id_id, check.order_id.date, check.date)
+        for (table_id, hour), values in counters.items():
+            if (since is not None and hour < since) or (until is not None and hour >= until):
+                continue
+
+            row = rows.setdefault((table_id, hour), {"occupied_seconds": 0, "seatings": 0, "dwell_seconds": 0})
+            for field, value in values.items():
+                row[field] += value
+
+    with transaction.atomic(using=using):
+        timeline.delete()
+        TableOccupancy.objects.using(using).bulk_create(
+            [TableOccupancy(table_id_id=table_id, hour=hour, **values) for (table_id, hour), values in rows.items()],
+            batch_size=1000,
+        )
+
+    return len(rows)
+
+
+def occupancy(since, until, tables=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns {table id: occupied seconds} between two moments, at the precision of whole hours
+    """
+    timeline = TableOccupancy.objects.using(using).filter(hour__gte=floor_hour(since), hour__lt=until)
+    if tables:
+        timeline = timeline.filter(table_id__in=tables)
+
+    occupied = timeline.values("table_id").annotate(occupied=Sum("occupied_seconds"))
+    return {row["table_id"]: row["occupied"] for row in occupied}
+
+
+def table_report(since, until, tables=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns turnover, dwell time and occupancy per table, and a heatmap of occupancy
+    per table and local hour of day between two moments
+    """
+    timeline = TableOccupancy.objects.using(using).filter(hour__gte=floor_hour(since), hour__lt=until)
+    if tables:
+        timeline = timeline.filter(table_id__in=tables)
+
+    seconds = (until - since).total_seconds()
+    days = seconds / 86400
+
+    totals = (
+        timeline.values("table_id")
+        .annotate(occupied=Sum("occupied_seconds"), seatings=Sum("seatings"), dwell=Sum("dwell_seconds"))
+        .order_by("table_id")
+    )
+    by_hour = (
+        timeline.annotate(hour_of_day=ExtractHour("hour", tzinfo=timezone.get_current_timezone()))
+        .values("table_id", "hour_of_day")
+        .annotate(occupied=Sum("occupied_seconds"))
+    )
+
+    table_ids = [row["table_id"] for row in totals]
+    heatmap = [[0.0] * 24 for _ in table_ids]
+    row_of = {table_id: index for index, table_id in enumerate(table_ids)}
+    for row in by_hour:
+        heatmap[row_of[row["table_id"]]][row["hour_of_day"]] = round(row["occupied"] / (3600 * days), 4)
+
+    return {
+        "tables": [
+            {
+                "table_id": row["table_id"],
+                "seatings": row["seatings"],
+                "turnover_per_day": round(row["seatings"] / days, 2),
+                "average_dwell": round(row["dwell"] / row["seatings"]) if row["seatings"] else None,
+                "occupancy": round(row["occupied"] / seconds, 4),
+            }
+            for row in totals
+        ],
+        "heatmap": {
+            "x": list(range(24)),
+            "y": table_ids,
+            "values": heatmap,
+        },
+    }
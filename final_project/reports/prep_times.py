@@ -0,0 +1,129 @@
+"""
+Kitchen preparation times from order status timelines.
+
+Statuses are free text, the ones named like a stage of KITCHEN_STAGES
+(case insensitive) mark the moment an order reached that stage. For every
+pair of stages the time between them is computed per order, attributed to
+each meal of the order and its department, and summarized as p50/p90.
+All of it is computed on numpy arrays: one matrix of orders x stages holds
+the first time each stage was reached.
+"""
+import datetime
+
+import numpy as np
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from orders.models import SpecificMealHistory, StatusHistory
+from .models import PrepTime
+
+
+def stage_matrix(order_ids, names, times, stages):
+    """
+    Returns sorted unique order ids and a matrix with the first time each order reached each stage,
+    NaN where a stage was never reached
+    """
+    names = np.char.lower(np.char.strip(np.asarray(names, dtype=str)))
+    stage_index = np.full(len(names), -1)
+    for index, stage in enumerate(stages):
+        stage_index[names == stage] = index
+
+    known = stage_index >= 0
+    orders, rows = np.unique(np.asarray(order_ids, dtype=np.int64)[known], return_inverse=True)
+
+    matrix = np.full((len(orders), len(stages)), np.inf)
+    np.minimum.at(matrix, (rows, stage_index[known]), np.asarray(times, dtype=np.float64)[known])
+    matrix[np.isinf(matrix)] = np.nan
+
+    return orders, matrix
+
+
+def percentiles_by(keys, values):
+    """
+    Returns {key: (samples, p50, p90)} of the valid values grouped by key
+    """
+    valid = np.isfinite(values) & (values >= 0)
+    keys, values = keys[valid], values[valid]
+    if not len(keys):
+        return {}
+
+    by_key = np.argsort(keys, kind="stable")
+    keys, values = keys[by_key], values[by_key]
+    unique_keys, starts = np.unique(keys, return_index=True)
+
+    return {
+        int(key): (len(group), *np.percentile(group, [50, 90]))
+        for key, group in zip(unique_keys, np.split(values, starts[1:]))
+    }
+
+
+def compute(since, stages=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns unsaved PrepTime rows of orders opened since the given moment:
+    per meal, per department and kitchen wide ones, for every pair of stages
+    """
+    stages = [stage.lower() for stage in (stages or settings.KITCHEN_STAGES)]
+
+    statuses = list(
+        # Statuses come after their order, the condition on their own date prunes partitions
+        StatusHistory.objects.using(using)
+        .filter(order_id__date__gte=since, date__gte=since)
+        .values_list("order_id", "name", "date")
+    )
+    if not statuses:
+        return []
+
+    order_ids, names, dates = zip(*statuses)
+    times = np.fromiter((date.timestamp() for date in dates), dtype=np.float64, count=len(dates))
+    orders, matrix = stage_matrix(order_ids, names, times, stages)
+
+    lines = list(SpecificMealHistory.objects.using(using).filter(order_date__gte=since).values_list(
+        "order_id", "meal_id", "meal_id__category_id__department_id"
+    ))
+    line_orders, meals, departments = np.asarray(lines, dtype=np.int64).reshape(-1, 3).T
+
+    # Row of every line's order in the matrix, lines of orders without known stages are dropped
+    positions = np.searchsorted(orders, line_orders)
+    found = positions < len(orders)
+    found[found] = orders[positions[found]] == line_orders[found]
+    positions, meals, departments = positions[found], meals[found], departments[found]
+
+    rows = []
+    for start in range(len(stages)):
+        for end in range(start + 1, len(stages)):
+            durations = matrix[:, end] - matrix[:, start]
+            line_durations = durations[positions]
+
+            scopes = (
+                ("meal_id_id", percentiles_by(meals, line_durations)),
+                ("department_id_id", percentiles_by(departments, line_durations)),
+                (None, percentiles_by(np.zeros(len(orders), dtype=np.int64), durations)),
+            )
+            for field, stats in scopes:
+                for key, (samples, p50, p90) in stats.items():
+                    rows.append(PrepTime(
+                        from_stage=stages[start],
+                        to_stage=stages[end],
+                        samples=samples,
+                        p50=float(p50),
+                        p90=float(p90),
+                        **({field: key} if field else {}),
+                    ))
+
+    return rows
+
+
+def refresh(days=None, stages=None, using=DEFAULT_DB_ALIAS):
+    """
+    Replaces stored prep times with ones computed from orders of the last days
+    """
+    days = days or settings.PREP_TIME_WINDOW_DAYS
+    since = timezone.now() - datetime.timedelta(days=days)
+    rows = compute(since, stages, using)
+
+    with transaction.atomic(using=using):
+        PrepTime.objects.using(using).all().delete()
+        PrepTime.objects.using(using).bulk_create(rows)
+
+    return rows
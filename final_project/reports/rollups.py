@@ -0,0 +1,129 @@
+"""
+Daily sales rollups.
+
+DailySales and DailyChecks are kept up to date incrementally: creating a
+check adds its lines to the rows of its day, deleting it takes them away
+again (see reports.signals). rebuild() recomputes any range from checks,
+e.g. after a deploy or to repair drift, archived orders included.
+"""
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.counters import increment
+from meals.models import SpecificMeal
+from orders.models import CheckHistory, SpecificMealHistory
+from .models import DailyChecks, DailySales
+
+# Rollup key -> lookup from SpecificMeal
+LINE_KEYS = {
+    "department_id": "meal_id__category_id__department_id",
+    "category_id": "meal_id__category_id",
+    "meal_id": "meal_id",
+    "waiter_id": "order_id__waiter_id",
+}
+
+
+def group_lines(lines, *fields):
+    """
+    Groups SpecificMeal rows by rollup key and sums quantity and revenue
+    """
+    return (
+        lines.values(*fields, *LINE_KEYS.values())
+        .annotate(quantity=Sum("amount"), revenue=Sum(F("amount") * F("meal_id__price")))
+        .order_by()
+    )
+
+
+def sales_keys(row):
+    return {f"{key}_id": row[lookup] for key, lookup in LINE_KEYS.items()}
+
+
+def apply_check(check, sign, using=DEFAULT_DB_ALIAS):
+    day = timezone.localdate(check.date)
+    lines = group_lines(SpecificMeal.objects.using(using).filter(order_id=check.order_id_id))
+
+    with transaction.atomic(using=using):
+        for row in lines:
+            increment(
+                DailySales,
+                {"day": day, **sales_keys(row)},
+                {"quantity": sign * row["quantity"], "revenue": sign * row["revenue"]},
+                using,
+            )
+
+        increment(
+            DailyChecks,
+            {"day": day, "waiter_id_id": check.order_id.waiter_id_id},
+            {"checks": sign, "total_sum": sign * check.total_sum, "service_fee": sign * check.service_fee},
+            using,
+        )
+
+        if sign < 0:
+            DailySales.objects.using(using).filter(day=day, quantity=0, revenue=0).delete()
+            DailyChecks.objects.using(using).filter(day=day, checks=0).delete()
+
+
+def add_check(check, using=DEFAULT_DB_ALIAS):
+    """
+    Adds a new check and its meals to the rollups of its day
+    """
+    apply_check(check, 1, using)
+
+
+def remove_check(check, using=DEFAULT_DB_ALIAS):
+    """
+    Takes a deleted check and its meals out of the rollups of its day
+    """
+    apply_check(check, -1, using)
+
+
+def in_range(queryset, since, until):
+    if since is not None:
+        queryset = queryset.filter(day__gte=since)
+    if until is not None:
+        queryset = queryset.filter(day__lte=until)
+
+    return queryset
+
+
+def rebuild(since=None, until=None, batch_size=1000, using=DEFAULT_DB_ALIAS):
+    """
+    Recomputes rollups of the days from since to until, both inclusive and both optional.
+    Returns the number of DailySales and DailyChecks rows written
+    """
+    lines = in_range(
+        SpecificMealHistory.objects.using(using).annotate(day=TruncDate("order_id__order_check__date")),
+        since, until
+    ).filter(day__isnull=False)
+    checks = in_range(CheckHistory.objects.using(using).annotate(day=TruncDate("date")), since, until)
+
+    with transaction.atomic(using=using):
+        in_range(DailySales.objects.using(using), since, until).delete()
+        in_range(DailyChecks.objects.using(using), since, until).delete()
+
+        sales = DailySales.objects.using(using).bulk_create(
+            (
+                DailySales(day=row["day"], quantity=row["quantity"], revenue=row["revenue"], **sales_keys(row))
+                for row in group_lines(lines, "day").iterator()
+            ),
+            batch_size=batch_size,
+        )
+        daily_checks = DailyChecks.objects.using(using).bulk_create(
+            (
+                DailyChecks(
+                    day=row["day"],
+                    waiter_id_id=row["order_id__waiter_id"],
+                    checks=row["checks"],
+                    total_sum=row["total_sum"],
+                    service_fee=row["service_fee"],
+                )
+                for row in checks.values("day", "order_id__waiter_id").annotate(
+                    checks=Count("id"), total_sum=Sum("total_sum"), service_fee=Sum("service_fee")
+                ).order_by().iterator()
+            ),
+            batch_size=batch_size,
+        )
+
+    return len(sales), len(daily_checks)
@@ -0,0 +1,107 @@
+from rest_framework import serializers
+
+from .models import PrepTime
+
+# Report dimension -> DailySales field
+SALES_DIMENSIONS = {
+    "day": "day",
+    "department": "department_id",
+    "category": "category_id",
+    "meal": "meal_id",
+    "waiter": "waiter_id",
+}
+
+
+class ReportRangeSerializer(serializers.Serializer):
+    """
+    Responsible for validating the date range of a report
+    """
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError("Start of the range must not be after its end.")
+
+        return attrs
+
+
+class SalesReportSerializer(ReportRangeSerializer):
+    """
+    Responsible for validating parameters of the sales report,
+    group_by is a comma separated list of dimensions
+    """
+    group_by = serializers.CharField(default="day")
+
+    def validate_group_by(self, value):
+        dimensions = [dimension.strip() for dimension in value.split(",") if dimension.strip()]
+        unknown = [dimension for dimension in dimensions if dimension not in SALES_DIMENSIONS]
+
+        if not dimensions:
+            raise serializers.ValidationError("At least one dimension is required.")
+
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown dimensions: {', '.join(unknown)}. Choose from {', '.join(SALES_DIMENSIONS)}."
+            )
+
+        return dimensions
+
+
+class IdListField(serializers.CharField):
+    """
+    Comma separated list of ids, e.g. 1,2,3
+    """
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+
+        try:
+            return [int(item) for item in value.split(",") if item.strip()]
+        except ValueError:
+            raise serializers.ValidationError("Must be a comma separated list of ids.")
+
+
+class WaiterReportSerializer(ReportRangeSerializer):
+    """
+    Responsible for validating parameters of the waiter report,
+    waiters is an optional comma separated list of waiter ids
+    """
+    waiters = IdListField(required=False, allow_blank=True)
+
+
+class TableReportSerializer(ReportRangeSerializer):
+    """
+    Responsible for validating parameters of the table report,
+    tables is an optional comma separated list of table ids
+    """
+    tables = IdListField(required=False, allow_blank=True)
+
+
+class PrepTimeSerializer(serializers.ModelSerializer):
+    """
+    Responsible for serializing prep time percentiles
+    """
+
+    class Meta:
+        model = PrepTime
+        fields = (
+            "meal_id",
+            "department_id",
+            "from_stage",
+            "to_stage",
+            "samples",
+            "p50",
+            "p90",
+            "computed_at",
+        )
+
+
+class ForecastSerializer(serializers.Serializer):
+    """
+    Responsible for validating parameters of the demand forecast,
+    day defaults to tomorrow, meals and departments are optional comma separated lists of ids
+    """
+    day = serializers.DateField(required=False)
+    meals = IdListField(required=False, allow_blank=True)
+    departments = IdListField(required=False, allow_blank=True)
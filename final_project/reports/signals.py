@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from orders.models import Check, Order
+from . import occupancy, rollups, waiters
+
+
+@receiver(post_save, sender=Check)
+def roll_up_created_check(sender, instance, created, raw=False, using=None, **kwargs):
+    """
+    Adds a new check to the daily sales rollups and the table timeline in the transaction that creates it
+    """
+    if created and not raw:
+        rollups.add_check(instance, using)
+        occupancy.add_check(instance, using)
+
+
+@receiver(pre_delete, sender=Check)
+def roll_back_deleted_check(sender, instance, using=None, **kwargs):
+    """
+    Takes a check out of the rollups and the table timeline while its meals still exist
+    """
+    rollups.remove_check(instance, using)
+    occupancy.remove_check(instance, using)
+
+
+@receiver([post_save, pre_delete], sender=Order)
+@receiver([post_save, pre_delete], sender=Check)
+def invalidate_waiter_reports(sender, instance, using=None, **kwargs):
+    """
+    Invalidates cached waiter reports of the day the order was opened, once the change is committed
+    """
+    order = instance if sender is Order else instance.order_id
+    day = timezone.localdate(order.date)
+
+    transaction.on_commit(lambda: waiters.touch_day(day), using=using)
@@ -0,0 +1,205 @@
+"""
+Daily partitioned columnar snapshots of sales lines.
+
+Every SpecificMeal of a checked out order becomes one row, denormalized with
+its meal, category, department, order and check, so analysts can slice sales
+offline without joining anything on the production database. Each day is
+written once, as a Hive style partition readable by pyarrow.dataset, pandas,
+DuckDB or Spark:
+
+    <root>/date=2020-05-01/lines.parquet
+"""
+import datetime
+import itertools
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.exports import date_range
+from orders.models import CheckHistory, SpecificMealHistory
+
+SNAPSHOT_FORMATS = ("parquet", "arrow")
+
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+# Column name, lookup from SpecificMeal, Arrow type
+COLUMNS = (
+    ("line_id", "id", pa.int64()),
+    ("order_id", "order_id", pa.int64()),
+    ("order_date", "order_id__date", TIMESTAMP),
+    ("waiter_id", "order_id__waiter_id", pa.int64()),
+    ("table_id", "order_id__table_id", pa.int64()),
+    ("check_id", "order_id__order_check__id", pa.int64()),
+    ("check_date", "order_id__order_check__date", TIMESTAMP),
+    ("check_total_sum", "order_id__order_check__total_sum", pa.int64()),
+    ("check_service_fee", "order_id__order_check__service_fee", pa.int64()),
+    ("meal_id", "meal_id", pa.int64()),
+    ("meal_name", "meal_id__name", pa.string()),
+    ("price", "meal_id__price", pa.int64()),
+    ("amount", "amount", pa.int64()),
+    ("category_id", "meal_id__category_id", pa.int64()),
+    ("category_name", "meal_id__category_id__name", pa.string()),
+    ("department_id", "meal_id__category_id__department_id", pa.int64()),
+    ("department_name", "meal_id__category_id__department_id__name", pa.string()),
+)
+
+# Columns computed from the ones above
+DERIVED_COLUMNS = (
+    ("line_total", pa.int64()),
+    ("hour", pa.int8()),
+)
+
+SCHEMA = pa.schema(
+    [pa.field(name, arrow_type) for name, _, arrow_type in COLUMNS]
+    + [pa.field(name, arrow_type) for name, arrow_type in DERIVED_COLUMNS]
+)
+
+
+def partition_path(root, day, snapshot_format="parquet"):
+    return os.path.join(root, f"date={day.isoformat()}", f"lines.{snapshot_format}")
+
+
+def exported_days(root, snapshot_format="parquet"):
+    """
+    Returns days which already have a partition under root
+    """
+    if not os.path.isdir(root):
+        return set()
+
+    days = set()
+    for name in os.listdir(root):
+        if not name.startswith("date="):
+            continue
+
+        try:
+            day = datetime.date.fromisoformat(name[len("date="):])
+        except ValueError:
+            continue
+
+        if os.path.exists(partition_path(root, day, snapshot_format)):
+            days.add(day)
+
+    return days
+
+
+def sales_days(since=None, until=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns sorted days on which checks were closed
+    """
+    days = CheckHistory.objects.using(using).annotate(day=TruncDate("date"))
+
+    if since is not None:
+        days = days.filter(day__gte=since)
+    if until is not None:
+        days = days.filter(day__lte=until)
+
+    return list(days.order_by("day").values_list("day", flat=True).distinct())
+
+
+def pending_days(root, snapshot_format="parquet", since=None, until=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns days with sales which have not been exported yet.
+    The current day is still open and is never pending
+    """
+    yesterday = timezone.localdate() - datetime.timedelta(days=1)
+    until = yesterday if until is None else min(until, yesterday)
+    exported = exported_days(root, snapshot_format)
+
+    return [day for day in sales_days(since, until, using) if day not in exported]
+
+
+def day_lines(day, chunk_size, using=DEFAULT_DB_ALIAS):
+    """
+    Yields rows of the day's sales lines, read chunk_size rows at a time
+    """
+    since, until = date_range(day, day)
+    queryset = (
+        SpecificMealHistory.objects.using(using)
+        .filter(order_id__order_check__date__gte=since, order_id__order_check__date__lt=until)
+        .order_by("id")
+        .values_list(*(lookup for _, lookup, _ in COLUMNS))
+    )
+
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def to_batch(rows):
+    """
+    Builds an Arrow record batch from rows of COLUMNS
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    values = dict(zip((name for name, _, _ in COLUMNS), columns))
+
+    values["line_total"] = [price * amount for price, amount in zip(values["price"], values["amount"])]
+    values["hour"] = [timezone.localtime(date).hour for date in values["check_date"]]
+
+    arrays = [pa.array(values[field.name], type=field.type) for field in SCHEMA]
+    return pa.RecordBatch.from_arrays(arrays, schema=SCHEMA)
+
+
+def open_writer(path, snapshot_format):
+    if snapshot_format == "parquet":
+        return pq.ParquetWriter(path, SCHEMA)
+
+    if snapshot_format == "arrow":
+        return pa.ipc.new_file(path, SCHEMA)
+
+    raise ValueError(f"Unsupported snapshot format: {snapshot_format}")
+
+
+def write_partition(day, root, snapshot_format="parquet", chunk_size=None, using=DEFAULT_DB_ALIAS):
+    """
+    Writes the day's partition and returns the number of rows written.
+    Rows are written in row groups of chunk_size, and the file is moved into
+    place only once complete, so readers never see a half written partition
+    """
+    if chunk_size is None:
+        chunk_size = settings.CHECK_EXPORT_CHUNK_SIZE
+
+    path = partition_path(root, day, snapshot_format)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+
+    rows_written = 0
+    lines = day_lines(day, chunk_size, using)
+    writer = open_writer(tmp_path, snapshot_format)
+    try:
+        while True:
+            rows = list(itertools.islice(lines, chunk_size))
+            if not rows:
+                break
+
+            writer.write_table(pa.Table.from_batches([to_batch(rows)]))
+            rows_written += len(rows)
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+
+    writer.close()
+    os.replace(tmp_path, path)
+
+    return rows_written
+
+
+def export_snapshots(root=None, snapshot_format="parquet", since=None, until=None, force=False,
+                     chunk_size=None, using=DEFAULT_DB_ALIAS):
+    """
+    Writes partitions of every pending day and returns {day: rows written}.
+    With force, days which have already been exported are written again
+    """
+    if root is None:
+        root = settings.ANALYTICS_SNAPSHOT_DIR
+
+    if force:
+        yesterday = timezone.localdate() - datetime.timedelta(days=1)
+        days = sales_days(since, yesterday if until is None else min(until, yesterday), using)
+    else:
+        days = pending_days(root, snapshot_format, since, until, using)
+
+    return {day: write_partition(day, root, snapshot_format, chunk_size, using) for day in days}
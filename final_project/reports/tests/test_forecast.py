@@ -0,0 +1,129 @@
+import datetime
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from meals.models import SpecificMeal
+from meals.tests.utils import MealFactory, SMFactory
+from orders.models import Order
+from orders.tests.utils import OrderFactory, create_user_model
+from reports.forecast import forecast, refresh, smooth
+from reports.models import MealForecast
+
+FORECAST_URL = reverse("reports-forecast")
+
+
+def sell(meal, amount, moment):
+    order = OrderFactory(waiter_id=create_user_model())
+    SMFactory(order_id=order, meal_id=meal, amount=amount)
+    Order.objects.filter(pk=order.pk).update(date=moment)
+    SpecificMeal.objects.filter(order_id=order).update(order_date=moment)
+
+
+class TestSmoothing(TestCase):
+    """
+    Testing exponential smoothing of weekly history
+    """
+
+    def test_weights_decay_from_last_week(self):
+        """
+        Testing that recent weeks weigh more and the weights are normalized
+        """
+        history = np.zeros((1, 2, 24))
+        history[0, 0, 12] = 10
+        history[0, 1, 12] = 20
+
+        result = smooth(history, 0.5)
+
+        # Weights 0.5 and 0.25, normalized to 2/3 and 1/3
+        self.assertAlmostEqual(result[0, 12], 10 * 2 / 3 + 20 / 3)
+        self.assertEqual(result.shape, (1, 24))
+
+    def test_weeks_before_first_sale_and_closed_weeks_are_skipped(self):
+        """
+        Testing that a new meal is not averaged with weeks it was not sold in yet,
+        and that weeks with no sales at all are left out
+        """
+        history = np.zeros((2, 3, 24))
+        history[0, 0, 18] = 6
+        history[1, 0, 18] = 4
+        history[1, 2, 18] = 8
+
+        result = smooth(history, 0.3)
+
+        self.assertAlmostEqual(result[0, 18], 6)
+        # Week 1 was closed, so only weeks 0 and 2 are averaged
+        self.assertAlmostEqual(result[1, 18], (0.3 * 4 + 0.3 * 0.49 * 8) / (0.3 + 0.3 * 0.49))
+
+
+class TestForecast(TestCase):
+    """
+    Testing demand forecast per meal and hour
+    """
+
+    def setUp(self):
+        self.day = timezone.localdate() + datetime.timedelta(days=1)
+        self.meal = MealFactory()
+        self.other_meal = MealFactory()
+        tz = timezone.get_current_timezone()
+
+        for weeks_ago in (1, 2):
+            sold_on = self.day - datetime.timedelta(weeks=weeks_ago)
+            sell(self.meal, 3, tz.localize(datetime.datetime.combine(sold_on, datetime.time(13, 15))))
+        sell(self.other_meal, 5, tz.localize(datetime.datetime.combine(
+            self.day - datetime.timedelta(days=1), datetime.time(13, 15)
+        )))
+
+    def test_forecast_from_same_weekday(self):
+        """
+        Testing that only sales of the same weekday are used, at their local hour
+        """
+        meals, quantities = forecast(self.day, 0.5)
+
+        self.assertEqual(list(meals), [self.meal.id])
+        self.assertAlmostEqual(quantities[0, 13], 3)
+        self.assertAlmostEqual(quantities.sum(), 3)
+
+    def test_refresh_replaces_forecasts(self):
+        """
+        Testing that refresh stores forecasts of tomorrow and replaces the previous ones
+        """
+        MealForecast.objects.create(day=self.day, meal_id=self.other_meal, hour=9, quantity=1)
+
+        self.assertEqual(refresh(), 1)
+
+        forecast_row = MealForecast.objects.get(day=self.day)
+        self.assertEqual((forecast_row.meal_id_id, forecast_row.hour, forecast_row.quantity), (self.meal.id, 13, 3))
+
+    def test_command(self):
+        """
+        Testing forecast_demand command
+        """
+        call_command("forecast_demand", "--day", self.day.isoformat(), stdout=StringIO())
+
+        self.assertEqual(MealForecast.objects.filter(day=self.day).count(), 1)
+
+    def test_forecast_endpoint(self):
+        """
+        Testing reports/forecast/ endpoint
+        """
+        refresh(self.day)
+        client = APIClient()
+        client.force_authenticate(create_user_model())
+
+        response = client.get(FORECAST_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["meals"][0]["meal_id"], self.meal.id)
+        self.assertEqual(response.data["meals"][0]["total"], 3)
+        self.assertEqual(response.data["meals"][0]["hourly"][13], 3)
+
+        response = client.get(FORECAST_URL, {"meals": f"{self.other_meal.id}"})
+
+        self.assertEqual(response.data["meals"], [])
@@ -0,0 +1,117 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Check, Order
+from orders.tests.utils import OrderFactory, TableFactory, create_user_model
+from reports.models import TableOccupancy
+from reports.occupancy import hourly_segments, occupancy, rebuild, table_report
+from users.models import User
+from users.tests.utils import RoleFactory
+
+TABLES_REPORT_URL = reverse("reports-tables")
+
+
+class TestTableOccupancy(TestCase):
+    """
+    Testing the occupancy timeline of tables
+    """
+
+    def setUp(self):
+        self.day = timezone.localdate() - datetime.timedelta(days=1)
+        self.waiter = create_user_model()
+        self.table = TableFactory()
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(datetime.datetime.combine(self.day, datetime.time(hour, minute)))
+
+    def seat(self, seated_at, left_at, table=None):
+        order = OrderFactory(waiter_id=self.waiter, table_id=table or self.table)
+        Order.objects.filter(pk=order.pk).update(date=seated_at)
+        order.refresh_from_db()
+
+        check = Check.objects.create_check(order_id=order)
+        Check.objects.filter(pk=check.pk).update(date=left_at)
+        check.refresh_from_db()
+
+        # Dates are moved after the check was rolled up, roll it up again with the final ones
+        TableOccupancy.objects.all().delete()
+        rebuild()
+        return check
+
+    def test_hourly_segments(self):
+        """
+        Testing that a seating is cut at hour boundaries
+        """
+        segments = list(hourly_segments(self.at(12, 30), self.at(14, 15)))
+
+        self.assertEqual([seconds for _, seconds in segments], [1800, 3600, 900])
+        self.assertEqual(segments[0][0], self.at(12))
+
+    def test_new_check_is_added_to_timeline(self):
+        """
+        Testing that creating a check adds its seating and deleting it takes it away
+        """
+        order = OrderFactory(waiter_id=self.waiter, table_id=self.table)
+        check = Check.objects.create_check(order_id=order)
+
+        self.assertEqual(TableOccupancy.objects.get().seatings, 1)
+
+        check.delete()
+        self.assertFalse(TableOccupancy.objects.exists())
+
+    def test_occupancy_between_moments(self):
+        """
+        Testing occupancy of a range from the timeline
+        """
+        self.seat(self.at(12, 30), self.at(14, 15))
+        self.seat(self.at(19), self.at(20))
+
+        self.assertEqual(occupancy(self.at(12), self.at(15)), {self.table.id: 6300})
+        self.assertEqual(occupancy(self.at(13), self.at(14)), {self.table.id: 3600})
+
+    def test_rebuild_range_keeps_hours_outside(self):
+        """
+        Testing that a partial rebuild only rewrites hours inside of its range
+        """
+        self.seat(self.at(12, 30), self.at(14, 15))
+
+        rebuild(since=self.at(13), until=self.at(14))
+
+        self.assertEqual(occupancy(self.at(0), self.at(23)), {self.table.id: 6300})
+
+    def test_table_report(self):
+        """
+        Testing turnover, dwell time and heatmap of tables
+        """
+        other_table = TableFactory()
+        self.seat(self.at(12), self.at(13))
+        self.seat(self.at(13), self.at(13, 30))
+        self.seat(self.at(18), self.at(20), table=other_table)
+
+        report = table_report(self.at(0), self.at(0) + datetime.timedelta(days=1))
+        first, second = report["tables"]
+
+        self.assertEqual((first["seatings"], first["average_dwell"]), (2, 2700))
+        self.assertEqual(first["turnover_per_day"], 2)
+        self.assertEqual(second["occupancy"], round(2 / 24, 4))
+        self.assertEqual(report["heatmap"]["y"], [self.table.id, other_table.id])
+        self.assertEqual(report["heatmap"]["values"][0][12:14], [1.0, 0.5])
+
+    def test_tables_endpoint(self):
+        """
+        Testing reports/tables/ endpoint
+        """
+        self.seat(self.at(12), self.at(13))
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("admin", RoleFactory().id, "admin"))
+
+        response = client.get(TABLES_REPORT_URL, {"start": self.day, "end": self.day, "tables": str(self.table.id)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["tables"][0]["seatings"], 1)
+        self.assertEqual(len(response.data["heatmap"]["values"][0]), 24)
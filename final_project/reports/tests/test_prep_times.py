@@ -0,0 +1,88 @@
+import datetime
+
+import numpy as np
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from meals.tests.utils import MealFactory, SMFactory
+from orders.models import Status
+from orders.tests.utils import OrderFactory, create_user_model
+from reports.models import PrepTime
+from reports.prep_times import refresh, stage_matrix
+
+PREP_TIMES_URL = reverse("reports-prep-times")
+
+
+class TestPrepTimes(TestCase):
+    """
+    Testing kitchen prep time percentiles
+    """
+
+    def setUp(self):
+        self.user = create_user_model()
+        self.meal = MealFactory()
+        self.other_meal = MealFactory()
+
+    def create_order(self, meals, timeline):
+        order = OrderFactory(waiter_id=self.user)
+        for meal in meals:
+            SMFactory(order_id=order, meal_id=meal)
+
+        for name, minutes in timeline:
+            status = Status.objects.create(order_id=order, name=name)
+            Status.objects.filter(pk=status.pk).update(date=order.date + datetime.timedelta(minutes=minutes))
+
+        return order
+
+    def test_stage_matrix(self):
+        """
+        Testing that the first time of every stage is taken and unknown statuses are ignored
+        """
+        orders, matrix = stage_matrix(
+            [2, 1, 1, 1, 2],
+            ["Ordered", "ordered", "ready", "ordered", "lost"],
+            [5, 10, 30, 8, 1],
+            ["ordered", "ready"],
+        )
+
+        self.assertEqual(list(orders), [1, 2])
+        self.assertEqual(list(matrix[0]), [8, 30])
+        self.assertTrue(np.isnan(matrix[1, 1]))
+
+    def test_refresh_computes_percentiles(self):
+        """
+        Testing p50/p90 per meal, per department and kitchen wide
+        """
+        self.create_order([self.meal], [("ordered", 0), ("cooking", 2), ("ready", 10)])
+        self.create_order([self.meal, self.other_meal], [("ordered", 0), ("ready", 20), ("served", 25)])
+
+        refresh()
+
+        meal = PrepTime.objects.get(meal_id=self.meal, from_stage="ordered", to_stage="ready")
+        self.assertEqual(meal.samples, 2)
+        self.assertEqual((meal.p50, meal.p90), (15 * 60, 19 * 60))
+
+        other = PrepTime.objects.get(meal_id=self.other_meal, from_stage="ordered", to_stage="ready")
+        self.assertEqual(other.p50, 20 * 60)
+
+        department = PrepTime.objects.get(
+            department_id=self.meal.category_id.department_id, from_stage="ordered", to_stage="ready"
+        )
+        self.assertEqual(department.samples, 2)
+
+        kitchen = PrepTime.objects.get(meal_id=None, department_id=None, from_stage="ordered", to_stage="ready")
+        self.assertEqual(kitchen.samples, 2)
+        self.assertFalse(PrepTime.objects.filter(from_stage="cooking", to_stage="served").exists())
+
+    def test_prep_times_endpoint(self):
+        """
+        Testing that prep times of a meal are served
+        """
+        self.create_order([self.meal], [("ordered", 0), ("ready", 10)])
+        refresh()
+
+        response = APIClient().get(PREP_TIMES_URL, {"meal_id": self.meal.id})
+
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["p50"], 600)
@@ -0,0 +1,149 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from meals.tests.utils import MealFactory, SMFactory
+from orders.models import Check
+from orders.tests.utils import OrderFactory, create_user_model
+from reports.models import DailyChecks, DailySales
+from reports.rollups import rebuild
+from users.models import User
+from users.tests.utils import RoleFactory
+
+SALES_REPORT_URL = reverse("reports-sales")
+
+
+class TestSalesRollups(TestCase):
+    """
+    Testing incremental daily sales rollups
+    """
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.waiter = create_user_model()
+        self.meal = MealFactory(price=100)
+
+    def create_check(self, *amounts):
+        order = OrderFactory(waiter_id=self.waiter)
+        for amount in amounts:
+            SMFactory(order_id=order, meal_id=self.meal, amount=amount)
+
+        return Check.objects.create_check(order_id=order)
+
+    def get_rollup(self):
+        sales = DailySales.objects.get(day=self.today, meal_id=self.meal)
+        checks = DailyChecks.objects.get(day=self.today, waiter_id=self.waiter)
+        return sales, checks
+
+    def test_check_is_rolled_up(self):
+        """
+        Testing that creating checks adds them to the rollups of the day
+        """
+        self.create_check(2)
+        check = self.create_check(1, 3)
+
+        sales, checks = self.get_rollup()
+
+        self.assertEqual(sales.quantity, 6)
+        self.assertEqual(sales.revenue, 600)
+        self.assertEqual(sales.department_id, self.meal.category_id.department_id)
+        self.assertEqual(checks.checks, 2)
+        self.assertEqual(checks.total_sum, 600)
+        self.assertEqual(checks.service_fee, 150)
+        self.assertEqual(check.total_sum, 400)
+
+    def test_deleted_check_is_rolled_back(self):
+        """
+        Testing that deleting a check takes it out of the rollups
+        """
+        self.create_check(2)
+        self.create_check(1).delete()
+
+        sales, checks = self.get_rollup()
+        self.assertEqual(sales.quantity, 2)
+        self.assertEqual(checks.checks, 1)
+
+        Check.objects.all().delete()
+        self.assertFalse(DailySales.objects.exists())
+        self.assertFalse(DailyChecks.objects.exists())
+
+    def test_rebuild_matches_incremental_rollups(self):
+        """
+        Testing that a rebuild reproduces the incrementally kept rollups
+        """
+        self.create_check(2)
+        self.create_check(5)
+        incremental = list(DailySales.objects.values("day", "meal_id", "waiter_id", "quantity", "revenue"))
+
+        DailySales.objects.update(quantity=0)
+        rebuild()
+
+        rebuilt = list(DailySales.objects.values("day", "meal_id", "waiter_id", "quantity", "revenue"))
+        self.assertEqual(rebuilt, incremental)
+        self.assertEqual(DailyChecks.objects.get().checks, 2)
+
+    def test_rebuild_range(self):
+        """
+        Testing that a rebuild leaves days outside of its range untouched
+        """
+        self.create_check(2)
+        yesterday = self.today - datetime.timedelta(days=1)
+
+        rebuild(since=yesterday, until=yesterday)
+
+        self.assertEqual(DailySales.objects.get().quantity, 2)
+
+
+class TestSalesReportView(TestCase):
+    """
+    Testing reports/sales/ endpoint
+    """
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", RoleFactory().id, "admin"))
+
+        waiter = create_user_model()
+        self.meals = [MealFactory(price=100), MealFactory(price=50)]
+        order = OrderFactory(waiter_id=waiter)
+        for meal in self.meals:
+            SMFactory(order_id=order, meal_id=meal, amount=2)
+        Check.objects.create_check(order_id=order)
+
+    def test_sales_by_meal(self):
+        """
+        Testing that sales are grouped by the requested dimensions
+        """
+        response = self.client.get(SALES_REPORT_URL, {"start": self.today, "end": self.today, "group_by": "day,meal"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["totals"]["revenue"], 300)
+        self.assertEqual(response.data["totals"]["checks"], 1)
+        self.assertEqual(
+            [(row["meal_id"], row["revenue"]) for row in response.data["rows"]],
+            sorted([(self.meals[0].id, 200), (self.meals[1].id, 100)])
+        )
+
+    def test_empty_range(self):
+        """
+        Testing that a range without sales returns zero totals
+        """
+        yesterday = self.today - datetime.timedelta(days=1)
+
+        response = self.client.get(SALES_REPORT_URL, {"start": yesterday, "end": yesterday})
+
+        self.assertEqual(response.data["totals"]["total_sum"], 0)
+        self.assertEqual(response.data["rows"], [])
+
+    def test_unknown_dimension(self):
+        """
+        Testing that unknown dimensions are rejected
+        """
+        response = self.client.get(SALES_REPORT_URL, {"start": self.today, "end": self.today, "group_by": "hour"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,80 @@
+import datetime
+import io
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from meals.tests.utils import SMFactory
+from orders.models import Check
+from orders.tests.utils import OrderFactory, create_user_model
+from reports.snapshots import export_snapshots, partition_path, pending_days
+
+
+class TestSnapshots(TestCase):
+    """
+    Testing columnar snapshots of sales lines
+    """
+
+    def setUp(self):
+        self.day = timezone.localdate() - datetime.timedelta(days=2)
+        self.user = create_user_model()
+
+        self.order = OrderFactory(waiter_id=self.user)
+        self.lines = [SMFactory(order_id=self.order), SMFactory(order_id=self.order)]
+        self.check = self.close_order(self.order, self.day)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+
+    def close_order(self, order, day):
+        check = Check.objects.create_check(order_id=order)
+        closed_at = timezone.make_aware(datetime.datetime.combine(day, datetime.time(13, 30)))
+        Check.objects.filter(pk=check.pk).update(date=closed_at)
+        return check
+
+    def test_export_writes_denormalized_lines(self):
+        """
+        Testing that a partition holds one row per line with meal, category, department and check columns
+        """
+        exported = export_snapshots(self.root, chunk_size=1)
+
+        self.assertEqual(exported, {self.day: 2})
+
+        table = pq.read_table(partition_path(self.root, self.day)).to_pydict()
+        line = self.lines[0]
+        self.assertEqual(table["line_id"], [line.id for line in self.lines])
+        self.assertEqual(table["department_id"][0], line.meal_id.category_id.department_id.id)
+        self.assertEqual(table["line_total"][0], line.meal_id.price * line.amount)
+        self.assertEqual(table["check_total_sum"][0], self.check.total_sum)
+        self.assertEqual(table["waiter_id"][0], self.user.id)
+        self.assertEqual(table["hour"][0], 13)
+
+    def test_export_is_incremental(self):
+        """
+        Testing that exported days and the current day are not exported
+        """
+        export_snapshots(self.root)
+
+        later = self.day + datetime.timedelta(days=1)
+        self.close_order(OrderFactory(waiter_id=self.user), later)
+        self.close_order(OrderFactory(waiter_id=self.user), timezone.localdate())
+
+        self.assertEqual(pending_days(self.root), [later])
+        self.assertEqual(list(export_snapshots(self.root)), [later])
+        self.assertEqual(export_snapshots(self.root), {})
+
+    def test_export_arrow_command(self):
+        """
+        Testing that the command writes Arrow IPC files
+        """
+        call_command("export_snapshots", root=self.root, format="arrow", stdout=io.StringIO())
+
+        with pa.memory_map(partition_path(self.root, self.day, "arrow")) as source:
+            table = pa.ipc.open_file(source).read_all()
+
+        self.assertEqual(table.num_rows, 2)
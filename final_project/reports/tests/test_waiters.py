@@ -0,0 +1,134 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from meals.tests.utils import MealFactory, SMFactory
+from orders.models import Check
+from orders.tests.utils import OrderFactory, create_user_model
+from reports.waiters import DAY_VERSION_KEY, cached_waiter_report, touch_day, waiter_report
+from users.models import User
+from users.tests.utils import RoleFactory
+
+WAITERS_REPORT_URL = reverse("reports-waiters")
+
+
+def close_order(waiter, covers, price, minutes):
+    order = OrderFactory(waiter_id=waiter, covers=covers)
+    SMFactory(order_id=order, meal_id=MealFactory(price=price), amount=1)
+    check = Check.objects.create_check(order_id=order)
+    Check.objects.filter(pk=check.pk).update(date=order.date + datetime.timedelta(minutes=minutes))
+    return order
+
+
+class TestWaiterReport(TestCase):
+    """
+    Testing waiter performance report
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        self.waiter = create_user_model()
+        self.other_waiter = create_user_model()
+
+        close_order(self.waiter, 2, 100, 30)
+        close_order(self.waiter, 4, 300, 60)
+        OrderFactory(waiter_id=self.waiter, covers=3)
+        close_order(self.other_waiter, 1, 50, 10)
+
+    def test_report_per_waiter(self):
+        """
+        Testing that orders, covers, revenue, average check and time to close are aggregated per waiter
+        """
+        rows = {row["waiter_id"]: row for row in waiter_report(self.today, self.today)}
+        row = rows[self.waiter.id]
+
+        self.assertEqual(row["day"], self.today)
+        self.assertEqual((row["orders"], row["checks"], row["covers"]), (3, 2, 9))
+        self.assertEqual(row["revenue"], 400)
+        self.assertEqual(row["average_check"], 200)
+        self.assertAlmostEqual(row["average_time_to_close"], 45 * 60, delta=1)
+        self.assertEqual(rows[self.other_waiter.id]["orders"], 1)
+
+    def test_report_of_waiter_set(self):
+        """
+        Testing that the report can be limited to some waiters
+        """
+        rows = waiter_report(self.today, self.today, [self.other_waiter.id])
+
+        self.assertEqual([row["waiter_id"] for row in rows], [self.other_waiter.id])
+
+    def test_cached_report_is_invalidated_by_its_days(self):
+        """
+        Testing that a cached report is reused until one of its days changes
+        """
+        yesterday = self.today - datetime.timedelta(days=1)
+        report = cached_waiter_report(yesterday, self.today)
+        close_order(self.other_waiter, 1, 50, 10)
+
+        touch_day(yesterday - datetime.timedelta(days=1))
+        self.assertEqual(cached_waiter_report(yesterday, self.today), report)
+
+        touch_day(self.today)
+        self.assertNotEqual(cached_waiter_report(yesterday, self.today), report)
+
+    def test_version_written_by_another_worker(self):
+        """
+        Testing that a day version replaced in the cache by another worker invalidates the report here
+        """
+        report = cached_waiter_report(self.today, self.today)
+        close_order(self.other_waiter, 1, 50, 10)
+
+        cache.set(DAY_VERSION_KEY.format(day=self.today), "written elsewhere", None)
+
+        self.assertNotEqual(cached_waiter_report(self.today, self.today), report)
+
+    def test_report_endpoint(self):
+        """
+        Testing reports/waiters/ endpoint
+        """
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("admin", RoleFactory().id, "admin"))
+
+        response = client.get(
+            WAITERS_REPORT_URL, {"start": self.today, "end": self.today, "waiters": f"{self.waiter.id}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rows"][0]["covers"], 9)
+
+    def test_report_endpoint_rejects_bad_waiters(self):
+        """
+        Testing that waiters which are not ids are rejected
+        """
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("admin", RoleFactory().id, "admin"))
+
+        response = client.get(WAITERS_REPORT_URL, {"start": self.today, "end": self.today, "waiters": "a,b"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestWaiterReportInvalidation(TransactionTestCase):
+    """
+    Testing that committed checks invalidate cached waiter reports
+    """
+
+    def test_new_check_invalidates_report(self):
+        """
+        Testing that a new check is in the report right after it is committed
+        """
+        cache.clear()
+        today = timezone.localdate()
+        waiter = create_user_model()
+
+        self.assertEqual(cached_waiter_report(today, today), [])
+
+        close_order(waiter, 2, 100, 5)
+
+        self.assertEqual(cached_waiter_report(today, today)[0]["revenue"], 100)
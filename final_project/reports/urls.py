@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("reports/sales/", views.SalesReportView.as_view(), name="reports-sales"),
+    path("reports/waiters/", views.WaiterReportView.as_view(), name="reports-waiters"),
+    path("reports/prepTimes/", views.PrepTimeView.as_view(), name="reports-prep-times"),
+    path("reports/tables/", views.TableReportView.as_view(), name="reports-tables"),
+    path("reports/forecast/", views.ForecastView.as_view(), name="reports-forecast"),
+]
@@ -0,0 +1,137 @@
+import datetime
+
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.mixins import ReplicaReadMixin
+from orders.exports import date_range
+from . import serializers
+from .models import DailyChecks, DailySales, MealForecast, PrepTime
+from .occupancy import table_report
+from .waiters import cached_waiter_report
+
+
+class SalesReportView(ReplicaReadMixin, APIView):
+    """
+    Responsible for sales of a date range, answered from the daily rollups.
+    Accepts start, end and group_by query parameters
+    """
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        params = serializers.SalesReportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end, group_by = (params.validated_data[key] for key in ("start", "end", "group_by"))
+
+        sales = DailySales.objects.filter(day__gte=start, day__lte=end)
+        checks = DailyChecks.objects.filter(day__gte=start, day__lte=end)
+        fields = [serializers.SALES_DIMENSIONS[dimension] for dimension in group_by]
+
+        rows = sales.values(*fields).annotate(quantity=Sum("quantity"), revenue=Sum("revenue")).order_by(*fields)
+        totals = {
+            **sales.aggregate(quantity=Sum("quantity"), revenue=Sum("revenue")),
+            **checks.aggregate(checks=Sum("checks"), total_sum=Sum("total_sum"), service_fee=Sum("service_fee")),
+        }
+
+        return Response({
+            "start": start,
+            "end": end,
+            "totals": {key: value or 0 for key, value in totals.items()},
+            "rows": list(rows),
+        })
+
+
+class WaiterReportView(ReplicaReadMixin, APIView):
+    """
+    Responsible for performance of waiters per shift in a date range.
+    Accepts start, end and waiters query parameters
+    """
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        params = serializers.WaiterReportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end = params.validated_data["start"], params.validated_data["end"]
+
+        return Response({
+            "start": start,
+            "end": end,
+            "rows": cached_waiter_report(start, end, params.validated_data.get("waiters")),
+        })
+
+
+class PrepTimeView(ReplicaReadMixin, ListAPIView):
+    """
+    Responsible for kitchen prep time percentiles, the kitchen display shows expected ready times from them.
+    Accepts optional meal_id, department_id, from_stage and to_stage query parameters,
+    kitchen wide percentiles have neither meal nor department
+    """
+    model = PrepTime
+    serializer_class = serializers.PrepTimeSerializer
+    filter_params = ("meal_id", "department_id", "from_stage", "to_stage")
+
+    def get_queryset(self):
+        queryset = PrepTime.objects.order_by("from_stage", "to_stage", "department_id", "meal_id")
+
+        for field in self.filter_params:
+            value = self.request.query_params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+
+        return queryset
+
+
+class TableReportView(ReplicaReadMixin, APIView):
+    """
+    Responsible for turnover, dwell time and occupancy of tables with a heatmap
+    of occupancy per table and hour of day, answered from the occupancy timeline.
+    Accepts start, end and tables query parameters
+    """
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        params = serializers.TableReportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end = params.validated_data["start"], params.validated_data["end"]
+
+        return Response({
+            "start": start,
+            "end": end,
+            **table_report(*date_range(start, end), params.validated_data.get("tables")),
+        })
+
+
+class ForecastView(ReplicaReadMixin, APIView):
+    """
+    Responsible for the demand forecast of a day per meal and hour, kitchen prep lists are made from it.
+    Accepts day, meals and departments query parameters
+    """
+
+    def get(self, request, *args, **kwargs):
+        params = serializers.ForecastSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        day = params.validated_data.get("day") or timezone.localdate() + datetime.timedelta(days=1)
+
+        forecasts = MealForecast.objects.filter(day=day)
+        if params.validated_data.get("meals"):
+            forecasts = forecasts.filter(meal_id__in=params.validated_data["meals"])
+        if params.validated_data.get("departments"):
+            forecasts = forecasts.filter(meal_id__category_id__department_id__in=params.validated_data["departments"])
+
+        meals = {}
+        for meal_id, hour, quantity in forecasts.values_list("meal_id", "hour", "quantity"):
+            meal = meals.setdefault(meal_id, {"meal_id": meal_id, "total": 0.0, "hourly": [0.0] * 24})
+            meal["hourly"][hour] = quantity
+            meal["total"] += quantity
+
+        for meal in meals.values():
+            meal["total"] = round(meal["total"], 2)
+
+        return Response({
+            "day": day,
+            "meals": sorted(meals.values(), key=lambda meal: (-meal["total"], meal["meal_id"])),
+        })
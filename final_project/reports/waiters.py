@@ -0,0 +1,108 @@
+"""
+Waiter performance per shift, a shift being the day an order was opened.
+
+The report is aggregated by the database, GROUP BY waiter and day over
+orders and their checks, which is served by the (waiter_id, date) index of
+Order. Results are cached per range and waiter set. Every day has a version
+token in the cache which is replaced whenever an order or a check of that
+day is committed, so a cached report is only used while none of its days
+changed. Tokens and reports live in the shared cache (settings.CACHES), a
+write handled by one worker invalidates the reports cached by all of them;
+nothing of the report is kept in the process.
+"""
+import datetime
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+
+from orders.exports import date_range
+from orders.models import OrderHistory
+
+DAY_VERSION_KEY = "reports:waiters:day:{day}"
+REPORT_KEY = "reports:waiters:{digest}"
+
+
+def waiter_report(start, end, waiters=None):
+    """
+    Returns orders, covers, revenue, average check and average time to close per waiter and day
+    """
+    since, until = date_range(start, end)
+    orders = OrderHistory.objects.filter(date__gte=since, date__lt=until)
+
+    if waiters:
+        orders = orders.filter(waiter_id__in=waiters)
+
+    time_to_close = ExpressionWrapper(F("order_check__date") - F("date"), output_field=DurationField())
+    rows = (
+        orders.annotate(day=TruncDate("date"))
+        .values("waiter_id", "day")
+        .annotate(
+            orders=Count("id"),
+            covers=Sum("covers"),
+            checks=Count("order_check"),
+            revenue=Sum("order_check__total_sum"),
+            service_fee=Sum("order_check__service_fee"),
+            average_check=Avg("order_check__total_sum"),
+            average_time_to_close=Avg(time_to_close),
+        )
+        .order_by("day", "waiter_id")
+    )
+
+    return [
+        {
+            **row,
+            "revenue": row["revenue"] or 0,
+            "service_fee": row["service_fee"] or 0,
+            "average_check": round(row["average_check"], 2) if row["average_check"] is not None else None,
+            "average_time_to_close": (
+                row["average_time_to_close"].total_seconds() if row["average_time_to_close"] is not None else None
+            ),
+        }
+        for row in rows
+    ]
+
+
+def days_of(start, end):
+    return [start + datetime.timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def day_versions(start, end):
+    """
+    Returns version tokens of the days of the range, days without one get a fresh token
+    """
+    keys = [DAY_VERSION_KEY.format(day=day) for day in days_of(start, end)]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+
+    return [str(versions[key]) for key in keys]
+
+
+def touch_day(day):
+    """
+    Invalidates cached reports which include day
+    """
+    cache.set(DAY_VERSION_KEY.format(day=day), uuid.uuid4().hex, None)
+
+
+def cached_waiter_report(start, end, waiters=None):
+    """
+    Returns the report of the range from cache, computing it when any of its days has changed
+    """
+    waiters = sorted(set(waiters or ()))
+    identity = f"{start}:{end}:{','.join(map(str, waiters))}:{':'.join(day_versions(start, end))}"
+    key = REPORT_KEY.format(digest=hashlib.sha1(identity.encode()).hexdigest())
+
+    report = cache.get(key)
+    if report is None:
+        report = waiter_report(start, end, waiters)
+        cache.set(key, report, settings.WAITER_REPORT_CACHE_TIMEOUT)
+
+    return report
@@ -1,7 +1,8 @@
 from allauth.account.adapter import DefaultAccountAdapter
 from allauth.account.utils import user_field, user_email
+from django.db import transaction
 
-from users.utils import login_creator
+from users.utils import allocate_login
 
 
 class CustomAccountAdapter(DefaultAccountAdapter):
@@ -24,13 +25,15 @@ class CustomAccountAdapter(DefaultAccountAdapter):
         if phone_number:
             user_field(user, 'phone', phone_number)
 
-        user_field(user, 'login', login_creator(last_name, first_name))
         user.role_id = role_id
         user.set_password(phone_number)
 
-        self.populate_username(request, user)
+        # Login is allocated in the same transaction that saves the user
+        with transaction.atomic():
+            user_field(user, 'login', allocate_login(last_name, first_name))
+            self.populate_username(request, user)
 
-        if commit:
-            user.save()
+            if commit:
+                user.save()
 
         return user
@@ -0,0 +1,20 @@
+from django.utils.translation import ugettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .revocation import get_revocation_store
+
+
+class RevocationAwareJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication which rejects revoked tokens.
+    The check is served from the in-memory revocation store, so it adds no query
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+
+        if get_revocation_store().is_revoked(validated_token.payload):
+            raise InvalidToken(_("Token has been revoked"))
+
+        return validated_token
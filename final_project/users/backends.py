@@ -0,0 +1,20 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .hashing import get_hashing_gate
+
+
+class BoundedHashingBackend(ModelBackend):
+    """
+    Model backend which runs password checks through the process wide hashing gate.
+
+    Both /token/ and LoginSerializer authenticate through it. A successful
+    check also rehashes the password when the preferred hasher or its
+    iterations changed, which happens inside the same slot.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if password is None:
+            return None
+
+        with get_hashing_gate().slot():
+            return super().authenticate(request, username=username, password=password, **kwargs)
@@ -0,0 +1,90 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingBusy(APIException):
+    """
+    Raised when a password hash could not get a slot in time
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many logins at the moment, please try again.")
+    default_code = "hashing_busy"
+
+
+class HashingGate:
+    """
+    Bounds the number of password hashes running at once in this process.
+
+    Hashing is deliberately slow, so a burst of logins can take every CPU of a
+    worker. Extra hashes wait for a free slot for at most `timeout` seconds
+    and fail with HashingBusy afterwards, which keeps other requests served.
+
+    The limit is per process, slots are not shared between worker processes:
+    a host running N workers hashes up to N * concurrency passwords at once,
+    so concurrency is sized by the CPUs left to each worker.
+    """
+
+    def __init__(self, concurrency, timeout):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @contextmanager
+    def slot(self):
+        with self._lock:
+            self.waiting += 1
+
+        acquired = self._slots.acquire(timeout=self.timeout)
+
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.running += 1
+            else:
+                self.rejected += 1
+
+        if not acquired:
+            raise HashingBusy()
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "running": self.running,
+                "waiting": self.waiting,
+                "rejected": self.rejected,
+            }
+
+
+_gate = None
+_gate_lock = threading.Lock()
+
+
+def get_hashing_gate():
+    """
+    Returns the process wide hashing gate configured by PASSWORD_HASH_CONCURRENCY and PASSWORD_HASH_TIMEOUT
+    """
+    global _gate
+
+    if _gate is None:
+        with _gate_lock:
+            if _gate is None:
+                _gate = HashingGate(settings.PASSWORD_HASH_CONCURRENCY, settings.PASSWORD_HASH_TIMEOUT)
+
+    return _gate
@@ -0,0 +1,211 @@
+import csv
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from allauth.account.models import EmailAddress
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from .models import Role, User
+from .utils import allocate_logins, login_creator
+
+IMPORT_FIELDS = ("first_name", "last_name", "email", "phone", "role_id", "password")
+EMAIL_TAKEN = "A user is already registered with this e-mail address."
+LOGIN_TAKEN = "Login {login} was taken meanwhile, import the row again."
+
+
+class UserImportRowSerializer(serializers.Serializer):
+    """
+    Responsible for validating a single row of a bulk user import
+    """
+    first_name = serializers.CharField(max_length=255)
+    last_name = serializers.CharField(max_length=255)
+    email = serializers.EmailField(max_length=255)
+    phone = serializers.CharField(max_length=255)
+    role_id = serializers.IntegerField()
+    password = serializers.CharField(required=False, allow_blank=True)
+
+
+def parse_rows(stream, file_format):
+    """
+    Reads import rows from a CSV or JSON document and returns them as a list of dicts
+    """
+    content = stream.read()
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+
+    if file_format == "json":
+        rows = json.loads(content)
+        if not isinstance(rows, list):
+            raise ValueError("JSON import must be a list of objects")
+        return rows
+
+    if file_format == "csv":
+        return list(csv.DictReader(io.StringIO(content)))
+
+    raise ValueError(f"Unsupported import format: {file_format}")
+
+
+def _init_hashing_worker():
+    """
+    Makes sure Django is configured in spawned hashing processes
+    """
+    if not apps.ready:
+        django.setup()
+
+
+def hash_passwords(passwords, workers=1):
+    """
+    Hashes passwords, spreading the work over a pool of that many processes when it pays off.
+    Meant for the import_users command, a pool started inside a web request would compete with every worker
+    """
+    if workers <= 1 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_hashing_worker) as executor:
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+class UserImporter:
+    """
+    Responsible for creating many users at once.
+
+    Every row is validated on its own, so a broken row is reported instead of
+    failing the whole import. Valid rows are saved with a single bulk insert,
+    or one by one when a concurrent signup has taken an e-mail address of
+    the import since it was validated. Passwords are hashed in this process
+    unless more workers are given.
+    """
+
+    def __init__(self, workers=1):
+        self.workers = workers
+
+    def validate(self, rows):
+        """
+        Returns validated rows together with per-row errors
+        """
+        valid, errors = [], []
+        seen_emails = set()
+
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors.append({"row": index, "errors": {"non_field_errors": ["Row must be an object."]}})
+                continue
+
+            serializer = UserImportRowSerializer(data={key: row.get(key) for key in IMPORT_FIELDS if row.get(key)})
+            if not serializer.is_valid():
+                errors.append({"row": index, "errors": serializer.errors})
+                continue
+
+            data = dict(serializer.validated_data)
+            data["email"] = User.objects.normalize_email(data["email"])
+            if data["email"].lower() in seen_emails:
+                errors.append({"row": index, "errors": {"email": ["Duplicate e-mail address in import."]}})
+                continue
+
+            seen_emails.add(data["email"].lower())
+            valid.append((index, data))
+
+        emails = [data["email"] for _, data in valid]
+        existing_emails = {
+            email.lower() for email in User.objects.filter(email__in=emails).values_list("email", flat=True)
+        } | {
+            email.lower() for email in EmailAddress.objects.filter(email__in=emails).values_list("email", flat=True)
+        }
+        roles = Role.objects.in_bulk({data["role_id"] for _, data in valid})
+
+        accepted = []
+        for index, data in valid:
+            if data["email"].lower() in existing_emails:
+                errors.append({"row": index, "errors": {"email": [EMAIL_TAKEN]}})
+            elif data["role_id"] not in roles:
+                errors.append({"row": index, "errors": {"role_id": [f"Role {data['role_id']} does not exist."]}})
+            else:
+                data["role_id"] = roles[data["role_id"]]
+                accepted.append((index, data))
+
+        return accepted, errors
+
+    def run(self, rows):
+        """
+        Imports rows and returns a report with created users and per-row errors
+        """
+        accepted, errors = self.validate(rows)
+
+        if not accepted:
+            return {"created": [], "errors": sorted(errors, key=lambda error: error["row"])}
+
+        passwords = hash_passwords([data.get("password") or data["phone"] for _, data in accepted], self.workers)
+
+        with transaction.atomic():
+            logins = allocate_logins([login_creator(data["last_name"], data["first_name"]) for _, data in accepted])
+            users = [
+                (index, User(
+                    email=data["email"],
+                    first_name=data["first_name"],
+                    last_name=data["last_name"],
+                    login=login,
+                    phone=data["phone"],
+                    role_id=data["role_id"],
+                    password=password,
+                ))
+                for (index, data), login, password in zip(accepted, logins, passwords)
+            ]
+
+            try:
+                with transaction.atomic():
+                    ids = self.save([user for _, user in users])
+            except IntegrityError:
+                users, ids = self.save_one_by_one(users, errors)
+
+        created = [{"row": index, "id": ids[user.login], "login": user.login} for index, user in users]
+
+        return {"created": created, "errors": sorted(errors, key=lambda error: error["row"])}
+
+    def save(self, users):
+        """
+        Saves users with their e-mail addresses, returns {login: id} of them
+        """
+        User.objects.bulk_create(users)
+        ids = dict(User.objects.filter(login__in=[user.login for user in users]).values_list("login", "id"))
+        EmailAddress.objects.bulk_create([
+            EmailAddress(user_id=ids[user.login], email=user.email, primary=True, verified=False)
+            for user in users
+        ])
+
+        return ids
+
+    def save_one_by_one(self, users, errors):
+        """
+        Saves (row, user) pairs one at a time, rows which can't be saved, e.g. whose e-mail address was taken
+        meanwhile, are added to errors. Returns the saved pairs and {login: id} of their users
+        """
+        saved, ids = [], {}
+        for index, user in users:
+            try:
+                with transaction.atomic():
+                    ids.update(self.save([user]))
+            except IntegrityError as error:
+                errors.append({"row": index, "errors": self.integrity_errors(user, error)})
+            else:
+                saved.append((index, user))
+
+        return saved, ids
+
+    def integrity_errors(self, user, error):
+        """
+        Returns errors of a user which violated a constraint, telling which one when it can be found out
+        """
+        if User.objects.filter(email__iexact=user.email).exists() \
+                or EmailAddress.objects.filter(email__iexact=user.email).exists():
+            return {"email": [EMAIL_TAKEN]}
+
+        if User.objects.filter(login=user.login).exists():
+            return {"non_field_errors": [LOGIN_TAKEN.format(login=user.login)]}
+
+        return {"non_field_errors": [str(error)]}
@@ -0,0 +1,50 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from core.benchmark import http_call, run_concurrently, summarize
+
+
+class Command(BaseCommand):
+    """
+    Measures how a burst of logins affects latency of other endpoints on a running server
+    """
+    help = "Fires a burst of /token/ logins and measures latency of a probe endpoint meanwhile"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Address of a running server")
+        parser.add_argument("--login", required=True, help="Login of an existing user")
+        parser.add_argument("--password", required=True, help="Password of that user")
+        parser.add_argument("--logins", type=int, default=40, help="Number of logins in the burst")
+        parser.add_argument("--probe", default="/tables/", help="Endpoint whose latency is measured")
+        parser.add_argument("--probes", type=int, default=200, help="Number of probe requests per phase")
+        parser.add_argument("--concurrency", type=int, default=4, help="Concurrent probe requests")
+
+    def probe(self, options):
+        url = options["base_url"].rstrip("/") + options["probe"]
+        return run_concurrently(lambda: http_call("GET", url), options["probes"], options["concurrency"])
+
+    def handle(self, *args, **options):
+        token_url = options["base_url"].rstrip("/") + "/token/"
+        credentials = {"login": options["login"], "password": options["password"]}
+
+        baseline = self.probe(options)
+
+        logins = []
+        storm = threading.Thread(target=lambda: logins.extend(
+            run_concurrently(lambda: http_call("POST", token_url, credentials), options["logins"], options["logins"])
+        ))
+        storm.start()
+        during_storm = self.probe(options)
+        storm.join()
+
+        self.report("probe without logins", baseline)
+        self.report("probe during login burst", during_storm)
+        self.report("logins", logins)
+
+    def report(self, name, results):
+        statuses = {}
+        for code, _ in results:
+            statuses[code] = statuses.get(code, 0) + 1
+
+        self.stdout.write(f"{name}: {summarize([elapsed for _, elapsed in results])} statuses={statuses}")
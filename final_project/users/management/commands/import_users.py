@@ -0,0 +1,45 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.importers import UserImporter, parse_rows
+
+
+class Command(BaseCommand):
+    """
+    Imports users from a CSV or JSON file
+    """
+    help = "Creates users in bulk from a CSV or JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to a .csv or .json file with user rows")
+        parser.add_argument("--format", choices=("csv", "json"), help="File format, guessed from extension by default")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.USER_IMPORT_HASH_WORKERS,
+            help="Number of password hashing processes",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+
+        try:
+            with open(path, "rb") as stream:
+                rows = parse_rows(stream, file_format)
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        report = UserImporter(workers=options["workers"]).run(rows)
+
+        for user in report["created"]:
+            self.stdout.write(f"row {user['row']}: created {user['login']}")
+
+        for error in report["errors"]:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(report['created'])} users, {len(report['errors'])} rows failed"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users.revocation import get_revocation_store
+
+
+class Command(BaseCommand):
+    """
+    Deletes revocation records of tokens which expired anyway
+    """
+    help = "Prunes expired rows from the token revocation table"
+
+    def handle(self, *args, **options):
+        deleted = get_revocation_store().prune()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} expired revocations"))
@@ -1,9 +1,9 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
     PermissionsMixin
-from django.db import models
+from django.db import models, transaction
 from django.db.utils import IntegrityError
 
-from .utils import login_creator
+from .utils import allocate_login
 
 
 class Role(models.Model):
@@ -36,8 +36,6 @@ class UserManager(BaseUserManager):
         if not role_id:
             raise IntegrityError("Role is required!")
 
-        login = login_creator(last_name, first_name)
-
         try:
             password = extra_fields["password"]
         except KeyError:
@@ -47,13 +45,15 @@ class UserManager(BaseUserManager):
             email=self.normalize_email(email),
             first_name=first_name,
             last_name=last_name,
-            login=login,
             phone=phone,
             role_id=role_id,
             **extra_fields
         )
         user.set_password(password)
-        user.save(using=self._db)
+
+        with transaction.atomic(using=self.db):
+            user.login = allocate_login(last_name, first_name, using=self.db)
+            user.save(using=self._db)
 
         return user
 
@@ -108,3 +108,16 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
 
+
+class RevokedToken(models.Model):
+    """
+    Compact record of a revoked token.
+    Rows with an empty jti revoke every token of the user issued before revoked_at
+    """
+    jti = models.CharField(max_length=64, blank=True)
+    user_id = models.IntegerField(null=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.jti or 'all tokens'} of user {self.user_id}, until {self.expires_at}"
@@ -0,0 +1,188 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+VERSION_KEY = "users:revocation:version"
+
+
+def issued_at(payload):
+    """
+    Returns the unix time a token was issued at.
+    Tokens without an "iat" claim are dated back from their expiry by the lifetime of their type
+    """
+    if "iat" in payload:
+        return payload["iat"]
+
+    lifetime = api_settings.REFRESH_TOKEN_LIFETIME if payload.get(api_settings.TOKEN_TYPE_CLAIM) == "refresh" \
+        else api_settings.ACCESS_TOKEN_LIFETIME
+
+    return payload["exp"] - lifetime.total_seconds()
+
+
+class RevocationStore:
+    """
+    In-memory view of the RevokedToken table.
+
+    Lookups are served from a hash set of revoked JTIs and a dict of users whose
+    tokens were revoked as a whole, so checking a token costs no query.
+    Every committed revocation bumps a version in the shared cache, and a check
+    which sees a version the process has not loaded refreshes first, so a
+    revocation takes effect in every process at once. Without the cache the
+    process still refreshes every TOKEN_REVOCATION_REFRESH_INTERVAL seconds.
+    A refresh reads rows past the last id it has seen, along with the rows
+    revoked in the last TOKEN_REVOCATION_SETTLE_SECONDS, as a row may commit
+    after one with a greater id.
+    """
+
+    def __init__(self, refresh_interval, settle_seconds=None):
+        self.refresh_interval = refresh_interval
+        self.settle_seconds = settings.TOKEN_REVOCATION_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+        self._lock = threading.Lock()
+        self._jtis = {}
+        self._users = {}
+        self._last_id = 0
+        self._version = None
+        self._refreshed_at = None
+
+    def _add(self, jti, user_id, revoked_at, expires_at):
+        expires_at = expires_at.timestamp()
+
+        if jti:
+            self._jtis[jti] = max(expires_at, self._jtis.get(jti, 0))
+        elif user_id is not None:
+            revoked_before, until = self._users.get(user_id, (0, 0))
+            self._users[user_id] = (max(revoked_at.timestamp(), revoked_before), max(expires_at, until))
+
+    def _forget_expired(self):
+        # Tokens expired anyway, their entries are not needed any more
+        now = time.time()
+        self._jtis = {jti: until for jti, until in self._jtis.items() if until > now}
+        self._users = {user_id: entry for user_id, entry in self._users.items() if entry[1] > now}
+
+    def _is_fresh(self, now, version):
+        return (
+            self._refreshed_at is not None
+            and now - self._refreshed_at < self.refresh_interval
+            and version == self._version
+        )
+
+    def refresh(self, force=False):
+        """
+        Loads rows added since the last refresh and forgets tokens that expired
+        """
+        now = time.monotonic()
+        # Read before loading, revocations committed meanwhile make the next check refresh again
+        version = cache.get(VERSION_KEY)
+
+        if not force and self._is_fresh(now, version):
+            return
+
+        with self._lock:
+            if not force and self._is_fresh(now, version):
+                return
+
+            current = timezone.now()
+            rows = RevokedToken.objects.filter(
+                Q(id__gt=self._last_id) | Q(revoked_at__gte=current - timedelta(seconds=self.settle_seconds)),
+                expires_at__gt=current,
+            ).order_by("id").values_list("id", "jti", "user_id", "revoked_at", "expires_at")
+
+            for row_id, jti, user_id, revoked_at, expires_at in rows:
+                self._add(jti, user_id, revoked_at, expires_at)
+                self._last_id = max(row_id, self._last_id)
+
+            self._forget_expired()
+            self._version, self._refreshed_at = version, now
+
+    def _publish_on_commit(self, row):
+        """
+        Adds a revocation to memory and tells other processes about it once it is committed
+        """
+        def publish():
+            with self._lock:
+                self._add(row.jti, row.user_id, row.revoked_at, row.expires_at)
+
+            cache.add(VERSION_KEY, random.getrandbits(48), timeout=None)
+            try:
+                cache.incr(VERSION_KEY)
+            except ValueError:
+                # Evicted between add and incr, processes refresh on the next check as the version is gone
+                pass
+
+        transaction.on_commit(publish, using=row._state.db)
+
+    def is_revoked(self, payload):
+        """
+        Checks a decoded token payload against revoked JTIs and users
+        """
+        self.refresh()
+
+        if payload.get(api_settings.JTI_CLAIM) in self._jtis:
+            return True
+
+        revoked = self._users.get(payload.get(api_settings.USER_ID_CLAIM))
+
+        return revoked is not None and issued_at(payload) <= revoked[0]
+
+    def revoke_token(self, token):
+        """
+        Revokes a single token until it expires
+        """
+        row = RevokedToken.objects.create(
+            jti=token[api_settings.JTI_CLAIM],
+            user_id=token.get(api_settings.USER_ID_CLAIM),
+            expires_at=datetime.fromtimestamp(token["exp"], tz=timezone.utc),
+        )
+        self._publish_on_commit(row)
+
+        return row
+
+    def revoke_user(self, user_id):
+        """
+        Revokes every token issued to the user so far
+        """
+        longest = max(api_settings.REFRESH_TOKEN_LIFETIME, api_settings.ACCESS_TOKEN_LIFETIME)
+        row = RevokedToken.objects.create(user_id=user_id, expires_at=timezone.now() + longest)
+        self._publish_on_commit(row)
+
+        return row
+
+    def prune(self):
+        """
+        Deletes rows of tokens that expired anyway and forgets them in memory.
+        Returns number of deleted rows
+        """
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+
+        with self._lock:
+            self._forget_expired()
+
+        return deleted
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_revocation_store():
+    """
+    Returns the process wide revocation store
+    """
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RevocationStore(settings.TOKEN_REVOCATION_REFRESH_INTERVAL)
+
+    return _store
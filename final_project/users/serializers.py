@@ -5,8 +5,12 @@ from django.contrib.auth import authenticate, get_user_model
 from django.utils.translation import ugettext_lazy as _
 from rest_framework import exceptions, serializers
 from allauth.account import app_settings as allauth_settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import Role, User
+from .revocation import get_revocation_store
 
 UserModel = get_user_model()
 
@@ -188,3 +192,56 @@ class SignUpSerializer(serializers.ModelSerializer):
         adapter.save_user(request, user, self, True)
         setup_user_email(request, user, [])
         return user
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    """
+    Responsible for refreshing tokens, refuses revoked refresh tokens
+    """
+    refresh = serializers.CharField()
+
+    def validate(self, attrs):
+        store = get_revocation_store()
+        refresh = RefreshToken(attrs['refresh'])
+
+        if store.is_revoked(refresh.payload):
+            raise InvalidToken(_('Token has been revoked'))
+
+        data = {'access': str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                store.revoke_token(refresh)
+
+            refresh.set_jti()
+            refresh.set_exp()
+
+            data['refresh'] = str(refresh)
+
+        return data
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """
+    Responsible for revoking a refresh token, e.g. on logout
+    """
+    refresh = serializers.CharField()
+
+    def validate_refresh(self, value):
+        try:
+            return RefreshToken(value)
+        except TokenError as error:
+            raise InvalidToken(error.args[0])
+
+    def save(self):
+        return get_revocation_store().revoke_token(self.validated_data['refresh'])
+
+
+class UserTokensRevokeSerializer(serializers.Serializer):
+    """
+    Responsible for revoking every token of a user
+    """
+    id = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+
+    def save(self):
+        return get_revocation_store().revoke_user(self.validated_data['id'].pk)
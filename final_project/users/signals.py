@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from .models import User
+from .revocation import get_revocation_store
+
+
+@receiver(pre_save, sender=User)
+def remember_stored_activity(sender, instance, using, update_fields=None, **kwargs):
+    """
+    Remembers whether the stored user is active, saves which leave is_active alone are skipped
+    """
+    instance._was_active = None
+
+    if instance.pk is not None and (update_fields is None or "is_active" in update_fields):
+        instance._was_active = sender.objects.using(using).filter(pk=instance.pk).values_list(
+            "is_active", flat=True
+        ).first()
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_of_deactivated_user(sender, instance, created, **kwargs):
+    """
+    Revokes tokens of a user as soon as their account is deactivated, saves of an inactive user revoke nothing
+    """
+    if not created and not instance.is_active and getattr(instance, "_was_active", None):
+        get_revocation_store().revoke_user(instance.pk)
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.hashing import HashingBusy, HashingGate
+from users.models import User
+from .utils import RoleFactory, get_fake_user_data
+
+
+class TestHashingGate(TestCase):
+    """
+    Testing bounded hashing gate
+    """
+
+    def test_gate_rejects_when_full(self):
+        """
+        Testing that a hash which can't get a slot in time fails with HashingBusy
+        """
+        gate = HashingGate(concurrency=1, timeout=0.01)
+
+        with gate.slot():
+            with self.assertRaises(HashingBusy):
+                with gate.slot():
+                    pass
+
+        self.assertEqual(gate.stats()["rejected"], 1)
+        self.assertEqual(gate.stats()["running"], 0)
+
+    def test_token_endpoint_when_gate_is_full(self):
+        """
+        Testing that /token/ answers 503 instead of stalling when hashing slots are busy
+        """
+        user = User.objects.create_user(**get_fake_user_data(RoleFactory()))
+        gate = HashingGate(concurrency=1, timeout=0.01)
+
+        with mock.patch("users.backends.get_hashing_gate", return_value=gate), gate.slot():
+            response = APIClient().post(reverse("token_obtain_pair"), {"login": user.login, "password": user.phone})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class TestRehashOnLogin(TestCase):
+    """
+    Testing transparent rehash of passwords on login
+    """
+
+    def test_password_is_rehashed_with_new_iterations(self):
+        """
+        Testing that changing PASSWORD_HASH_ITERATIONS upgrades stored hashes on the next login
+        """
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            user = User.objects.create_user(**get_fake_user_data(RoleFactory()))
+
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            response = APIClient().post(reverse("token_obtain_pair"), {"login": user.login, "password": user.phone})
+
+        user.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
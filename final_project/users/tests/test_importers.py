@@ -0,0 +1,201 @@
+import io
+
+from allauth.account.models import EmailAddress
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.importers import EMAIL_TAKEN, LOGIN_TAKEN, UserImporter, hash_passwords, parse_rows
+from users.models import User
+from .utils import RoleFactory, fake, get_fake_user_data
+
+
+class TestUserImporter(TestCase):
+    """
+    Testing bulk import of users
+    """
+
+    def setUp(self):
+        self.role = RoleFactory()
+
+    def get_row(self, **kwargs):
+        row = {
+            "email": fake.email(),
+            "first_name": fake.first_name(),
+            "last_name": fake.last_name(),
+            "phone": fake.phone_number(),
+            "role_id": self.role.id,
+        }
+        row.update(kwargs)
+        return row
+
+    def test_parse_csv_rows(self):
+        """
+        Testing that CSV documents are turned into rows
+        """
+        stream = io.BytesIO(b"first_name,last_name,email,phone,role_id\nJohn,Smith,j@example.com,0555,1\n")
+
+        rows = parse_rows(stream, "csv")
+
+        self.assertEqual(rows[0]["last_name"], "Smith")
+        self.assertEqual(rows[0]["role_id"], "1")
+
+    def test_import_creates_users_and_email_addresses(self):
+        """
+        Testing that valid rows create users with hashed passwords and e-mail addresses
+        """
+        rows = [self.get_row(), self.get_row(password="secret pass")]
+
+        report = UserImporter(workers=1).run(rows)
+
+        self.assertEqual(len(report["created"]), 2)
+        self.assertEqual(report["errors"], [])
+
+        second = User.objects.get(email=rows[1]["email"])
+        self.assertTrue(second.check_password("secret pass"))
+        self.assertTrue(EmailAddress.objects.filter(user=second, email=second.email, primary=True).exists())
+
+    def test_import_resolves_login_collisions(self):
+        """
+        Testing that logins which are already taken get a numeric suffix
+        """
+        existing = User.objects.create_user(
+            email=fake.email(), first_name="John", last_name="Smith", phone="0555", role_id=self.role
+        )
+        rows = [self.get_row(first_name="John", last_name="Smith"), self.get_row(first_name="John", last_name="Smith")]
+
+        report = UserImporter(workers=1).run(rows)
+
+        self.assertEqual(existing.login, "smith_john")
+        self.assertEqual([user["login"] for user in report["created"]], ["smith_john2", "smith_john3"])
+
+    def test_import_reports_row_errors(self):
+        """
+        Testing that broken rows are reported and do not stop valid ones
+        """
+        duplicate = self.get_row()
+        rows = [
+            self.get_row(email="not an email"),
+            self.get_row(role_id=self.role.id + 100),
+            duplicate,
+            dict(duplicate),
+            self.get_row(first_name=""),
+        ]
+
+        report = UserImporter(workers=1).run(rows)
+
+        self.assertEqual([user["row"] for user in report["created"]], [2])
+        self.assertEqual([error["row"] for error in report["errors"]], [0, 1, 3, 4])
+        self.assertIn("role_id", report["errors"][1]["errors"])
+
+    def test_import_reports_rows_taken_by_concurrent_signup(self):
+        """
+        Testing that a row whose e-mail address was taken after validation is reported and others are saved
+        """
+        class RacingImporter(UserImporter):
+            def validate(self, rows):
+                accepted = super().validate(rows)
+                User.objects.create_user(**dict(get_fake_user_data(RoleFactory()), email=rows[1]["email"]))
+                return accepted
+
+        rows = [self.get_row(), self.get_row(), self.get_row()]
+
+        report = RacingImporter().run(rows)
+
+        self.assertEqual([user["row"] for user in report["created"]], [0, 2])
+        self.assertEqual(report["errors"], [{"row": 1, "errors": {"email": [EMAIL_TAKEN]}}])
+        self.assertTrue(EmailAddress.objects.filter(email=rows[2]["email"]).exists())
+
+    def test_import_reports_rows_whose_login_was_taken(self):
+        """
+        Testing that a row whose login was taken after it was allocated is reported as such, not as a taken e-mail
+        """
+        class RacingImporter(UserImporter):
+            def save(self, users):
+                if len(users) > 1:
+                    raise IntegrityError
+                return super().save(users)
+
+            def save_one_by_one(self, users, errors):
+                self.taken_login = users[1][1].login
+                taken = User.objects.create_user(**get_fake_user_data(RoleFactory()))
+                User.objects.filter(pk=taken.pk).update(login=self.taken_login)
+                return super().save_one_by_one(users, errors)
+
+        importer = RacingImporter()
+
+        report = importer.run([self.get_row(), self.get_row()])
+
+        self.assertEqual([user["row"] for user in report["created"]], [0])
+        self.assertEqual(report["errors"], [
+            {"row": 1, "errors": {"non_field_errors": [LOGIN_TAKEN.format(login=importer.taken_login)]}},
+        ])
+
+    def test_hash_passwords_in_process_pool(self):
+        """
+        Testing that passwords hashed in worker processes can be checked
+        """
+        user = User(password=hash_passwords(["first", "second"], workers=2)[1])
+
+        self.assertTrue(user.check_password("second"))
+
+
+class TestUserImportView(TestCase):
+    """
+    Testing users/import/ endpoint
+    """
+
+    def setUp(self):
+        self.role = RoleFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", self.role.id, "admin"))
+
+    def test_import_json_rows(self):
+        """
+        Testing import of rows sent as JSON body
+        """
+        rows = [get_fake_user_data(self.role) for _ in range(3)]
+        for row in rows:
+            row["role_id"] = self.role.id
+
+        response = self.client.post(reverse("users-import"), rows, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 3)
+
+    def test_import_csv_file(self):
+        """
+        Testing import of rows sent as an uploaded CSV file
+        """
+        upload = io.BytesIO(
+            f"first_name,last_name,email,phone,role_id\nAnna,Lee,{fake.email()},0555,{self.role.id}\n".encode()
+        )
+        upload.name = "staff.csv"
+
+        response = self.client.post(reverse("users-import"), {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"][0]["login"], "lee_anna")
+
+    @override_settings(USER_IMPORT_MAX_ROWS=2)
+    def test_import_is_bounded(self):
+        """
+        Testing that imports bigger than the endpoint takes are left to the import_users command
+        """
+        rows = [dict(get_fake_user_data(self.role), role_id=self.role.id) for _ in range(3)]
+
+        response = self.client.post(reverse("users-import"), rows, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email=rows[0]["email"]).exists())
+
+    def test_import_without_valid_rows(self):
+        """
+        Testing that an import without valid rows is rejected
+        """
+        response = self.client.post(reverse("users-import"), [{"first_name": "Anna"}], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["errors"][0]["row"], 0)
@@ -0,0 +1,164 @@
+import datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users import revocation
+from users.models import RevokedToken, User
+from .utils import RoleFactory, get_fake_user_data
+
+
+class TestRevocation(TransactionTestCase):
+    """
+    Testing revocation of JWT tokens
+    """
+
+    def setUp(self):
+        cache.clear()
+        revocation._store = None
+        self.client = APIClient()
+        self.user = User.objects.create_user(**get_fake_user_data(RoleFactory()))
+        self.admin = User.objects.create_superuser("admin", self.user.role_id.id, "admin")
+
+    def tearDown(self):
+        revocation._store = None
+
+    def authorize(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_revoked_check_costs_no_query(self):
+        """
+        Testing that checking a token is answered from memory once the store is loaded
+        """
+        store = revocation.get_revocation_store()
+        store.refresh(force=True)
+        token = RefreshToken.for_user(self.user)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(store.is_revoked(token.payload))
+
+    def test_revoke_refresh_token(self):
+        """
+        Testing that a revoked refresh token can't be used to refresh
+        """
+        refresh = RefreshToken.for_user(self.user)
+
+        response = self.client.post(reverse("token_revoke"), {"refresh": str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.post(reverse("token_refresh"), {"refresh": str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_all_tokens_of_user(self):
+        """
+        Testing that revoking a user rejects their access and refresh tokens at once
+        """
+        refresh = RefreshToken.for_user(self.user)
+        self.authorize(refresh.access_token)
+        self.assertEqual(self.client.get(reverse("tables")).status_code, status.HTTP_200_OK)
+
+        self.client.credentials()
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse("users-revoke-tokens"), {"id": self.user.id})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.client.force_authenticate(None)
+        self.authorize(refresh.access_token)
+        self.assertEqual(self.client.get(reverse("tables")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(reverse("token_refresh"), {"refresh": str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_revokes_tokens(self):
+        """
+        Testing that deactivating a user revokes their tokens
+        """
+        refresh = RefreshToken.for_user(self.user)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertTrue(revocation.get_revocation_store().is_revoked(refresh.payload))
+
+    def test_saving_inactive_user_revokes_once(self):
+        """
+        Testing that saves of a user deactivated already revoke nothing again
+        """
+        self.user.is_active = False
+        self.user.save()
+
+        self.user.first_name = "Renamed"
+        self.user.save()
+        User.objects.get(pk=self.user.pk).save()
+
+        self.assertEqual(RevokedToken.objects.filter(user_id=self.user.id).count(), 1)
+
+    def test_other_process_revocations_take_effect_at_once(self):
+        """
+        Testing that revocations committed by other processes are picked up on the next check
+        """
+        store = revocation.get_revocation_store()
+        store.refresh(force=True)
+        refresh = RefreshToken.for_user(self.user)
+        revocation.RevocationStore(60).revoke_token(refresh)
+
+        self.assertTrue(store.is_revoked(refresh.payload))
+
+    def test_late_committed_rows_are_loaded(self):
+        """
+        Testing that a row committed after one with a greater id is picked up by the next refresh
+        """
+        store = revocation.get_revocation_store()
+        later = RevokedToken.objects.create(jti="later", expires_at=timezone.now() + datetime.timedelta(hours=1))
+        store.refresh(force=True)
+        RevokedToken.objects.create(id=later.id - 1, jti="earlier", expires_at=later.expires_at)
+
+        store.refresh(force=True)
+
+        self.assertTrue(store.is_revoked({"jti": "earlier"}))
+
+    def test_rolled_back_revocation_is_forgotten(self):
+        """
+        Testing that a revocation rolled back with its transaction does not stay in memory
+        """
+        refresh = RefreshToken.for_user(self.user)
+        store = revocation.get_revocation_store()
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            store.revoke_token(refresh)
+            raise RuntimeError
+
+        self.assertFalse(store.is_revoked(refresh.payload))
+
+    def test_prune_expired(self):
+        """
+        Testing that pruning removes expired revocations only
+        """
+        store = revocation.get_revocation_store()
+        store.revoke_token(RefreshToken.for_user(self.user))
+        expired = RefreshToken.for_user(self.user)
+        expired.set_exp(lifetime=-expired.lifetime)
+        store.revoke_token(expired)
+
+        self.assertEqual(store.prune(), 1)
+        self.assertEqual(RevokedToken.objects.count(), 1)
+
+    def test_refresh_forgets_expired(self):
+        """
+        Testing that a refresh drops expired revocations from memory without pruning
+        """
+        store = revocation.get_revocation_store()
+        expired = RefreshToken.for_user(self.user)
+        expired.set_exp(lifetime=-expired.lifetime)
+        store.revoke_token(expired)
+        self.assertIn(expired["jti"], store._jtis)
+
+        store.refresh(force=True)
+
+        self.assertNotIn(expired["jti"], store._jtis)
@@ -1,6 +1,8 @@
 from django.test import TestCase
 
-from users.utils import login_creator
+from users.models import User
+from users.utils import allocate_login, allocate_logins, login_creator, next_free_login
+from .utils import RoleFactory, fake
 
 
 class TestUtils(TestCase):
@@ -17,3 +19,48 @@ class TestUtils(TestCase):
         last_name = "Bǎi Xìng"
 
         self.assertEqual(login_creator(last_name, first_name), "Bǎi_Lǎo".lower())
+
+    def test_next_free_login(self):
+        """
+            Testing that next_free_login picks the next numeric suffix
+        """
+
+        self.assertEqual(next_free_login("smith_john", set()), "smith_john")
+        self.assertEqual(next_free_login("smith_john", {"smith_john"}), "smith_john2")
+        self.assertEqual(
+            next_free_login("smith_john", {"smith_john", "smith_john2", "smith_johnny", "smith_john7"}),
+            "smith_john8"
+        )
+
+
+class TestLoginAllocation(TestCase):
+    """
+        Class for testing allocation of free logins
+    """
+
+    def setUp(self):
+        self.role = RoleFactory()
+
+    def test_allocate_logins_in_one_query(self):
+        """
+            Testing that taken logins are looked up with a single query
+        """
+
+        with self.assertNumQueries(1):
+            logins = allocate_logins(["doe_jane", "doe_jane", "roe_rick"])
+
+        self.assertEqual(logins, ["doe_jane", "doe_jane2", "roe_rick"])
+
+    def test_create_users_with_same_names(self):
+        """
+            Testing that users with the same names get different logins
+        """
+
+        data = {"first_name": "John", "last_name": "Smith", "phone": "0555", "role_id": self.role}
+
+        first = User.objects.create_user(email=fake.email(), **data)
+        second = User.objects.create_user(email=fake.email(), **data)
+
+        self.assertEqual(first.login, "smith_john")
+        self.assertEqual(second.login, "smith_john2")
+        self.assertEqual(allocate_login("Smith", "John"), "smith_john3")
@@ -5,5 +5,8 @@ from . import views
 urlpatterns = [
     path("roles/", views.RoleViews.as_view(), name="roles"),
     path("users/", views.UserViews.as_view(), name="users"),
-    path("registration/", views.RegisterView.as_view(), name="register")
+    path("users/import/", views.UserImportView.as_view(), name="users-import"),
+    path("users/revokeTokens/", views.UserTokensRevokeView.as_view(), name="users-revoke-tokens"),
+    path("registration/", views.RegisterView.as_view(), name="register"),
+    path("token/revoke/", views.TokenRevokeView.as_view(), name="token_revoke"),
 ]
@@ -1,2 +1,73 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+
+
 def login_creator(string1, string2) -> str:
     return f"{string1.split(' ')[0]}_{string2.split(' ')[0]}".lower()
+
+
+def next_free_login(base, taken) -> str:
+    """
+    Returns base itself if it is free, otherwise base with the next numeric suffix (smith_john2, ...)
+    """
+    if base not in taken:
+        return base
+
+    pattern = re.compile(rf"^{re.escape(base)}(\d+)$")
+    suffixes = [int(match.group(1)) for match in map(pattern.match, taken) if match]
+
+    return f"{base}{max(suffixes + [1]) + 1}"
+
+
+def lock_logins(bases, using=DEFAULT_DB_ALIAS):
+    """
+    Serializes login allocation for the given bases until the current transaction ends.
+    Only PostgreSQL needs it, other backends serialize writers anyway
+    """
+    connection = connections[using]
+
+    if connection.vendor != "postgresql" or not connection.in_atomic_block:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtext('users.login:' || base)) "
+            "FROM unnest(%s::text[]) AS base ORDER BY base",
+            [sorted(set(bases))]
+        )
+
+
+def allocate_logins(bases, using=DEFAULT_DB_ALIAS):
+    """
+    Allocates a free login for every base login.
+    Taken logins are fetched with one prefix query, which is served by the index of unique login column.
+    Call it inside the transaction that saves the users to be safe under concurrent registrations
+    """
+    if not bases:
+        return []
+
+    lock_logins(bases, using)
+
+    lookup = Q()
+    for base in set(bases):
+        lookup |= Q(login__startswith=base)
+
+    taken = set(get_user_model().objects.using(using).filter(lookup).values_list("login", flat=True))
+
+    logins = []
+    for base in bases:
+        login = next_free_login(base, taken)
+        taken.add(login)
+        logins.append(login)
+
+    return logins
+
+
+def allocate_login(last_name, first_name, using=DEFAULT_DB_ALIAS) -> str:
+    """
+    Allocates a free login for a single user
+    """
+    return allocate_logins([login_creator(last_name, first_name)], using)[0]
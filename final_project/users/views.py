@@ -1,15 +1,22 @@
+import os
+
+from django.conf import settings
 from rest_framework import status
 from rest_framework.generics import ListCreateAPIView
 from rest_auth.registration.views import RegisterView as RView
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt import views as jwt_views
 
-from core.mixins import CustomDeleteMixin, CustomUpdateMixin
+from core.mixins import CustomDeleteMixin, CustomUpdateMixin, ReplicaReadMixin, TransactionPolicyMixin
 from . import serializers
+from .importers import UserImporter, parse_rows
 from .models import Role, User
 
 
-class RoleViews(ListCreateAPIView, CustomDeleteMixin):
+class RoleViews(ReplicaReadMixin, TransactionPolicyMixin, ListCreateAPIView, CustomDeleteMixin):
     """
     Responsible for creating, listing and deleting role instances
     """
@@ -24,7 +31,7 @@ class RoleViews(ListCreateAPIView, CustomDeleteMixin):
         return self.destroy(request, *args, **kwargs)
 
 
-class UserViews(ListCreateAPIView, CustomDeleteMixin, CustomUpdateMixin):
+class UserViews(ReplicaReadMixin, TransactionPolicyMixin, ListCreateAPIView, CustomDeleteMixin, CustomUpdateMixin):
     """
     Responsible for user endpoints
     """
@@ -68,7 +75,7 @@ class UserViews(ListCreateAPIView, CustomDeleteMixin, CustomUpdateMixin):
         return self.partial_update(request, *args, **kwargs)
 
 
-class RegisterView(RView):
+class RegisterView(TransactionPolicyMixin, RView):
     """
     Responsible for register view
     """
@@ -89,3 +96,86 @@ class RegisterView(RView):
             status=status.HTTP_201_CREATED,
             headers=headers
         )
+
+
+class UserImportView(TransactionPolicyMixin, APIView):
+    """
+    Responsible for importing many users at once from JSON rows or a CSV/JSON file
+    """
+    permission_classes = (IsAdminUser, )
+    parser_classes = (JSONParser, MultiPartParser)
+
+    def get_rows(self, request):
+        """
+        Returns import rows either from an uploaded file or from the request body
+        """
+        upload = request.FILES.get("file")
+
+        if upload is None:
+            rows = request.data
+            return rows.get("rows", []) if isinstance(rows, dict) else rows
+
+        file_format = request.data.get("format") or os.path.splitext(upload.name)[1].lstrip(".").lower()
+        return parse_rows(upload, file_format)
+
+    def post(self, request, *args, **kwargs):
+        """
+        Needed for 'POST' method, which accepts rows of users and creates them
+        """
+        try:
+            rows = self.get_rows(request)
+        except ValueError as error:
+            return Response({"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(rows, list):
+            return Response({"detail": "Expected a list of rows."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+            return Response(
+                {"detail": f"At most {settings.USER_IMPORT_MAX_ROWS} rows at once, use the import_users command."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        report = UserImporter().run(rows)
+        response_status = status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST
+
+        return Response(report, status=response_status)
+
+
+class TokenRefreshView(TransactionPolicyMixin, jwt_views.TokenRefreshView):
+    """
+    Responsible for refreshing access tokens, refuses revoked refresh tokens
+    """
+    serializer_class = serializers.TokenRefreshSerializer
+
+
+class TokenRevokeView(TransactionPolicyMixin, APIView):
+    """
+    Responsible for revoking a refresh token
+    """
+    authentication_classes = ()
+
+    def post(self, request, *args, **kwargs):
+        """
+        Needed for 'POST' method, which accepts a refresh token and revokes it
+        """
+        serializer = serializers.TokenRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserTokensRevokeView(TransactionPolicyMixin, APIView):
+    """
+    Responsible for revoking every token of a user, e.g. of a fired employee
+    """
+    permission_classes = (IsAdminUser, )
+
+    def post(self, request, *args, **kwargs):
+        """
+        Needed for 'POST' method, which accepts an id of user and revokes all of their tokens
+        """
+        serializer = serializers.UserTokensRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)